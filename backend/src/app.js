@@ -13,7 +13,8 @@ const cors = require('cors');
 /* Initializing Express */
 const app = express();
 app.use(cors());
-app.use(express.json());
+// Large departments post multi-MB schedules; gzipped bodies are inflated here
+app.use(express.json({ limit: '50mb' }));
 
 
 /* Routes */
@@ -299,22 +299,82 @@ router.get('/importDataToAlg', async (req, res) => {
 
 
 
+/* * POST /runAlgorithm :
+ *      summary: runs the Python scheduler, which fetches the active schedule and posts the result back.
+ *               With SOLVER_URL set the job goes to the warm solver service (src/algorithm/solver_service.py)
+ *               instead of spawning a fresh python3 process per run.
+ *
+ *      requestBody / requestQuery:
+ *          required: false
+ *          content:
+ *              time_limit_s : number
+ *                  - latency SLA in seconds; the solver returns the best schedule found within it
+ *
+ *      responses:
+ *        200:
+ *          description: - algorithm finished, returns the tail of its output
+ *        400:
+ *          description: - invalid time_limit_s
+ *        500:
+ *          description: - algorithm failed or timed out
+ */
 router.post('/runAlgorithm', async (req, res) => {
     console.log(`[runAlgorithm] Algorithm execution requested`);
 
+    const rawLimit = req.body?.time_limit_s ?? req.query.time_limit_s;
+    const timeLimit = rawLimit === undefined ? null : Number(rawLimit);
+    if (timeLimit !== null && !(timeLimit > 0)) {
+        return res.status(400).send("time_limit_s must be a positive number");
+    }
+
     // Path to the Python algorithm entry point
     const algorithmDir = path.resolve(__dirname, '..', '..', '..', 'src', 'algorithm');
     const mainPy = path.join(algorithmDir, 'main.py');
 
     console.log(`[runAlgorithm] Algorithm dir: ${algorithmDir}`);
     console.log(`[runAlgorithm] main.py path: ${mainPy}`);
+    console.log(`[runAlgorithm] Time limit: ${timeLimit === null ? 'none' : `${timeLimit}s`}`);
+
+    if (process.env.SOLVER_URL) {
+        console.log(`[runAlgorithm] Sending job to solver service at ${process.env.SOLVER_URL}`);
+        try {
+            const response = await fetch(`${process.env.SOLVER_URL}/solve`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(timeLimit === null ? { post: true } : { post: true, time_limit_s: timeLimit }),
+                signal: AbortSignal.timeout(timeLimit === null ? 120000 : Math.ceil(timeLimit * 1000) + 15000),
+            });
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error || `Solver service returned ${response.status}`);
+            }
+
+            console.log(`[runAlgorithm] Service solved schedule_id=${result.schedule_id} in ${result.seconds.toFixed(2)}s (score=${result.score})`);
+            const { schedule, ...summary } = result;
+            return res.status(200).json({
+                success: true,
+                message: 'Algorithm completed successfully',
+                output: JSON.stringify(summary),
+            });
+        } catch (error) {
+            console.error(`[runAlgorithm] Solver service failed:`, error.message);
+            return res.status(500).json({
+                success: false,
+                message: 'Algorithm execution failed',
+                error: error.message,
+            });
+        }
+    }
 
     try {
         const result = await new Promise((resolve, reject) => {
             const proc = spawn('python3', [mainPy], {
                 cwd: algorithmDir,
-                env: { ...process.env },
-                timeout: 120000, // 2 minute timeout
+                env: timeLimit === null
+                    ? { ...process.env }
+                    : { ...process.env, SOLVER_TIME_LIMIT: String(timeLimit) },
+                // 2 minute timeout, or the SLA plus a grace period for interpreter start-up
+                timeout: timeLimit === null ? 120000 : Math.ceil(timeLimit * 1000) + 15000,
             });
 
             let stdout = '';
@@ -369,4 +429,128 @@ router.post('/runAlgorithm', async (req, res) => {
     }
 });
 
+
+
+
+/* * POST /budgetSweep :
+ *      summary: solves the active schedule without a budget and reduces it to every budget in a list,
+ *               so the cost / score trade-off can be compared before picking one. Nothing is written
+ *               back; use POST /budgetSweep/apply with the returned sweep_id. Needs SOLVER_URL.
+ *
+ *      requestBody:
+ *          required: true
+ *          content:
+ *              budgets : number[] | number
+ *                  - budgets in dollars, or how many to spread evenly from the full cost down to 0
+ *              time_limit_s : number
+ *                  - latency SLA in seconds for the solve
+ *
+ *      responses:
+ *        200:
+ *          description: - sweep finished, returns { sweep_id, schedule_id, score, cost, points }
+ *        400:
+ *          description: - missing budgets or invalid time_limit_s
+ *        503:
+ *          description: - SOLVER_URL is not set
+ *        500:
+ *          description: - solver service failed or timed out
+ */
+router.post('/budgetSweep', async (req, res) => {
+    const budgets = req.body?.budgets;
+    const timeLimit = req.body?.time_limit_s === undefined ? null : Number(req.body.time_limit_s);
+    if (budgets === undefined) {
+        return res.status(400).send("budgets is required");
+    }
+    if (timeLimit !== null && !(timeLimit > 0)) {
+        return res.status(400).send("time_limit_s must be a positive number");
+    }
+    if (!process.env.SOLVER_URL) {
+        return res.status(503).send("Budget sweeps need the solver service (SOLVER_URL)");
+    }
+
+    console.log(`[budgetSweep] Sending sweep to solver service at ${process.env.SOLVER_URL}`);
+    try {
+        const response = await fetch(`${process.env.SOLVER_URL}/solve`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(timeLimit === null ? { budgets } : { budgets, time_limit_s: timeLimit }),
+            signal: AbortSignal.timeout(timeLimit === null ? 120000 : Math.ceil(timeLimit * 1000) + 15000),
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            return res.status(response.status).json({ success: false, error: result.error });
+        }
+
+        console.log(`[budgetSweep] Swept schedule_id=${result.schedule_id} over ${result.points.length} budgets in ${result.seconds.toFixed(2)}s`);
+        return res.status(200).json({ success: true, ...result });
+    } catch (error) {
+        console.error(`[budgetSweep] Solver service failed:`, error.message);
+        return res.status(500).json({
+            success: false,
+            message: 'Budget sweep failed',
+            error: error.message,
+        });
+    }
+});
+
+
+
+
+/* * POST /budgetSweep/apply :
+ *      summary: rebuilds the schedule at one budget of a recent sweep and writes it back
+ *
+ *      requestBody:
+ *          required: true
+ *          content:
+ *              sweep_id : string
+ *                  - from POST /budgetSweep
+ *              budget : number
+ *                  - one of the swept budgets
+ *
+ *      responses:
+ *        200:
+ *          description: - schedule updated, returns { schedule_id, budget, score, cost }
+ *        400:
+ *          description: - missing sweep_id or budget
+ *        404:
+ *          description: - unknown or expired sweep, or a budget the sweep did not cover
+ *        503:
+ *          description: - SOLVER_URL is not set
+ *        500:
+ *          description: - solver service failed
+ */
+router.post('/budgetSweep/apply', async (req, res) => {
+    const { sweep_id, budget } = req.body ?? {};
+    if (!sweep_id || budget === undefined) {
+        return res.status(400).send("sweep_id and budget are required");
+    }
+    if (!process.env.SOLVER_URL) {
+        return res.status(503).send("Budget sweeps need the solver service (SOLVER_URL)");
+    }
+
+    try {
+        const response = await fetch(`${process.env.SOLVER_URL}/sweep/schedule`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ sweep_id, budget, post: true }),
+            signal: AbortSignal.timeout(60000),
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            return res.status(response.status).json({ success: false, error: result.error });
+        }
+
+        console.log(`[budgetSweep/apply] Applied budget ${result.budget} to schedule_id=${result.schedule_id} (score=${result.score})`);
+        const { schedule, ...summary } = result;
+        return res.status(200).json({ success: true, ...summary });
+    } catch (error) {
+        console.error(`[budgetSweep/apply] Solver service failed:`, error.message);
+        return res.status(500).json({
+            success: false,
+            message: 'Applying the budget failed',
+            error: error.message,
+        });
+    }
+});
+
 module.exports = router;
@@ -0,0 +1,383 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from data.context import SchedulerContext, freeze
+from data.parsers import parse_shifts, parse_tas, parse_preference_matrix
+from data.db_connection import fetch_schedule, fetch_schedules, post_schedule
+from helpers.constraints import apply_fairness, shifts_overlap
+from helpers.log import get_logger
+from solver import solve, NUM_CHAINS, NUM_REPLICAS, SEED
+
+# ============================================================
+# BATCH SOLVE: SEVERAL COURSES IN ONE RUN
+# ============================================================
+#
+# Solves every schedule listed in a manifest over one worker pool, then
+# makes sure no TA is on two overlapping shifts in different courses:
+#
+#   python batch.py manifest.json --out results/
+#   python batch.py manifest.json --post        # PUT each result to the backend
+#
+# The manifest lists courses as backend schedule ids or input files (the
+# {"tas", "schedule"} document /schedule/importDataToAlg returns), paths
+# relative to the manifest:
+#
+#   {"courses": [
+#       {"name": "cs15", "schedule_id": 3},
+#       {"name": "cs11", "file": "cs11.json"}
+#   ]}
+#
+# Backend courses share the one TA collection, fetched once. A TA listed
+# by several courses is parsed once and every course's context holds the
+# same read-only record; preferences stay per course, since they are
+# matched to each course's shifts.
+#
+# Cross-course conflicts are repaired in rounds. After every course is
+# solved, each TA on overlapping shifts in two courses keeps the one they
+# prefer (the earlier manifest entry on a tie); in the other course the
+# TA's preference for every shift overlapping it is set to 0, and that
+# course is re-solved as a warm start from its last schedule. A block is
+# never lifted, so every round removes at least one option and the rounds
+# end; MAX_REPAIR_ROUNDS caps them all the same.
+#
+# Results are written (or posted) only once every course is done. Each
+# course is solved with whichever mode SOLVER_CHAINS / SOLVER_REPLICAS
+# select, so the pool defaults to the cores divided by that many.
+
+# Re-solve rounds after the first pass before giving up on conflicts
+MAX_REPAIR_ROUNDS = 5
+
+# Per-course latency SLA in seconds (unset = fixed iteration count)
+TIME_LIMIT_S = float(os.getenv("SOLVER_TIME_LIMIT", "0")) or None
+
+_log = get_logger("BATCH")
+
+# ============================================================
+# COURSES
+# ============================================================
+
+class Course:
+    """
+    One schedule of the batch: its parsed data before fairness, the
+    (ta_id -> shift_ids) preferences blocked by conflict repair, and the
+    latest solve - context, payload and {shift_id: [ta_id, ...]}.
+    """
+
+    def __init__(self, name, schedule_id, ta_metadata, shift_metadata, preference_matrix):
+        self.name              = name
+        self.schedule_id       = schedule_id
+        self.ta_metadata       = ta_metadata
+        self.shift_metadata    = shift_metadata
+        self.preference_matrix = preference_matrix
+        self.blocked           = {}
+
+        self.ctx         = None
+        self.payload     = None
+        self.assignments = None
+        self.seconds     = 0.0
+        self.solves      = 0
+
+    def build_context(self):
+        """SchedulerContext with the blocked preferences set to 0, fairness applied."""
+        prefs = self.preference_matrix
+        if self.blocked:
+            prefs = {
+                ta_id: {**row, **dict.fromkeys(self.blocked.get(ta_id, ()), 0)}
+                for ta_id, row in prefs.items()
+            }
+        self.ctx = apply_fairness(SchedulerContext(self.ta_metadata, self.shift_metadata, prefs))
+        return self.ctx
+
+    def block(self, ta_id, shift):
+        """Keep ta_id off every shift of this course that overlaps shift (from another course)."""
+        blocked = self.blocked.setdefault(ta_id, set())
+        for own in self.shift_metadata:
+            if shifts_overlap(own, shift):
+                blocked.add(own["shift_id"])
+
+    def preference(self, ta_id, shift_id):
+        return self.preference_matrix.get(ta_id, {}).get(shift_id, 0)
+
+def shared_tas(raw_tas, records):
+    """
+    parse_tas() through records, {document key: parsed TA}, so a TA listed
+    by several courses is parsed once and shared. Preferences are left out
+    of the key; they are parsed per course.
+    """
+    tas = []
+    for raw in raw_tas:
+        key = json.dumps({k: v for k, v in raw.items() if k not in ("_id", "preferences")},
+                         sort_keys=True, default=str)
+        ta = records.get(key)
+        if ta is None:
+            ta = records[key] = freeze(parse_tas([raw])[0])
+        tas.append(ta)
+    return tas
+
+def load_manifest(path):
+    """Course entries of a manifest file, with file paths made absolute."""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    entries = manifest.get("courses") if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"[load_manifest] {path} lists no courses")
+
+    base = os.path.dirname(os.path.abspath(path))
+    names = set()
+    for i, entry in enumerate(entries):
+        if ("file" in entry) == ("schedule_id" in entry):
+            raise ValueError(f"[load_manifest] course {i} needs exactly one of 'file' or 'schedule_id'")
+        if "file" in entry:
+            entry["file"] = os.path.join(base, entry["file"])
+        entry.setdefault("name", os.path.splitext(os.path.basename(entry["file"]))[0]
+                         if "file" in entry else f"schedule-{entry['schedule_id']}")
+        if entry["name"] in names:
+            raise ValueError(f"[load_manifest] duplicate course name '{entry['name']}'")
+        names.add(entry["name"])
+    return entries
+
+def load_courses(entries):
+    """Fetch or read every course's documents and parse them into Courses."""
+    # Backend schedules are fetched concurrently, the TA collection once
+    schedule_ids = [entry["schedule_id"] for entry in entries if "file" not in entry]
+    backend_tas  = None
+    fetched      = {}
+    if schedule_ids:
+        backend_tas, _, _ = fetch_schedule()
+        fetched = dict(zip(schedule_ids, fetch_schedules(schedule_ids)))
+
+    records = {}
+    courses = []
+    for entry in entries:
+        if "file" in entry:
+            with open(entry["file"], "r", encoding="utf-8") as f:
+                document = json.load(f)
+            raw_tas, raw_schedule = document["tas"], document["schedule"]
+        else:
+            raw_tas, raw_schedule = backend_tas, fetched[entry["schedule_id"]]
+
+        shift_metadata = parse_shifts(raw_schedule)
+        courses.append(Course(
+            name              = entry["name"],
+            schedule_id       = raw_schedule.get("schedule_id", entry.get("schedule_id")),
+            ta_metadata       = shared_tas(raw_tas, records),
+            shift_metadata    = shift_metadata,
+            preference_matrix = parse_preference_matrix(raw_tas, shift_metadata),
+        ))
+
+    _log.info(f"Loaded {len(courses)} courses, {len(records)} distinct TAs")
+    return courses
+
+# ============================================================
+# CROSS-COURSE CONFLICTS
+# ============================================================
+
+def assignments_from_payload(payload):
+    """{shift_id: [ta_id, ...]} from a serialized schedule."""
+    return {
+        shift["shift_id"]: [ta["ta_id"] for ta in shift["tas_scheduled"]]
+        for day_shifts in payload.values() if isinstance(day_shifts, list)
+        for shift in day_shifts
+        if shift["tas_scheduled"]
+    }
+
+def find_conflicts(courses):
+    """
+    Every TA on overlapping shifts in two different courses, as
+    (ta_id, course a, shift a, course b, shift b) with a and b positions
+    in courses.
+    """
+    held = {}
+    for c, course in enumerate(courses):
+        for shift_id, ta_ids in course.assignments.items():
+            shift = course.ctx.shift_by_id[shift_id]
+            for ta_id in ta_ids:
+                held.setdefault(ta_id, []).append((c, shift))
+
+    conflicts = []
+    for ta_id, shifts in held.items():
+        shifts.sort(key=lambda item: (item[1]["day"].value, item[1]["start"]))
+        for i, (a, shift_a) in enumerate(shifts):
+            for b, shift_b in shifts[i + 1:]:
+                if shift_b["day"] != shift_a["day"] or shift_b["start"] >= shift_a["end"]:
+                    break
+                if a != b:
+                    conflicts.append((ta_id, a, shift_a, b, shift_b))
+    return conflicts
+
+def resolve_conflicts(courses, conflicts):
+    """
+    Block the losing side of each conflict (see the header). Returns the
+    positions of the courses that need re-solving.
+    """
+    dropped = set()
+    changed = set()
+    for ta_id, a, shift_a, b, shift_b in conflicts:
+        if (a, ta_id, shift_a["shift_id"]) in dropped or (b, ta_id, shift_b["shift_id"]) in dropped:
+            continue
+
+        pref_a = courses[a].preference(ta_id, shift_a["shift_id"])
+        pref_b = courses[b].preference(ta_id, shift_b["shift_id"])
+        if pref_a > pref_b or (pref_a == pref_b and a < b):
+            loser, lost, kept = b, shift_b, shift_a
+        else:
+            loser, lost, kept = a, shift_a, shift_b
+
+        courses[loser].block(ta_id, kept)
+        dropped.add((loser, ta_id, lost["shift_id"]))
+        changed.add(loser)
+        _log.debug(lambda: f"  TA '{ta_id}' leaves '{courses[loser].name}' shift '{lost['shift_id']}'")
+    return changed
+
+# ============================================================
+# SOLVE
+# ============================================================
+
+def _solve_course(ctx, previous, seed, time_limit_s, use_cache):
+    started = time.perf_counter()
+    payload = solve(ctx, time_limit_s=time_limit_s, started=started, previous=previous, seed=seed,
+                    use_cache=use_cache, instrument=False)
+    return payload, time.perf_counter() - started
+
+def default_workers(num_courses):
+    """Cores over the processes each course's solve uses, at most one per course."""
+    per_course = max(NUM_CHAINS, NUM_REPLICAS, 1)
+    return max(1, min(num_courses, (os.cpu_count() or 1) // per_course))
+
+def solve_batch(courses, max_workers=None, max_rounds=MAX_REPAIR_ROUNDS, time_limit_s=TIME_LIMIT_S,
+                seed=SEED, use_cache=True):
+    """
+    Solve every course, then repair cross-course conflicts for up to
+    max_rounds rounds. Course i uses seed + i. Fills in each Course's
+    ctx, payload and assignments; returns the conflicts left (empty
+    unless the rounds ran out).
+    """
+    max_workers = max_workers or default_workers(len(courses))
+    _log.info(f"Solving {len(courses)} courses on {max_workers} workers")
+
+    def run(positions, pool):
+        jobs = []
+        for c in positions:
+            course = courses[c]
+            jobs.append((
+                course.build_context(),
+                course.assignments,
+                seed + c if seed is not None else None,
+                time_limit_s,
+                use_cache,
+            ))
+        if pool is None:
+            results = [_solve_course(*job) for job in jobs]
+        else:
+            results = [future.result() for future in [pool.submit(_solve_course, *job) for job in jobs]]
+
+        for c, (payload, seconds) in zip(positions, results):
+            course = courses[c]
+            course.payload     = payload
+            course.assignments = assignments_from_payload(payload)
+            course.seconds    += seconds
+            course.solves     += 1
+            _log.info(f"  {course.name}: score={payload['score']:.2f} time={seconds:.2f}s")
+
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 and len(courses) > 1 else None
+    try:
+        run(range(len(courses)), pool)
+
+        for round_number in range(1, max_rounds + 1):
+            conflicts = find_conflicts(courses)
+            if not conflicts:
+                return []
+            changed = sorted(resolve_conflicts(courses, conflicts))
+            _log.info(f"Repair round {round_number}: {len(conflicts)} cross-course conflicts, "
+                      f"re-solving {[courses[c].name for c in changed]}")
+            run(changed, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    conflicts = find_conflicts(courses)
+    if conflicts:
+        _log.warning(f"{len(conflicts)} cross-course conflicts left after {max_rounds} repair rounds")
+    return conflicts
+
+# ============================================================
+# RESULTS
+# ============================================================
+
+def summarize(courses, conflicts, seconds):
+    return {
+        "seconds": seconds,
+        "courses": [
+            {
+                "name":        course.name,
+                "schedule_id": course.schedule_id,
+                "score":       course.payload["score"],
+                "seconds":     course.seconds,
+                "solves":      course.solves,
+                "blocked":     sum(len(shift_ids) for shift_ids in course.blocked.values()),
+            }
+            for course in courses
+        ],
+        "conflicts": [
+            {
+                "ta_id":   ta_id,
+                "courses": [courses[a].name, courses[b].name],
+                "shifts":  [shift_a["shift_id"], shift_b["shift_id"]],
+            }
+            for ta_id, a, shift_a, b, shift_b in conflicts
+        ],
+    }
+
+def write_results(courses, summary, out_dir):
+    """One <course name>.json payload per course plus summary.json."""
+    os.makedirs(out_dir, exist_ok=True)
+    for course in courses:
+        with open(os.path.join(out_dir, f"{course.name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"schedule_id": course.schedule_id, "schedule": course.payload}, f, default=str)
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, default=str)
+        f.write("\n")
+
+def post_results(courses):
+    """post_schedule() every course; returns how many failed."""
+    failed = 0
+    for course in courses:
+        try:
+            post_schedule(course.schedule_id, course.payload)
+        except Exception as e:
+            failed += 1
+            _log.error(f"Could not post '{course.name}' (schedule_id={course.schedule_id}): {e}")
+    return failed
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve several course schedules in one run.")
+    parser.add_argument("manifest", help="JSON manifest of courses (schedule ids and/or input files)")
+    parser.add_argument("--out", default="batch_results", help="directory for the result files")
+    parser.add_argument("--post", action="store_true", help="also PUT every result to the backend")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: by core count)")
+    parser.add_argument("--rounds", type=int, default=MAX_REPAIR_ROUNDS, help="cross-course repair rounds")
+    parser.add_argument("--no-cache", action="store_true", help="skip the result cache lookup")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    courses = load_courses(load_manifest(args.manifest))
+    conflicts = solve_batch(courses, max_workers=args.workers, max_rounds=args.rounds,
+                            use_cache=not args.no_cache)
+    summary = summarize(courses, conflicts, time.perf_counter() - started)
+
+    write_results(courses, summary, args.out)
+    _log.info(f"Wrote {len(courses)} schedules to {args.out} in {summary['seconds']:.2f}s")
+
+    failed = post_results(courses) if args.post else 0
+    return 1 if conflicts or failed else 0
+
+# Guarded so the pool's worker processes don't re-run the batch
+if __name__ == "__main__":
+    sys.exit(main())
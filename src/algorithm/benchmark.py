@@ -0,0 +1,259 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from data.context import SchedulerContext
+from data.parsers import parse_shifts, parse_tas, parse_preference_matrix
+from dummy_data.synthetic import SIZES, generate_sized, to_backend_documents
+from helpers.constraints import apply_fairness
+from helpers.scoring import score_schedule, calculate_cost
+from greedy import greedy_assign
+from simulated_annealing import simulated_annealing
+from reducer import reduce_schedule
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as None
+    resource = None
+
+# ============================================================
+# BENCHMARK RUNNER
+# ============================================================
+#
+# Times each solver phase on synthetic instances (dummy_data/synthetic.py)
+# and compares the numbers against a stored baseline:
+#
+#   python benchmark.py                          # every size vs the baseline
+#   python benchmark.py --sizes small,medium
+#   python benchmark.py --update                 # rewrite the baseline
+#
+# Phases, each timed on its own:
+#   parse     backend documents -> SchedulerContext with lookups built
+#   fairness  apply_fairness()
+#   greedy    greedy_assign()
+#   sa        a fixed number of annealing steps from the greedy schedule
+#   reduce    reduce_schedule() down to REDUCE_FRACTION of the SA cost
+#
+# parse_preference_matrix() matches preferences by (day, start), which
+# merges parallel shifts of the same block, so the later phases run on the
+# generated instance itself; parse is timed for its cost only.
+#
+# Each size runs in a fresh process so its peak RSS is its own. Exits 1
+# when any metric is worse than the baseline by more than the tolerance.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+DEFAULT_SIZES      = list(SIZES)
+DEFAULT_ITERATIONS = 10000
+DEFAULT_SEED       = 0
+DEFAULT_TOLERANCE  = 0.25
+
+# Budget target for the reduce phase, as a fraction of the SA schedule's cost
+REDUCE_FRACTION = 0.8
+
+# Timing differences below this many seconds are never reported (noise)
+MIN_TIME_DELTA_S = 0.01
+
+# metric -> +1 if bigger is worse, -1 if smaller is worse
+TIMED_METRICS = {
+    "parse_s":    1,
+    "fairness_s": 1,
+    "greedy_s":   1,
+    "sa_s":       1,
+    "reduce_s":   1,
+    "total_s":    1,
+    "sa_iterations_per_s": -1,
+    "peak_rss_mb":         1,
+}
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# ============================================================
+# RUN ONE SIZE
+# ============================================================
+
+def run_size(size, seed=DEFAULT_SEED, iterations=DEFAULT_ITERATIONS):
+    """Time every phase on generate_sized(size, seed). Returns a metrics dict."""
+    instance = generate_sized(size, seed=seed)
+    raw_tas, raw_schedule = to_backend_documents(instance)
+
+    timings = {}
+
+    started = time.perf_counter()
+    shift_metadata = parse_shifts(raw_schedule)
+    ta_metadata    = parse_tas(raw_tas)
+    parse_preference_matrix(raw_tas, shift_metadata)
+    ctx = SchedulerContext(**instance)
+    timings["parse_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ctx = apply_fairness(ctx)
+    timings["fairness_s"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    schedule, state = greedy_assign(ctx)
+    timings["greedy_s"] = time.perf_counter() - started
+    greedy_score = score_schedule(ctx, schedule, state.hours_assigned)
+
+    started = time.perf_counter()
+    schedule, hours_assigned, score = simulated_annealing(
+        ctx, num_iterations=iterations, seed=seed, initial=(schedule, state)
+    )
+    timings["sa_s"] = time.perf_counter() - started
+
+    cost   = calculate_cost(ctx, hours_assigned)
+    target = cost * REDUCE_FRACTION
+    started = time.perf_counter()
+    reduced, reduced_hours = reduce_schedule(ctx, schedule, hours_assigned, target)
+    timings["reduce_s"] = time.perf_counter() - started
+
+    return {
+        "size":                size,
+        "tas":                 len(ta_metadata),
+        "shifts":              len(shift_metadata),
+        **timings,
+        "total_s":             sum(timings.values()),
+        "sa_iterations":       iterations,
+        "sa_iterations_per_s": iterations / timings["sa_s"] if timings["sa_s"] > 0 else None,
+        "greedy_score":        greedy_score,
+        "score":               score,
+        "cost":                cost,
+        "reduced_score":       score_schedule(ctx, reduced, reduced_hours),
+        "reduced_cost":        calculate_cost(ctx, reduced_hours),
+        "peak_rss_mb":         peak_rss_mb(),
+    }
+
+def run_isolated(size, seed=DEFAULT_SEED, iterations=DEFAULT_ITERATIONS):
+    """run_size() in a fresh worker process, so peak RSS isn't shared between sizes."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_size, size, seed, iterations).result()
+
+# ============================================================
+# BASELINE COMPARISON
+# ============================================================
+
+def load_baseline(path=BASELINE_PATH):
+    """Stored baseline, or None if there isn't one yet."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(results, seed, iterations, path=BASELINE_PATH):
+    baseline = {
+        "seed":       seed,
+        "iterations": iterations,
+        "python":     platform.python_version(),
+        "machine":    platform.machine(),
+        "sizes":      {result["size"]: result for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(result, reference, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of one size's result against its baseline entry, as
+    human-readable lines. Timings, iterations/sec and RSS may drift by
+    tolerance (a fraction); scores are seeded, so any drop counts.
+    """
+    problems = []
+    for metric, direction in TIMED_METRICS.items():
+        now, then = result.get(metric), reference.get(metric)
+        if now is None or then is None:
+            continue
+        worse   = (now - then) * direction
+        seconds = metric.endswith("_s") and not metric.endswith("_per_s")
+        if worse > tolerance * abs(then) and not (seconds and worse < MIN_TIME_DELTA_S):
+            problems.append(f"{metric} {then:.4g} -> {now:.4g} ({(now - then) / then:+.0%})")
+
+    for metric in ("greedy_score", "score", "reduced_score"):
+        now, then = result.get(metric), reference.get(metric)
+        if now is not None and then is not None and now < then - 1e-6:
+            problems.append(f"{metric} {then:.4f} -> {now:.4f}")
+    return problems
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def format_result(result):
+    rss = f"{result['peak_rss_mb']:.0f}MB" if result["peak_rss_mb"] is not None else "n/a"
+    return (
+        f"{result['size']:>6} ({result['tas']} TAs, {result['shifts']} shifts): "
+        f"parse {result['parse_s']:.3f}s  fairness {result['fairness_s']:.3f}s  "
+        f"greedy {result['greedy_s']:.3f}s  sa {result['sa_s']:.3f}s  reduce {result['reduce_s']:.3f}s  "
+        f"| {result['sa_iterations_per_s']:.0f} it/s  score {result['score']:.2f}  peak RSS {rss}"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the solver phases on synthetic instances.")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help=f"comma-separated sizes from {sorted(SIZES)}")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="annealing steps")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"unknown size '{size}', expected one of {sorted(SIZES)}")
+
+    results = [run_isolated(size, args.seed, args.iterations) for size in sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print(format_result(result))
+
+    if args.update:
+        save_baseline(results, args.seed, args.iterations, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update to create one.")
+        return 0
+
+    comparable = baseline.get("seed") == args.seed and baseline.get("iterations") == args.iterations
+    if not comparable:
+        print(f"Baseline was recorded with seed={baseline.get('seed')} iterations={baseline.get('iterations')}; "
+              f"scores are not comparable, checking timings only.")
+    regressions = 0
+    for result in results:
+        reference = baseline["sizes"].get(result["size"])
+        if reference is None:
+            print(f"{result['size']}: not in baseline")
+            continue
+        if not comparable:
+            reference = {k: v for k, v in reference.items() if not k.endswith("score")}
+        problems = compare(result, reference, args.tolerance)
+        regressions += len(problems)
+        for problem in problems:
+            print(f"REGRESSION {result['size']}: {problem}")
+
+    if regressions:
+        return 1
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
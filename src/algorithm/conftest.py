@@ -0,0 +1,23 @@
+import pytest
+from data.context import SchedulerContext
+from dummy_data import dummy_data_buddies
+from dummy_data.synthetic import generate_sized
+from helpers.constraints import apply_fairness
+
+# ============================================================
+# SHARED TEST FIXTURES
+# ============================================================
+#
+# Tests run from src/algorithm, like the scripts:
+#
+#   python -m pytest
+
+@pytest.fixture(scope="module", params=["small", "buddies"])
+def ctx(request):
+    """A seeded synthetic instance and the hand-written companions data, fairness applied."""
+    if request.param == "buddies":
+        data = dummy_data_buddies
+        ctx  = SchedulerContext(data.ta_metadata, data.shift_metadata, data.preference_matrix)
+    else:
+        ctx = SchedulerContext(**generate_sized(request.param, seed=3))
+    return apply_fairness(ctx)
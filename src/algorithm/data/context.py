@@ -1,17 +1,105 @@
-from enum import Enum
-
-class Day(Enum):
-    MONDAY    = "Monday"
-    TUESDAY   = "Tuesday"
-    WEDNESDAY = "Wednesday"
-    THURSDAY  = "Thursday"
-    FRIDAY    = "Friday"
-    SATURDAY  = "Saturday"
-    SUNDAY    = "Sunday"
-
-# Allows us to treat these data fields as "global"
-class SchedulerContext:
-    def __init__(self, ta_metadata, shift_metadata, preference_matrix):
-        self.ta_metadata        = ta_metadata
-        self.shift_metadata     = shift_metadata
-        self.preference_matrix  = preference_matrix
\ No newline at end of file
+from enum import Enum
+from data.indexed import ScheduleIndex
+
+class Day(Enum):
+    MONDAY    = "Monday"
+    TUESDAY   = "Tuesday"
+    WEDNESDAY = "Wednesday"
+    THURSDAY  = "Thursday"
+    FRIDAY    = "Friday"
+    SATURDAY  = "Saturday"
+    SUNDAY    = "Sunday"
+
+# ============================================================
+# READ-ONLY CONTAINERS
+# ============================================================
+
+class FrozenDict(dict):
+    """
+    dict that refuses changes. Reads cost the same as a plain dict's, and
+    it pickles as (FrozenDict, plain dict copy) since the default dict
+    pickling would rebuild it through __setitem__.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("[FrozenDict] read-only, build a new one instead")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+def freeze(value):
+    """Read-only version of value: dicts become FrozenDicts and lists tuples, all the way down."""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+# ============================================================
+# SCHEDULER CONTEXT
+# ============================================================
+
+# TA fields ScheduleIndex is built from; with_ta_updates() can't change them
+INDEXED_TA_FIELDS = ("ta_id", "lab_admin_status", "experienced", "is_tf", "companions")
+
+class SchedulerContext:
+    """
+    The problem data for one solve, frozen when built: ta_metadata and
+    shift_metadata are tuples of FrozenDicts, preference_matrix a FrozenDict
+    of FrozenDicts. The lookups get_ta / get_shift read (ta_by_id,
+    shift_by_id) and the dense ScheduleIndex (durations, availability,
+    conflicts...) are built once here, so one context can be shared by
+    threads, pickled to worker processes as is, and live next to other
+    contexts in the same process. ScheduleIndex is read-only by convention.
+
+    To change TA data (apply_fairness), use with_ta_updates(), which
+    returns a new context.
+    """
+
+    __slots__ = ("ta_metadata", "shift_metadata", "preference_matrix", "ta_by_id", "shift_by_id", "index")
+
+    def __init__(self, ta_metadata, shift_metadata, preference_matrix, index=None):
+        init = object.__setattr__
+        init(self, "ta_metadata",       freeze(ta_metadata))
+        init(self, "shift_metadata",    freeze(shift_metadata))
+        init(self, "preference_matrix", freeze(preference_matrix))
+        init(self, "ta_by_id",          FrozenDict((ta["ta_id"], ta) for ta in self.ta_metadata))
+        init(self, "shift_by_id",       FrozenDict((s["shift_id"], s) for s in self.shift_metadata))
+
+        # Dense integer view (ScheduleIndex) built once per context
+        init(self, "index", index if index is not None else ScheduleIndex(self))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"[SchedulerContext] read-only, cannot set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"[SchedulerContext] read-only, cannot delete '{name}'")
+
+    def __reduce__(self):
+        # Everything is already frozen, so unpickling only rebuilds the two lookups
+        return (SchedulerContext, (self.ta_metadata, self.shift_metadata, self.preference_matrix, self.index))
+
+    def with_ta_updates(self, updates):
+        """
+        New context with some TA fields changed, {ta_id: {field: value}}.
+        Shifts, preferences and the index are shared with this one.
+        """
+        for ta_id, fields in updates.items():
+            if ta_id not in self.ta_by_id:
+                raise KeyError(f"[SchedulerContext] ta_id '{ta_id}' not found in ta_metadata")
+            indexed = [field for field in fields if field in INDEXED_TA_FIELDS]
+            if indexed:
+                raise ValueError(f"[SchedulerContext] {indexed} are indexed, build a new context to change them")
+
+        ta_metadata = tuple(
+            FrozenDict({**ta, **freeze(updates[ta["ta_id"]])}) if ta["ta_id"] in updates else ta
+            for ta in self.ta_metadata
+        )
+        return SchedulerContext(ta_metadata, self.shift_metadata, self.preference_matrix, self.index)
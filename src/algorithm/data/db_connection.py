@@ -1,91 +1,243 @@
-import requests
+import gzip
+import json
 import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from data.parsers import *
+from helpers.log import get_logger, DEBUG
+
+_log = get_logger("DB_CONNECTION")
 
 # Prefer explicit backend URL for the algorithm process.
 # Fallback to localhost.
 BASE_URL = os.getenv("VITE_BASE_URL") or "http://localhost:3000"
 
+# Seconds to wait for a connection, and for each read of a response
+CONNECT_TIMEOUT_S = 5.0
+READ_TIMEOUT_S    = float(os.getenv("SOLVER_HTTP_TIMEOUT", "60"))
+
+# Read timeout for a solver service job without a time limit
+SOLVE_TIMEOUT_S = 600.0
+
+# Retries of idempotent calls (GET, PUT) on connection errors and these
+# statuses, waiting BACKOFF_S * 2 ** (retry - 1) in between (or Retry-After)
+MAX_RETRIES    = int(os.getenv("SOLVER_HTTP_RETRIES", "3"))
+BACKOFF_S      = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Request bodies at least this big are sent gzip-compressed
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL     = 5
+
+# Keep-alive connections kept per host, and the most fetches fetch_schedules() runs at once
+POOL_SIZE = 8
+
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# ============================================================
+# HTTP CLIENT
+# ============================================================
+
+class BackendClient:
+    """
+    One keep-alive requests.Session for every backend call. GET and PUT
+    (both idempotent here: PUT /schedule/update replaces the document) are
+    retried with exponential backoff; POST is not, apart from connection
+    errors, where nothing was sent. Every call has a (connect, read)
+    timeout. Request bodies over GZIP_MIN_BYTES go out gzip-compressed
+    (express.json() inflates them), and gzip responses are asked for and
+    decoded.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=(CONNECT_TIMEOUT_S, READ_TIMEOUT_S), retries=MAX_RETRIES,
+                 backoff_s=BACKOFF_S, pool_size=POOL_SIZE):
+        self.base_url  = base_url.rstrip("/")
+        self.timeout   = timeout
+        self.pool_size = pool_size
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_s,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "PUT", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # --------------------------------------------------------
+    # REQUESTS
+    # --------------------------------------------------------
+
+    def request_json(self, method, url, body=None, params=None, timeout=None):
+        """
+        Send body (if any) as JSON, gzipped above GZIP_MIN_BYTES. Raises
+        requests.HTTPError on an error status once retries are used up.
+        Returns the decoded JSON response.
+        """
+        headers = {}
+        data    = None
+        if body is not None:
+            data = json.dumps(body, separators=(",", ":")).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+            if len(data) >= GZIP_MIN_BYTES:
+                size = len(data)
+                data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+                headers["Content-Encoding"] = "gzip"
+                _log.debug(lambda: f"  {method} {url}: {size} bytes, {len(data)} gzipped")
+
+        response = self.session.request(method, url, data=data, params=params, headers=headers,
+                                        timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    # --------------------------------------------------------
+    # BACKEND CALLS
+    # --------------------------------------------------------
+
+    def fetch_schedule(self):
+        """
+        Fetch TAs and the latest schedule from the backend.
+        Returns (tas_list, schedule_dict, schedule_id).
+        """
+        _log.info(f"Fetching data from backend: GET {self.base_url}/schedule/importDataToAlg")
+
+        data = self.request_json("GET", f"{self.base_url}/schedule/importDataToAlg")
+        tas = data["tas"]
+        schedule = data["schedule"]
+        schedule_id = schedule.get("schedule_id")
+
+        _log.info(f"Fetched schedule_id: {schedule_id} with {len(tas)} TAs")
+        _log.debug(lambda: f"Schedule keys: {list(schedule.keys())}")
+
+        if _log.enabled(DEBUG):
+            # Log TA summary
+            for ta in tas:
+                pref_count = len(ta.get("preferences", []))
+                _log.debug(f"  TA '{ta['ta_id']}' (lab_perm={ta.get('lab_perm')}, is_tf={ta.get('is_tf')}, prefs={pref_count})")
+
+            # Log shift counts per day
+            for day in DAY_NAMES:
+                shifts = schedule.get(day, [])
+                if shifts:
+                    lab_count = sum(1 for s in shifts if s.get("is_lab"))
+                    oh_count = sum(1 for s in shifts if not s.get("is_lab") and not s.get("is_empty"))
+                    empty_count = sum(1 for s in shifts if s.get("is_empty"))
+                    _log.debug(f"  {day}: {len(shifts)} shifts (lab={lab_count}, oh={oh_count}, empty={empty_count})")
+
+        return tas, schedule, schedule_id
+
+    def fetch_schedule_by_id(self, schedule_id):
+        """
+        Fetch one schedule document by id (GET /schedule/getSchedule). TAs are
+        not included; they are shared by every schedule, see fetch_schedule().
+        """
+        _log.info(f"Fetching schedule from backend: GET {self.base_url}/schedule/getSchedule?schedule_id={schedule_id}")
+        return self.request_json("GET", f"{self.base_url}/schedule/getSchedule", params={"schedule_id": schedule_id})
+
+    def fetch_schedules(self, schedule_ids, max_workers=None):
+        """fetch_schedule_by_id() for every id, up to pool_size at once. Returns them in schedule_ids order."""
+        schedule_ids = list(schedule_ids)
+        max_workers  = min(max_workers or self.pool_size, self.pool_size, len(schedule_ids))
+        if max_workers <= 1:
+            return [self.fetch_schedule_by_id(schedule_id) for schedule_id in schedule_ids]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(self.fetch_schedule_by_id, schedule_ids))
+
+    def post_schedule(self, schedule_id, payload):
+        """
+        POST the filled schedule back to MongoDB via the backend.
+        """
+        _log.info(f"Posting schedule to DB: PUT {self.base_url}/schedule/update (schedule_id={schedule_id})")
+
+        # Log what we're sending
+        if _log.enabled(DEBUG):
+            for day in DAY_NAMES:
+                shifts = payload.get(day, [])
+                if shifts:
+                    for s in shifts:
+                        tas_count = len(s.get("tas_scheduled", []))
+                        ta_names = [t.get("name", t.get("ta_id", "?")) for t in s.get("tas_scheduled", [])]
+                        _log.debug(f"  {day} {s.get('start_time')}-{s.get('end_time')} "
+                                   f"(lab={s.get('is_lab')}, empty={s.get('is_empty')}): "
+                                   f"{tas_count} TAs assigned {ta_names}")
+
+        result = self.request_json("PUT", f"{self.base_url}/schedule/update", body={
+            "schedule_id": schedule_id,
+            "schedule": payload
+        })
+        _log.info(f"Update response: {result}")
+        return result
+
+    def request_solve(self, solver_url, time_limit_s=None, warm_start=False, use_cache=True, instrument=False):
+        """
+        Hand a run to a warm solver service (solver_service.py), which fetches,
+        solves and posts the schedule itself. Returns the service's job summary.
+        """
+        _log.info(f"Requesting solve from service: POST {solver_url}/solve")
+
+        job = {"post": True, "warm_start": warm_start, "cache": use_cache, "instrument": instrument}
+        if time_limit_s is not None:
+            job["time_limit_s"] = time_limit_s
+
+        # The service answers once the job is done
+        read_timeout = time_limit_s + READ_TIMEOUT_S if time_limit_s is not None else SOLVE_TIMEOUT_S
+        return self.request_json("POST", f"{solver_url.rstrip('/')}/solve", body=job,
+                                 timeout=(CONNECT_TIMEOUT_S, read_timeout))
+
+# ============================================================
+# MODULE-LEVEL CALLS
+# ============================================================
+#
+# The functions below go through one BackendClient per process, created
+# on first use, so every call shares its connection pool.
+
+_client = None
+
+def default_client():
+    global _client
+    if _client is None:
+        _client = BackendClient()
+    return _client
+
 def fetch_schedule():
     """
     Fetch TAs and the latest schedule from the backend.
     Returns (tas_list, schedule_dict, schedule_id).
     """
-    print("\n" + "="*60)
-    print("[DB_CONNECTION] Fetching data from backend...")
-    print(f"[DB_CONNECTION] GET {BASE_URL}/schedule/importDataToAlg")
-    print("="*60)
-
-    response = requests.get(f"{BASE_URL}/schedule/importDataToAlg")
-    response.raise_for_status()
-
-    print(f"[DB_CONNECTION] Response status: {response.status_code}")
-
-    data = response.json()
-    tas = data["tas"]
-    schedule = data["schedule"]
-    schedule_id = schedule.get("schedule_id")
-
-    print(f"[DB_CONNECTION] Fetched schedule_id: {schedule_id}")
-    print(f"[DB_CONNECTION] Number of TAs returned: {len(tas)}")
-    print(f"[DB_CONNECTION] Schedule keys: {list(schedule.keys())}")
-
-    # Log TA summary
-    for ta in tas:
-        pref_count = len(ta.get("preferences", []))
-        print(f"[DB_CONNECTION]   TA '{ta['ta_id']}' (lab_perm={ta.get('lab_perm')}, is_tf={ta.get('is_tf')}, prefs={pref_count})")
-
-    # Log shift counts per day
-    day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    for day in day_names:
-        shifts = schedule.get(day, [])
-        if shifts:
-            lab_count = sum(1 for s in shifts if s.get("is_lab"))
-            oh_count = sum(1 for s in shifts if not s.get("is_lab") and not s.get("is_empty"))
-            empty_count = sum(1 for s in shifts if s.get("is_empty"))
-            print(f"[DB_CONNECTION]   {day}: {len(shifts)} shifts (lab={lab_count}, oh={oh_count}, empty={empty_count})")
-
-    return tas, schedule, schedule_id
+    return default_client().fetch_schedule()
+
+def fetch_schedule_by_id(schedule_id):
+    return default_client().fetch_schedule_by_id(schedule_id)
+
+def fetch_schedules(schedule_ids, max_workers=None):
+    return default_client().fetch_schedules(schedule_ids, max_workers=max_workers)
 
 def fetch_shifts(raw_schedule):
     return parse_shifts(raw_schedule)
 
-# def post_schedule(schedule_id, payload):
-#     response = requests.put(f"{BASE_URL}/schedule/update", json={
-#         "schedule_id": schedule_id,
-#         "schedule": payload
-#     })
-#     response.raise_for_status()
-#     return response.json()
-
 def post_schedule(schedule_id, payload):
     """
     POST the filled schedule back to MongoDB via the backend.
     """
-    print("\n" + "="*60)
-    print(f"[DB_CONNECTION] Posting schedule to DB...")
-    print(f"[DB_CONNECTION] PUT {BASE_URL}/schedule/update")
-    print(f"[DB_CONNECTION] Writing to schedule_id: {schedule_id}")
-    print("="*60)
-
-    # Log what we're sending
-    day_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    for day in day_names:
-        shifts = payload.get(day, [])
-        if shifts:
-            for s in shifts:
-                tas_count = len(s.get("tas_scheduled", []))
-                ta_names = [t.get("name", t.get("ta_id", "?")) for t in s.get("tas_scheduled", [])]
-                print(f"[DB_CONNECTION]   {day} {s.get('start_time')}-{s.get('end_time')} "
-                      f"(lab={s.get('is_lab')}, empty={s.get('is_empty')}): "
-                      f"{tas_count} TAs assigned {ta_names}")
-
-    response = requests.put(f"{BASE_URL}/schedule/update", json={
-        "schedule_id": schedule_id,
-        "schedule": payload
-    })
-    response.raise_for_status()
-
-    result = response.json()
-    print(f"[DB_CONNECTION] Update response: {result}")
-    return result
+    return default_client().post_schedule(schedule_id, payload)
+
+def request_solve(solver_url, time_limit_s=None, warm_start=False, use_cache=True, instrument=False):
+    return default_client().request_solve(solver_url, time_limit_s=time_limit_s, warm_start=warm_start,
+                                          use_cache=use_cache, instrument=instrument)
@@ -0,0 +1,110 @@
+from array import array
+from helpers.data_access import shift_duration_hours
+
+# ============================================================
+# DENSE INTEGER VIEW OF THE SCHEDULER CONTEXT
+# ============================================================
+
+# Role slots follow the staffing tuple order: (num_oh_tas, num_lab_tas, num_leads)
+ROLE_INDEX = {"oh_ta": 0, "lab_ta": 1, "lead": 2}
+ROLE_BY_INDEX     = ("oh_ta", "lab_ta", "lead")
+ROLE_KEY_BY_INDEX = ("oh_tas", "lab_tas", "leads")
+NUM_ROLES = 3
+
+# Minimum lab_admin_status per role (DB lab_perm: 0=OH only, 1=Lab TA, 2=Lab Lead)
+ROLE_MIN_STATUS = {"oh_ta": 0, "lab_ta": 1, "lead": 2}
+
+class ScheduleIndex:
+    """
+    TAs and shifts mapped to dense indices (their position in ctx.ta_metadata
+    and ctx.shift_metadata), with the static per-TA and per-shift data held
+    in flat arrays instead of nested dicts.
+
+    prefs is row-major: the preference of TA t for shift s is
+    prefs[t * num_shifts + s]. staffing is laid out the same way with
+    NUM_ROLES columns per shift.
+    """
+
+    def __init__(self, ctx):
+        self.ta_ids    = [ta["ta_id"] for ta in ctx.ta_metadata]
+        self.shift_ids = [s["shift_id"] for s in ctx.shift_metadata]
+        self.ta_pos    = {ta_id: t for t, ta_id in enumerate(self.ta_ids)}
+        self.shift_pos = {shift_id: s for s, shift_id in enumerate(self.shift_ids)}
+
+        self.num_tas    = len(self.ta_ids)
+        self.num_shifts = len(self.shift_ids)
+
+        # Static eligibility per (shift, role): TAs who marked the shift
+        # available and have the lab_admin_status for the role, as sorted
+        # TA index arrays. Only the dynamic checks (hours, time conflicts,
+        # one-lab rule) are left for run time.
+        self.candidates = [array("i") for _ in range(self.num_shifts * NUM_ROLES)]
+        min_status = [ROLE_MIN_STATUS[role] for role in ROLE_BY_INDEX]
+
+        # Preferences are 0/1/2 so a signed byte per (TA, shift) is enough
+        self.prefs = array("b", bytes(self.num_tas * self.num_shifts))
+        for t, ta in enumerate(ctx.ta_metadata):
+            row = ctx.preference_matrix.get(ta["ta_id"], {})
+            for shift_id, score in row.items():
+                s = self.shift_pos.get(shift_id)
+                if s is None:
+                    continue
+                self.prefs[t * self.num_shifts + s] = score
+                if score > 0:
+                    for r in range(NUM_ROLES):
+                        if ta["lab_admin_status"] >= min_status[r]:
+                            self.candidates[s * NUM_ROLES + r].append(t)
+
+        self.durations = array("d", (shift_duration_hours(s) for s in ctx.shift_metadata))
+        self.is_lab    = array("b", (bool(s["is_lab"]) for s in ctx.shift_metadata))
+        self.staffing  = array("i", (n for s in ctx.shift_metadata for n in s["staffing"]))
+
+        self.lab_status  = array("b", (ta["lab_admin_status"] for ta in ctx.ta_metadata))
+        self.experienced = array("b", (bool(ta["experienced"]) for ta in ctx.ta_metadata))
+        self.is_tf       = array("b", (bool(ta["is_tf"]) for ta in ctx.ta_metadata))
+
+        # Companions as TA indices; IDs that aren't in this context are dropped
+        self.companions = [
+            array("i", sorted(self.ta_pos[c] for c in ta.get("companions", []) if c in self.ta_pos))
+            for ta in ctx.ta_metadata
+        ]
+
+        # Time conflicts as bitsets over shift indices: bit j of conflicts[s]
+        # is set when shifts s and j overlap (s itself included, as in
+        # shifts_overlap). Built with a per-day sweep over shifts sorted by start.
+        self.shift_bits = [1 << s for s in range(self.num_shifts)]
+        self.conflicts  = [0] * self.num_shifts
+
+        by_day = {}
+        for s, shift in enumerate(ctx.shift_metadata):
+            by_day.setdefault(shift["day"], []).append((shift["start"], shift["end"], s))
+
+        for day_shifts in by_day.values():
+            day_shifts.sort()
+            for i, (start_i, end_i, s_i) in enumerate(day_shifts):
+                for start_j, end_j, s_j in day_shifts[i:]:
+                    if start_j >= end_i:
+                        break  # sorted by start, so nothing later overlaps s_i either
+                    if start_i < end_j:
+                        self.conflicts[s_i] |= self.shift_bits[s_j]
+                        self.conflicts[s_j] |= self.shift_bits[s_i]
+
+        self.lab_mask = 0
+        for s in range(self.num_shifts):
+            if self.is_lab[s]:
+                self.lab_mask |= self.shift_bits[s]
+
+    def pref(self, t, s):
+        return self.prefs[t * self.num_shifts + s]
+
+    def pref_row(self, t):
+        """All of TA t's preferences, one entry per shift index."""
+        start = t * self.num_shifts
+        return self.prefs[start:start + self.num_shifts]
+
+    def staff_needed(self, s, role):
+        return self.staffing[s * NUM_ROLES + ROLE_INDEX[role]]
+
+    def role_candidates(self, s, role):
+        """Static candidates for a role on shift index s (see self.candidates)."""
+        return self.candidates[s * NUM_ROLES + ROLE_INDEX[role]]
@@ -1,5 +1,9 @@
 from datetime import time as dt_time
 from data.context import Day
+from helpers.log import get_logger, DEBUG
+
+_log            = get_logger("PARSER")
+_serializer_log = get_logger("SERIALIZER")
 
 # ============================================================
 # PARSE INPUT
@@ -82,7 +86,7 @@ def parse_shifts(raw_schedule):
     shift_counter = 1  # generate numeric shift_ids since DB has empty strings
     skipped_empty = 0
 
-    print(f"\n[PARSER] Parsing shifts from schedule...")
+    _log.info("Parsing shifts from schedule...")
 
     for day_str, day_shifts in raw_schedule.items():
         if day_str not in DAY_MAP:
@@ -109,10 +113,10 @@ def parse_shifts(raw_schedule):
 
             staffing = parse_staffing(shift["staffing_capacity"])
 
-            print(f"[PARSER]   shift_id='{shift_id}' {day_str} "
-                  f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')} "
-                  f"is_lab={shift['is_lab']} staffing_capacity={shift['staffing_capacity']} "
-                  f"-> staffing_tuple={staffing}")
+            _log.debug(lambda: f"  shift_id='{shift_id}' {day_str} "
+                               f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')} "
+                               f"is_lab={shift['is_lab']} staffing_capacity={shift['staffing_capacity']} "
+                               f"-> staffing_tuple={staffing}")
 
             shifts.append({
                 "shift_id": shift_id,
@@ -126,7 +130,7 @@ def parse_shifts(raw_schedule):
 
             shift_counter += 1
 
-    print(f"[PARSER] Parsed {len(shifts)} active shifts ({skipped_empty} empty shifts skipped)")
+    _log.info(f"Parsed {len(shifts)} active shifts ({skipped_empty} empty shifts skipped)")
     return shifts
 
 def parse_tas(raw_tas):
@@ -162,10 +166,10 @@ def parse_preference_matrix(raw_tas, shift_metadata):
         for shift in shift_metadata
     }
 
-    print(f"\n[PARSER] Building preference matrix...")
-    print(f"[PARSER] Shift lookup has {len(shift_lookup)} entries")
-    for (day, start), sid in shift_lookup.items():
-        print(f"[PARSER]   ({day}, {start.strftime('%H:%M')}) -> '{sid}'")
+    _log.info(f"Building preference matrix, shift lookup has {len(shift_lookup)} entries")
+    if _log.enabled(DEBUG):
+        for (day, start), sid in shift_lookup.items():
+            _log.debug(f"  ({day}, {start.strftime('%H:%M')}) -> '{sid}'")
 
     matrix = {}
     total_matched = 0
@@ -184,20 +188,64 @@ def parse_preference_matrix(raw_tas, shift_metadata):
                     matched += 1
                 else:
                     unmatched += 1
-                    print(f"[PARSER]   WARNING: TA '{ta_id}' pref '{pref['time_slots']}' "
-                          f"-> ({day}, {start.strftime('%H:%M')}) has NO matching shift")
+                    _log.warning(lambda: f"  TA '{ta_id}' pref '{pref['time_slots']}' "
+                                         f"-> ({day}, {start.strftime('%H:%M')}) has NO matching shift")
             except Exception as e:
-                print(f"[PARSER]   ERROR: Could not parse time slot '{pref.get('time_slots', '?')}' for TA {ta_id}: {e}")
+                _log.error(f"  Could not parse time slot '{pref.get('time_slots', '?')}' for TA {ta_id}: {e}")
                 continue
 
-        nonzero = sum(1 for v in matrix[ta_id].values() if v > 0)
-        print(f"[PARSER]   TA '{ta_id}': {matched} matched, {unmatched} unmatched, {nonzero} available/preferred")
+        _log.debug(lambda: f"  TA '{ta_id}': {matched} matched, {unmatched} unmatched, "
+                           f"{sum(1 for v in matrix[ta_id].values() if v > 0)} available/preferred")
         total_matched += matched
         total_unmatched += unmatched
 
-    print(f"[PARSER] Preference matrix complete: {total_matched} matched, {total_unmatched} unmatched across all TAs")
+    _log.info(f"Preference matrix complete: {total_matched} matched, {total_unmatched} unmatched across all TAs")
     return matrix
 
+def parse_previous_assignments(raw_schedule, shift_metadata):
+    """
+    Read back the tas_scheduled lists of a previously posted schedule.
+    Shifts are matched to shift_metadata by day, start, end and is_lab.
+    tas_scheduled entries may be full TA objects (as written by
+    serialize_schedule) or bare ta_ids.
+    Returns {shift_id: [ta_id, ...]} in the stored order (leads first).
+    """
+    shift_lookup = {
+        (shift["day"], shift["start"], shift["end"], bool(shift["is_lab"])): shift["shift_id"]
+        for shift in shift_metadata
+    }
+
+    previous = {}
+    for day_str, day_shifts in raw_schedule.items():
+        if day_str not in DAY_MAP or not day_shifts:
+            continue
+
+        for shift in day_shifts:
+            tas_scheduled = shift.get("tas_scheduled") or []
+            if not tas_scheduled:
+                continue
+
+            if "time_slots" in shift:
+                day, start, end = parse_time_slot(shift["time_slots"])
+            else:
+                day   = DAY_MAP[day_str]
+                start = parse_time(shift["start_time"])
+                end   = parse_time(shift["end_time"])
+
+            shift_id = shift_lookup.get((day, start, end, bool(shift.get("is_lab"))))
+            if shift_id is None:
+                _log.warning(lambda: f"  previous {day_str} {start.strftime('%H:%M')}-{end.strftime('%H:%M')} "
+                                     f"has NO matching shift")
+                continue
+
+            previous[shift_id] = [
+                ta["ta_id"] if isinstance(ta, dict) else ta
+                for ta in tas_scheduled
+            ]
+
+    _log.info(f"Previous schedule has assignments on {len(previous)} shifts")
+    return previous
+
 # ============================================================
 # PARSE OUTPUT
 # ============================================================
@@ -217,7 +265,7 @@ def serialize_schedule(ctx, schedule):
     Converts our internal schedule dict into the MongoDB format.
     tas_scheduled is populated with full TA objects looked up from ctx.
     """
-    print(f"\n[SERIALIZER] Serializing schedule for DB write...")
+    _serializer_log.info("Serializing schedule for DB write...")
 
     # Build a lookup from ta_id -> full TA object
     ta_lookup = {ta["ta_id"]: ta for ta in ctx.ta_metadata}
@@ -248,11 +296,11 @@ def serialize_schedule(ctx, schedule):
         tas_scheduled = [ta_lookup[ta_id] for ta_id in all_ta_ids if ta_id in ta_lookup]
         total_assignments += len(tas_scheduled)
 
-        if tas_scheduled:
+        if tas_scheduled and _serializer_log.enabled(DEBUG):
             ta_names = [t.get("name", t.get("ta_id")) for t in tas_scheduled]
-            print(f"[SERIALIZER]   {day_str} shift '{shift_id}' "
-                  f"{shift['start'].strftime('%H:%M')}-{shift['end'].strftime('%H:%M')}: "
-                  f"{len(tas_scheduled)} TAs -> {ta_names}")
+            _serializer_log.debug(f"  {day_str} shift '{shift_id}' "
+                                  f"{shift['start'].strftime('%H:%M')}-{shift['end'].strftime('%H:%M')}: "
+                                  f"{len(tas_scheduled)} TAs -> {ta_names}")
 
         output[day_str].append({
             "shift_id":          shift_id,
@@ -264,7 +312,7 @@ def serialize_schedule(ctx, schedule):
             "staffing_capacity": serialize_staffing(shift["staffing"]),
         })
 
-    print(f"[SERIALIZER] Total: {total_assignments} TA assignments across {len(ctx.shift_metadata)} shifts")
+    _serializer_log.info(f"Total: {total_assignments} TA assignments across {len(ctx.shift_metadata)} shifts")
     return output
 
 def serialize_staffing(staffing_tuple):
@@ -0,0 +1,282 @@
+import math
+import random
+from datetime import time
+from data.context import Day
+from data.parsers import serialize_staffing, DAY_REVERSE_MAP
+
+# ============================================================
+# SYNTHETIC INSTANCE GENERATOR
+# ============================================================
+#
+# Department-scale instances for benchmarking, in the same shape as the
+# hand-written modules next to this one:
+#
+#   instance = generate_instance(200, 300, seed=1)
+#   ctx      = SchedulerContext(**instance)
+#
+# Everything is drawn from one seeded random.Random, so a (size, seed)
+# pair always gives the same instance.
+#
+# What makes them realistic rather than uniform noise:
+#   - Shifts sit on the weekday 75-minute block grid used by the
+#     hand-written data, several in parallel per block (different rooms),
+#     busier in the afternoon than early morning or late evening.
+#   - Preferences are correlated. Each TA has a time-of-day peak (morning,
+#     midday or evening person), one or two days blocked by their own
+#     classes, and an overall availability rate; blocks where many lectures
+#     meet are less available for everyone. Availability is decided per
+#     (day, block), so all parallel shifts of a block agree.
+#   - lab_admin_status follows the backend's lab_perm: 0 OH only, 1 lab TA,
+#     2 lab lead. TFs are experienced leads.
+#   - Companions are mostly chosen among TAs with the same time-of-day
+#     peak, and are often (not always) listed both ways.
+#   - Labs are capped so the one-lab-per-TA rule can still be met.
+
+# Named sizes: (num_tas, num_shifts)
+SIZES = {
+    "small":  (50,   70),
+    "medium": (200,  300),
+    "large":  (1000, 1500),
+}
+
+WEEKDAYS = [Day.MONDAY, Day.TUESDAY, Day.WEDNESDAY, Day.THURSDAY, Day.FRIDAY]
+
+# 75-minute blocks every 90 minutes, with the share of shifts each gets
+BLOCK_STARTS  = [time(9, 0), time(10, 30), time(12, 0), time(13, 30), time(15, 0),
+                 time(16, 30), time(18, 0), time(19, 30), time(21, 0)]
+BLOCK_WEIGHTS = [0.6, 1.0, 1.2, 1.3, 1.3, 1.2, 0.9, 0.7, 0.4]
+BLOCK_MINUTES = 75
+
+# Labs only run in the daytime blocks
+LAB_BLOCKS = range(0, 6)
+
+# Time-of-day peaks (hour) TAs are drawn around
+PEAK_HOURS = [10.0, 14.0, 19.0]
+
+# Fraction of TAs with each lab_admin_status
+STATUS_SHARES = {0: 0.3, 1: 0.4, 2: 0.3}
+
+def _block_end(start):
+    minutes = start.hour * 60 + start.minute + BLOCK_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+def _block_hour(start):
+    return start.hour + start.minute / 60 + BLOCK_MINUTES / 120
+
+# ------------------------------------------------------------
+# TAs
+# ------------------------------------------------------------
+
+def _generate_tas(rng, num_tas, tf_share, companion_share):
+    tas, profiles = [], []
+    for i in range(num_tas):
+        ta_id = i + 1
+        is_tf = rng.random() < tf_share
+        if is_tf:
+            status, experienced = 2, True
+        else:
+            status      = rng.choices(list(STATUS_SHARES), weights=list(STATUS_SHARES.values()))[0]
+            experienced = rng.random() < 0.3 + 0.2 * status
+
+        # Experienced TAs take more hours, as in the hand-written data
+        min_hours = rng.randint(3, 5) if experienced else rng.randint(2, 3)
+        max_hours = min_hours + (rng.randint(4, 7) if experienced else rng.randint(3, 5))
+
+        tas.append({
+            "ta_id":            ta_id,
+            "name":             f"TA {ta_id}",
+            "experienced":      experienced,
+            "lab_admin_status": status,
+            "min_hours":        min_hours,
+            "max_hours":        max_hours,
+            "is_tf":            is_tf,
+            "companions":       [],
+        })
+        profiles.append({
+            "peak":      rng.randrange(len(PEAK_HOURS)),
+            "spread":    rng.uniform(2.5, 5.0),
+            "rate":      rng.uniform(0.4, 0.9),
+            "busy_days": set(rng.sample(WEEKDAYS, rng.choice([1, 1, 2]))),
+        })
+
+    # Companions: mostly someone with the same peak, sometimes listed back
+    by_peak = {}
+    for ta, profile in zip(tas, profiles):
+        by_peak.setdefault(profile["peak"], []).append(ta)
+    for ta, profile in zip(tas, profiles):
+        if rng.random() >= companion_share:
+            continue
+        pool = by_peak[profile["peak"]] if rng.random() < 0.8 else tas
+        for other in rng.sample(pool, min(len(pool), rng.choice([1, 1, 2]))):
+            if other is ta or other["ta_id"] in ta["companions"]:
+                continue
+            ta["companions"].append(other["ta_id"])
+            if rng.random() < 0.6 and ta["ta_id"] not in other["companions"]:
+                other["companions"].append(ta["ta_id"])
+
+    return tas, profiles
+
+# ------------------------------------------------------------
+# SHIFTS
+# ------------------------------------------------------------
+
+def _generate_shifts(rng, num_shifts, tas, lab_share):
+    # Each TA can work one lab, so lab seats (and lead seats) are capped
+    # at 80% of the TAs who can fill them
+    lab_seats_left  = int(0.8 * sum(1 for ta in tas if ta["lab_admin_status"] >= 1))
+    lead_seats_left = int(0.8 * sum(1 for ta in tas if ta["lab_admin_status"] >= 2))
+
+    blocks  = [(day, b) for day in WEEKDAYS for b in range(len(BLOCK_STARTS))]
+    weights = [BLOCK_WEIGHTS[b] for _, b in blocks]
+
+    shifts = []
+    for i in range(num_shifts):
+        shift_id = i + 1
+        is_lab   = rng.random() < lab_share
+
+        if is_lab:
+            per_role = rng.choice([1, 2, 2])
+            if 2 * per_role > lab_seats_left or per_role > lead_seats_left:
+                is_lab = False
+            else:
+                lab_seats_left  -= 2 * per_role
+                lead_seats_left -= per_role
+
+        if is_lab:
+            day, b   = rng.choice([(day, b) for day in WEEKDAYS for b in LAB_BLOCKS])
+            staffing = (0, per_role, per_role)
+        else:
+            day, b   = rng.choices(blocks, weights=weights)[0]
+            staffing = (rng.choices([1, 2, 3], weights=[3, 5, 2] if b < 7 else [6, 3, 1])[0], 0, 0)
+
+        start = BLOCK_STARTS[b]
+        shifts.append({
+            "shift_id": shift_id,
+            "name":     f"{day.value[:3]} {start.strftime('%H:%M')} {'Lab' if is_lab else 'OH'}",
+            "day":      day,
+            "start":    start,
+            "end":      _block_end(start),
+            "is_lab":   is_lab,
+            "staffing": staffing,
+        })
+
+    shifts.sort(key=lambda s: (WEEKDAYS.index(s["day"]), s["start"], s["shift_id"]))
+    return shifts
+
+# ------------------------------------------------------------
+# PREFERENCES
+# ------------------------------------------------------------
+
+def _generate_preferences(rng, tas, profiles, shifts):
+    # How free the whole department is in each block (lecture clashes)
+    block_freedom = {
+        (day, b): rng.uniform(0.6, 1.0)
+        for day in WEEKDAYS for b in range(len(BLOCK_STARTS))
+    }
+    block_of = {start: b for b, start in enumerate(BLOCK_STARTS)}
+    used     = sorted({(s["day"], block_of[s["start"]]) for s in shifts},
+                      key=lambda key: (WEEKDAYS.index(key[0]), key[1]))
+
+    matrix = {}
+    for ta, profile in zip(tas, profiles):
+        peak = PEAK_HOURS[profile["peak"]]
+
+        levels = {}
+        for day, b in used:
+            closeness = math.exp(-((_block_hour(BLOCK_STARTS[b]) - peak) / profile["spread"]) ** 2)
+            p = profile["rate"] * block_freedom[(day, b)] * (0.4 + 0.6 * closeness)
+            if day in profile["busy_days"]:
+                p *= 0.2
+            if rng.random() >= p:
+                levels[(day, b)] = 0
+            else:
+                levels[(day, b)] = 2 if rng.random() < 0.25 + 0.5 * closeness else 1
+
+        # Zero entries are left out, as parse_preference_matrix does for
+        # slots a TA never marked
+        row = {}
+        for s in shifts:
+            level = levels[(s["day"], block_of[s["start"]])]
+            if level:
+                row[s["shift_id"]] = level
+        matrix[ta["ta_id"]] = row
+
+    return matrix
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def generate_instance(num_tas, num_shifts, seed=0, lab_share=0.15, tf_share=0.1, companion_share=0.3):
+    """
+    Random instance with num_tas TAs and num_shifts shifts. lab_share is
+    the fraction of shifts that are labs (before the one-lab cap),
+    tf_share the fraction of TAs who are TFs, companion_share the
+    fraction of TAs who list companions.
+    Returns {"ta_metadata", "shift_metadata", "preference_matrix"}.
+    """
+    rng = random.Random(seed)
+    tas, profiles = _generate_tas(rng, num_tas, tf_share, companion_share)
+    shifts        = _generate_shifts(rng, num_shifts, tas, lab_share)
+    prefs         = _generate_preferences(rng, tas, profiles, shifts)
+    return {
+        "ta_metadata":       tas,
+        "shift_metadata":    shifts,
+        "preference_matrix": prefs,
+    }
+
+def generate_sized(size, seed=0, **kwargs):
+    """generate_instance() for one of the SIZES names."""
+    if size not in SIZES:
+        raise KeyError(f"[generate_sized] Unknown size '{size}', expected one of {sorted(SIZES)}")
+    num_tas, num_shifts = SIZES[size]
+    return generate_instance(num_tas, num_shifts, seed=seed, **kwargs)
+
+def to_backend_documents(instance, schedule_id=1):
+    """
+    The instance as backend documents (TA list and day-keyed schedule),
+    in the format fetch_schedule() returns, for exercising the parsers.
+    Returns (raw_tas, raw_schedule).
+    """
+    prefixes = {"monday": "m", "tuesday": "tu", "wednesday": "w", "thursday": "th",
+                "friday": "f", "saturday": "sa", "sunday": "su"}
+
+    raw_schedule = {"schedule_id": schedule_id}
+    for day_str in prefixes:
+        raw_schedule[day_str] = []
+
+    time_slots = {}
+    for shift in instance["shift_metadata"]:
+        day_str = DAY_REVERSE_MAP[shift["day"]]
+        slot    = f"{prefixes[day_str]}:{shift['start'].strftime('%H:%M')}-{shift['end'].strftime('%H:%M')}"
+        time_slots[shift["shift_id"]] = slot
+        raw_schedule[day_str].append({
+            "shift_id":          shift["shift_id"],
+            "time_slots":        slot,
+            "is_lab":            shift["is_lab"],
+            "is_empty":          False,
+            "tas_scheduled":     [],
+            "staffing_capacity": serialize_staffing(shift["staffing"]),
+        })
+
+    raw_tas = []
+    for ta in instance["ta_metadata"]:
+        first, _, last = ta["name"].partition(" ")
+        prefs = instance["preference_matrix"].get(ta["ta_id"], {})
+        raw_tas.append({
+            "ta_id":       ta["ta_id"],
+            "first_name":  first,
+            "last_name":   last,
+            "is_tf":       ta["is_tf"],
+            "lab_perm":    ta["lab_admin_status"],
+            "experienced": ta["experienced"],
+            "min_hours":   ta["min_hours"],
+            "max_hours":   ta["max_hours"],
+            "companions":  list(ta["companions"]),
+            "preferences": [
+                {"time_slots": time_slots[shift_id], "preference": pref}
+                for shift_id, pref in prefs.items()
+            ],
+        })
+
+    return raw_tas, raw_schedule
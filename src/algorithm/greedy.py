@@ -1,124 +1,267 @@
-from helpers.data_access import *
-from helpers.constraints import *
-from helpers.scoring import *
-
-# ============================================================
-# INITIAL SCHEDULE - GREEDY APPROACH
-# ============================================================
-
-def greedy_assign(ctx):
-    """
-    Produce an initial valid schedule by filling shifts greedily.
-    Labs first (most constrained), then OH shifts.
-    Within each shift, fills roles most constrained first: leads, lab_tas, oh_tas.
-    Returns schedule, current_assignments, hours_assigned.
-    """
-
-    print("\n" + "="*60)
-    print("[GREEDY] Starting greedy assignment")
-    print("="*60)
-
-    # Schedule output: shift_id -> assigned TAs by role + error info
-    schedule = {
-        s["shift_id"]: {
-            "leads":   [],
-            "lab_tas": [],
-            "oh_tas":  [],
-            "unschedulable": False,
-            "error": None
-        }
-        for s in ctx.shift_metadata
-    }
-
-    current_assignments = {ta["ta_id"]: [] for ta in ctx.ta_metadata}
-    hours_assigned      = {ta["ta_id"]: 0  for ta in ctx.ta_metadata}
-
-    # Give preference to better TAs with better "fit"
-    def candidate_score(ta_id, shift_id):
-        return compute_candidate_score(ctx, ta_id, shift_id, schedule, hours_assigned)
-
-    # Assign correct number of TAs to the shift, role
-    def fill_role(shift, role, num_needed):
-        shift_id = shift["shift_id"]
-
-        eligible = get_eligible_tas_for_role(
-            ctx, shift_id, role, current_assignments, hours_assigned
-        )
-        # Sort by candidate score descending
-        ranked = sorted(eligible, key=lambda ta_id: candidate_score(ta_id, shift_id), reverse=True)
-        selected = ranked[:num_needed]
-
-        print(f"[GREEDY]   fill_role shift='{shift_id}' role='{role}' "
-              f"needed={num_needed} eligible={len(eligible)} selected={len(selected)}")
-        if eligible:
-            for ta_id in eligible[:5]:  # show top 5
-                score = candidate_score(ta_id, shift_id)
-                pref = get_pref(ctx, ta_id, shift_id)
-                print(f"[GREEDY]     candidate '{ta_id}': score={score:.2f} pref={pref}")
-
-        role_key = role + "s"  # "leads", "lab_tas", "oh_tas"
-        for ta_id in selected:
-            schedule[shift_id][role_key].append(ta_id)
-            assign_ta(ctx, ta_id, shift_id, current_assignments, hours_assigned)
-            print(f"[GREEDY]     -> assigned '{ta_id}' as {role}")
-
-        # Unable to schedule enough TAs
-        if len(selected) < num_needed:
-            schedule[shift_id]["unschedulable"] = True
-            schedule[shift_id]["error"] = (
-                f"Could only fill {len(selected)}/{num_needed} {role} slots"
-            )
-            print(f"[GREEDY]     WARNING: UNSCHEDULABLE - {schedule[shift_id]['error']}")
-
-    lab_shifts = sorted(
-        [s for s in ctx.shift_metadata if s["is_lab"]],
-        key=lambda s: sum(
-            1 for ta in ctx.ta_metadata
-            if ta["lab_admin_status"] >= 2
-            and get_pref(ctx, ta["ta_id"], s["shift_id"]) > 0
-        )
-    )
-    oh_shifts = sorted(
-        [s for s in ctx.shift_metadata if not s["is_lab"]],
-        key=lambda s: (s["day"].value, s["start"])
-    )
-
-    print(f"\n[GREEDY] {len(lab_shifts)} lab shifts, {len(oh_shifts)} OH shifts")
-    print(f"[GREEDY] Lab shifts: {[s['shift_id'] for s in lab_shifts]}")
-    print(f"[GREEDY] OH shifts: {[s['shift_id'] for s in oh_shifts]}")
-
-    # Pass 1 — all leads across all labs
-    print(f"\n[GREEDY] === PASS 1: Assigning LEADS to lab shifts ===")
-    for shift in lab_shifts:
-        print(f"\n[GREEDY] Lab shift '{shift['shift_id']}' staffing={shift['staffing']}")
-        fill_role(shift, "lead", shift["staffing"][2])
-
-    # Pass 2 — all lab TAs across all labs
-    print(f"\n[GREEDY] === PASS 2: Assigning LAB_TAs to lab shifts ===")
-    for shift in lab_shifts:
-        fill_role(shift, "lab_ta", shift["staffing"][1])
-
-    # Pass 3 — all OH shifts
-    print(f"\n[GREEDY] === PASS 3: Assigning OH_TAs to OH shifts ===")
-    for shift in oh_shifts:
-        fill_role(shift, "oh_ta", shift["staffing"][0])
-
-    # Summary
-    print(f"\n[GREEDY] === ASSIGNMENT SUMMARY ===")
-    total_assigned = 0
-    total_unschedulable = 0
-    for shift_id, assignment in schedule.items():
-        assigned = len(assignment["leads"]) + len(assignment["lab_tas"]) + len(assignment["oh_tas"])
-        total_assigned += assigned
-        if assignment["unschedulable"]:
-            total_unschedulable += 1
-        if assigned > 0 or assignment["unschedulable"]:
-            print(f"[GREEDY] shift '{shift_id}': leads={assignment['leads']} "
-                  f"lab_tas={assignment['lab_tas']} oh_tas={assignment['oh_tas']} "
-                  f"unschedulable={assignment['unschedulable']}")
-
-    print(f"\n[GREEDY] Total TAs assigned: {total_assigned}")
-    print(f"[GREEDY] Unschedulable shifts: {total_unschedulable}")
-    print(f"[GREEDY] Hours assigned: {dict(hours_assigned)}")
-
-    return schedule, current_assignments, hours_assigned
+import heapq
+from helpers.data_access import *
+from helpers.constraints import *
+from helpers.scoring import *
+from helpers.log import get_logger, DEBUG, INFO
+from helpers.instrument import phase
+
+_log = get_logger("GREEDY")
+
+# ============================================================
+# INITIAL SCHEDULE - GREEDY APPROACH
+# ============================================================
+
+def empty_schedule(ctx):
+    """Schedule output: shift_id -> assigned TAs by role + error info."""
+    return {
+        s["shift_id"]: {
+            "leads":   [],
+            "lab_tas": [],
+            "oh_tas":  [],
+            "unschedulable": False,
+            "error": None
+        }
+        for s in ctx.shift_metadata
+    }
+
+def candidate_scorer(ctx, schedule, state, shift_id):
+    """
+    Returns score(t): compute_candidate_score() of TA index t for shift_id
+    as the schedule and hours stand now. The shift's occupants are looked
+    at once here rather than once per candidate.
+    """
+    index       = ctx.index
+    s           = index.shift_pos[shift_id]
+    num_shifts  = index.num_shifts
+    ta_ids      = index.ta_ids
+    ta_metadata = ctx.ta_metadata
+    hours       = state.hours_assigned
+
+    assignment = schedule[shift_id]
+    occupants  = {
+        index.ta_pos[ta_id]
+        for ta_id in assignment["leads"] + assignment["lab_tas"] + assignment["oh_tas"]
+    }
+    any_inexperienced = any(not index.experienced[o] for o in occupants)
+
+    def score(t):
+        pref        = index.prefs[t * num_shifts + s]
+        bal_boost   = balance_boost(ta_metadata[t], hours[ta_ids[t]])
+        exp_penalty = EXPERIENCE_PENALTY * (1 if any_inexperienced and not index.experienced[t] else 0)
+        comp_boost  = sum(1 for c in index.companions[t] if c in occupants)
+        return pref + bal_boost + exp_penalty + comp_boost
+
+    return score
+
+def fill_role(ctx, schedule, state, shift, role, num_needed):
+    """
+    Assign up to num_needed more TAs to the shift, role, best candidate
+    score first. Marks the shift unschedulable if it comes up short.
+    """
+    shift_id = shift["shift_id"]
+
+    eligible = get_eligible_tas_for_role(
+        ctx, shift_id, role, state
+    )
+    # Give preference to better TAs with better "fit".
+    # Sort by candidate score descending (scored once, also reused for logging)
+    score    = candidate_scorer(ctx, schedule, state, shift_id)
+    ta_pos   = ctx.index.ta_pos
+    scores   = {ta_id: score(ta_pos[ta_id]) for ta_id in eligible}
+    ranked   = sorted(eligible, key=scores.__getitem__, reverse=True)
+    selected = ranked[:num_needed]
+
+    if _log.enabled(DEBUG):
+        _log.debug(f"  fill_role shift='{shift_id}' role='{role}' "
+                   f"needed={num_needed} eligible={len(eligible)} selected={len(selected)}")
+        for ta_id in ranked[:5]:  # show top 5
+            _log.debug(f"    candidate '{ta_id}': score={scores[ta_id]:.2f} "
+                       f"pref={get_pref(ctx, ta_id, shift_id)}")
+
+    assign_selected(ctx, schedule, state, shift_id, role, selected, num_needed)
+
+def assign_selected(ctx, schedule, state, shift_id, role, selected, num_needed):
+    """Assign the chosen TAs; marks the shift unschedulable if they fall short of num_needed."""
+    role_key = role + "s"  # "leads", "lab_tas", "oh_tas"
+    for ta_id in selected:
+        schedule[shift_id][role_key].append(ta_id)
+        assign_ta(ctx, ta_id, shift_id, state)
+        _log.debug(lambda: f"    -> assigned '{ta_id}' as {role}")
+
+    # Unable to schedule enough TAs
+    if len(selected) < num_needed:
+        schedule[shift_id]["unschedulable"] = True
+        schedule[shift_id]["error"] = (
+            f"Could only fill {len(selected)}/{num_needed} {role} slots"
+        )
+        _log.warning(lambda: f"  shift '{shift_id}' UNSCHEDULABLE - {schedule[shift_id]['error']}")
+
+# ============================================================
+# LAZY CANDIDATE QUEUES
+# ============================================================
+
+class CandidateQueues:
+    """
+    One max-heap of candidate scores per (shift, role) for greedy_assign,
+    seeded from the static candidates in ctx.index. Entries carry a version
+    stamp, the TA's assignment count: hours only change when a TA is
+    assigned, and more hours can only shrink balance_boost, so a stale
+    entry's score is an upper bound. select() therefore re-scores an entry
+    only when it reaches the top with an old stamp, and checks eligibility
+    only for entries it actually takes. Each heap also remembers how many
+    TAs were on its shift when it was scored; if that changed (lab TAs
+    after leads: companions, experience) the heap is re-scored whole.
+    """
+
+    def __init__(self, ctx, schedule, state):
+        self.ctx      = ctx
+        self.schedule = schedule
+        self.state    = state
+        self.heaps    = {}  # (shift_id, role) -> (occupancy, heap of (-score, t, version))
+
+    def occupancy(self, shift_id):
+        assignment = self.schedule[shift_id]
+        return len(assignment["leads"]) + len(assignment["lab_tas"]) + len(assignment["oh_tas"])
+
+    def add(self, shift_id, role):
+        index       = self.ctx.index
+        score       = candidate_scorer(self.ctx, self.schedule, self.state, shift_id)
+        assignments = self.state.current_assignments
+        heap = [
+            (-score(t), t, len(assignments[index.ta_ids[t]]))
+            for t in index.role_candidates(index.shift_pos[shift_id], role)
+        ]
+        heapq.heapify(heap)
+        self.heaps[(shift_id, role)] = (self.occupancy(shift_id), heap)
+
+    def eligible(self, ta_id, shift_id, role):
+        """get_eligible_tas_for_role's run-time checks for one TA."""
+        ctx, state = self.ctx, self.state
+        return not (
+            is_overloaded(ta_id, state)
+            or would_exceed_max_hours(ctx, ta_id, shift_id, state.hours_assigned)
+            or has_time_conflict(ctx, ta_id, shift_id, state)
+            or (role in ("lead", "lab_ta") and is_in_any_lab(ctx, ta_id, state))
+        )
+
+    def select(self, shift_id, role, num_needed):
+        """
+        Up to num_needed eligible TAs for the role, best current candidate
+        score first (ties by TA order, as in fill_role). Consumes the queue.
+        Returns [(ta_id, score), ...].
+        """
+        if (shift_id, role) not in self.heaps or self.heaps[(shift_id, role)][0] != self.occupancy(shift_id):
+            self.add(shift_id, role)
+        _, heap = self.heaps.pop((shift_id, role))
+
+        ta_ids      = self.ctx.index.ta_ids
+        assignments = self.state.current_assignments
+        score       = None
+        selected    = []
+        while heap and len(selected) < num_needed:
+            neg_score, t, version = heap[0]
+            ta_id   = ta_ids[t]
+            current = len(assignments[ta_id])
+            if version != current:
+                score = score or candidate_scorer(self.ctx, self.schedule, self.state, shift_id)
+                heapq.heapreplace(heap, (-score(t), t, current))
+                continue
+            heapq.heappop(heap)
+            if self.eligible(ta_id, shift_id, role):
+                selected.append((ta_id, -neg_score))
+        return selected
+
+def fill_role_lazy(ctx, schedule, state, queues, shift, role, num_needed):
+    """fill_role() drawing candidates from CandidateQueues instead of scoring and sorting every eligible TA."""
+    shift_id = shift["shift_id"]
+    selected = queues.select(shift_id, role, num_needed)
+
+    if _log.enabled(DEBUG):
+        _log.debug(f"  fill_role shift='{shift_id}' role='{role}' "
+                   f"needed={num_needed} selected={len(selected)}")
+        for ta_id, score in selected:
+            _log.debug(f"    candidate '{ta_id}': score={score:.2f} "
+                       f"pref={get_pref(ctx, ta_id, shift_id)}")
+
+    assign_selected(ctx, schedule, state, shift_id, role, [ta_id for ta_id, _ in selected], num_needed)
+
+def fill_order(ctx):
+    """
+    Lab shifts (fewest possible leads first) and OH shifts (by day and
+    start time) in the order greedy_assign fills them. Lead counts come
+    from the eligibility index.
+    """
+    index = ctx.index
+    lab_shifts = sorted(
+        [s for s in ctx.shift_metadata if s["is_lab"]],
+        key=lambda s: len(index.role_candidates(index.shift_pos[s["shift_id"]], "lead"))
+    )
+    oh_shifts = sorted(
+        [s for s in ctx.shift_metadata if not s["is_lab"]],
+        key=lambda s: (s["day"].value, s["start"])
+    )
+    return lab_shifts, oh_shifts
+
+def greedy_assign(ctx):
+    """
+    Produce an initial valid schedule by filling shifts greedily.
+    Labs first (most constrained), then OH shifts.
+    Within each shift, fills roles most constrained first: leads, lab_tas, oh_tas.
+    Candidates come from CandidateQueues, so each fill only scores and
+    checks the TAs near the top rather than every eligible TA.
+    Returns schedule and its AssignmentState.
+    """
+
+    _log.info("Starting greedy assignment")
+
+    with phase("greedy"):
+        schedule       = empty_schedule(ctx)
+        state          = AssignmentState(ctx)
+        hours_assigned = state.hours_assigned
+
+        lab_shifts, oh_shifts = fill_order(ctx)
+
+        queues = CandidateQueues(ctx, schedule, state)
+        for shift in lab_shifts:
+            queues.add(shift["shift_id"], "lead")
+        for shift in oh_shifts:
+            queues.add(shift["shift_id"], "oh_ta")
+
+        _log.info(lambda: f"{len(lab_shifts)} lab shifts, {len(oh_shifts)} OH shifts")
+        _log.debug(lambda: f"Lab shifts: {[s['shift_id'] for s in lab_shifts]}")
+        _log.debug(lambda: f"OH shifts: {[s['shift_id'] for s in oh_shifts]}")
+
+        # Pass 1 — all leads across all labs
+        _log.debug("=== PASS 1: Assigning LEADS to lab shifts ===")
+        for shift in lab_shifts:
+            _log.debug(lambda: f"Lab shift '{shift['shift_id']}' staffing={shift['staffing']}")
+            fill_role_lazy(ctx, schedule, state, queues, shift, "lead", shift["staffing"][2])
+
+        # Pass 2 — all lab TAs across all labs
+        _log.debug("=== PASS 2: Assigning LAB_TAs to lab shifts ===")
+        for shift in lab_shifts:
+            fill_role_lazy(ctx, schedule, state, queues, shift, "lab_ta", shift["staffing"][1])
+
+        # Pass 3 — all OH shifts
+        _log.debug("=== PASS 3: Assigning OH_TAs to OH shifts ===")
+        for shift in oh_shifts:
+            fill_role_lazy(ctx, schedule, state, queues, shift, "oh_ta", shift["staffing"][0])
+
+    # Summary
+    if _log.enabled(INFO):
+        total_assigned = 0
+        total_unschedulable = 0
+        for shift_id, assignment in schedule.items():
+            assigned = len(assignment["leads"]) + len(assignment["lab_tas"]) + len(assignment["oh_tas"])
+            total_assigned += assigned
+            if assignment["unschedulable"]:
+                total_unschedulable += 1
+            if assigned > 0 or assignment["unschedulable"]:
+                _log.debug(lambda: f"shift '{shift_id}': leads={assignment['leads']} "
+                                  f"lab_tas={assignment['lab_tas']} oh_tas={assignment['oh_tas']} "
+                                  f"unschedulable={assignment['unschedulable']}")
+
+        _log.info(f"Total TAs assigned: {total_assigned}, unschedulable shifts: {total_unschedulable}")
+        _log.debug(lambda: f"Hours assigned: {dict(hours_assigned)}")
+
+    return schedule, state
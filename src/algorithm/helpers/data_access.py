@@ -1,89 +1,152 @@
-# ============================================================
-# DATA ACCESS HELPERS
-# ============================================================
-
-# Lookup dicts built lazily from ctx metadata lists.
-# Keyed by ta_id (string) and shift_id (string) respectively.
-_ta_lookup_cache = {}
-_shift_lookup_cache = {}
-
-def _build_ta_lookup(ctx):
-    global _ta_lookup_cache
-    _ta_lookup_cache = {ta["ta_id"]: ta for ta in ctx.ta_metadata}
-
-def _build_shift_lookup(ctx):
-    global _shift_lookup_cache
-    _shift_lookup_cache = {s["shift_id"]: s for s in ctx.shift_metadata}
-
-def init_lookups(ctx):
-    """Call once after building ctx to prepare fast lookups."""
-    _build_ta_lookup(ctx)
-    _build_shift_lookup(ctx)
-
-def get_pref(ctx, ta_id, shift_id):
-    """Get a TA's preference score for a shift. 0 means unavailable."""
-    return ctx.preference_matrix.get(ta_id, {}).get(shift_id, 0)
-
-def is_available(ctx, ta_id, shift_id):
-    """A TA is available for a shift if their preference score is > 0."""
-    return get_pref(ctx, ta_id, shift_id) > 0
-
-def get_ta(ctx, ta_id):
-    """Get TA metadata by ta_id (supports string IDs from DB)."""
-    if not _ta_lookup_cache:
-        _build_ta_lookup(ctx)
-    ta = _ta_lookup_cache.get(ta_id)
-    if ta is None:
-        raise KeyError(f"[get_ta] ta_id '{ta_id}' not found in ta_metadata. Known IDs: {list(_ta_lookup_cache.keys())}")
-    return ta
-
-def get_shift(ctx, shift_id):
-    """Get shift metadata by shift_id (supports string IDs from DB)."""
-    if not _shift_lookup_cache:
-        _build_shift_lookup(ctx)
-    shift = _shift_lookup_cache.get(shift_id)
-    if shift is None:
-        raise KeyError(f"[get_shift] shift_id '{shift_id}' not found in shift_metadata. Known IDs: {list(_shift_lookup_cache.keys())}")
-    return shift
-
-def get_available_tas(ctx, shift_id):
-    """Get all TAs who marked themselves available for a shift."""
-    return [ta["ta_id"] for ta in ctx.ta_metadata if is_available(ctx, ta["ta_id"], shift_id)]
-
-def get_eligible_leads(ctx, shift_id):
-    """Get all TAs available for a shift who can be a lab lead."""
-    return [ta_id for ta_id in get_available_tas(ctx, shift_id) if (get_ta(ctx, ta_id)["lab_admin_status"] >= 2)]
-
-def get_eligible_lab_tas(ctx, shift_id):
-    """Get all TAs available for a shift who can be a lab TA."""
-    return [ta_id for ta_id in get_available_tas(ctx, shift_id) if (get_ta(ctx, ta_id)["lab_admin_status"] >= 1)]
-
-def get_shifts_for_ta(ctx, ta_id):
-    """Get all shifts a TA marked themselves available for."""
-    return [s["shift_id"] for s in ctx.shift_metadata if is_available(ctx, ta_id, s["shift_id"])]
-
-def ta_id_to_name(ctx, ta_id):
-    return get_ta(ctx, ta_id)["name"]
-
-def shift_id_to_name(ctx, shift_id):
-    return get_shift(ctx, shift_id)["name"]
-
-def shift_duration_hours(shift):
-    """Returns duration of a shift in hours as a float."""
-    start_mins = shift["start"].hour * 60 + shift["start"].minute
-    end_mins   = shift["end"].hour   * 60 + shift["end"].minute
-    return (end_mins - start_mins) / 60
-
-# ============================================================
-# ASSIGNMENT HELPERS
-# ============================================================
-
-def assign_ta(ctx, ta_id, shift_id, current_assignments, hours_assigned):
-    """Assign TA to shift."""
-    current_assignments[ta_id].append(shift_id)
-    hours_assigned[ta_id] += shift_duration_hours(get_shift(ctx, shift_id))
-
-def remove_ta(ctx, ta_id, shift_id, current_assignments, hours_assigned):
-    """Remove TA from shift."""
-    current_assignments[ta_id].remove(shift_id)
-    hours_assigned[ta_id] -= shift_duration_hours(get_shift(ctx, shift_id))
+import helpers.instrument as _instrument
+
+# ============================================================
+# DATA ACCESS HELPERS
+# ============================================================
+
+# TA and shift lookups live on the context (ctx.ta_by_id, ctx.shift_by_id),
+# built with it, so several contexts can be used side by side.
+
+def get_pref(ctx, ta_id, shift_id):
+    """Get a TA's preference score for a shift. 0 means unavailable."""
+    return ctx.preference_matrix.get(ta_id, {}).get(shift_id, 0)
+
+def is_available(ctx, ta_id, shift_id):
+    """A TA is available for a shift if their preference score is > 0."""
+    return get_pref(ctx, ta_id, shift_id) > 0
+
+def get_ta(ctx, ta_id):
+    """Get TA metadata by ta_id (supports string IDs from DB)."""
+    if _instrument.counting:
+        _instrument.count("get_ta")
+    ta = ctx.ta_by_id.get(ta_id)
+    if ta is None:
+        raise KeyError(f"[get_ta] ta_id '{ta_id}' not found in ta_metadata. Known IDs: {list(ctx.ta_by_id.keys())}")
+    return ta
+
+def get_shift(ctx, shift_id):
+    """Get shift metadata by shift_id (supports string IDs from DB)."""
+    if _instrument.counting:
+        _instrument.count("get_shift")
+    shift = ctx.shift_by_id.get(shift_id)
+    if shift is None:
+        raise KeyError(f"[get_shift] shift_id '{shift_id}' not found in shift_metadata. Known IDs: {list(ctx.shift_by_id.keys())}")
+    return shift
+
+def get_available_tas(ctx, shift_id):
+    """Get all TAs who marked themselves available for a shift."""
+    return [ta["ta_id"] for ta in ctx.ta_metadata if is_available(ctx, ta["ta_id"], shift_id)]
+
+def get_eligible_leads(ctx, shift_id):
+    """Get all TAs available for a shift who can be a lab lead."""
+    return [ta_id for ta_id in get_available_tas(ctx, shift_id) if (get_ta(ctx, ta_id)["lab_admin_status"] >= 2)]
+
+def get_eligible_lab_tas(ctx, shift_id):
+    """Get all TAs available for a shift who can be a lab TA."""
+    return [ta_id for ta_id in get_available_tas(ctx, shift_id) if (get_ta(ctx, ta_id)["lab_admin_status"] >= 1)]
+
+def get_shifts_for_ta(ctx, ta_id):
+    """Get all shifts a TA marked themselves available for."""
+    return [s["shift_id"] for s in ctx.shift_metadata if is_available(ctx, ta_id, s["shift_id"])]
+
+def ta_id_to_name(ctx, ta_id):
+    return get_ta(ctx, ta_id)["name"]
+
+def shift_id_to_name(ctx, shift_id):
+    return get_shift(ctx, shift_id)["name"]
+
+def shift_duration_hours(shift):
+    """Returns duration of a shift in hours as a float."""
+    start_mins = shift["start"].hour * 60 + shift["start"].minute
+    end_mins   = shift["end"].hour   * 60 + shift["end"].minute
+    return (end_mins - start_mins) / 60
+
+# ============================================================
+# ASSIGNMENT STATE
+# ============================================================
+
+class AssignmentState:
+    """
+    Per-run assignment bookkeeping. Only change it through assign_ta / remove_ta.
+    current_assignments: ta_id -> [shift_id, ...]
+    hours_assigned:      ta_id -> total hours
+    occupied:            ta_id -> bitmask of the TA's shifts (ctx.index positions),
+                         so a time-conflict check is a single AND
+    Also keeps running totals of hours and squared hours so the mean and
+    variance of hours_assigned are O(1) reads.
+    """
+
+    def __init__(self, ctx):
+        self.current_assignments = {ta["ta_id"]: [] for ta in ctx.ta_metadata}
+        self.hours_assigned      = {ta["ta_id"]: 0  for ta in ctx.ta_metadata}
+        self.occupied            = {ta["ta_id"]: 0  for ta in ctx.ta_metadata}
+
+        self.num_tas      = len(ctx.ta_metadata)
+        self.total_hours  = 0
+        self.sum_sq_hours = 0
+
+    @classmethod
+    def from_schedule(cls, ctx, schedule):
+        """Build the state for an existing {shift_id: {"leads", "lab_tas", "oh_tas"}} schedule."""
+        state = cls(ctx)
+        for shift_id, assignment in schedule.items():
+            for role_key in ("leads", "lab_tas", "oh_tas"):
+                for ta_id in assignment[role_key]:
+                    assign_ta(ctx, ta_id, shift_id, state)
+        return state
+
+    def add_hours(self, ta_id, delta):
+        """Move one TA's hours and the running totals together."""
+        old = self.hours_assigned[ta_id]
+        new = old + delta
+        self.hours_assigned[ta_id] = new
+        self.total_hours  += delta
+        self.sum_sq_hours += new * new - old * old
+
+    @property
+    def mean_hours(self):
+        return self.total_hours / self.num_tas
+
+    @property
+    def hours_variance(self):
+        mean = self.mean_hours
+        return max(0.0, self.sum_sq_hours / self.num_tas - mean * mean)
+
+    @property
+    def hours_std_dev(self):
+        return self.hours_variance ** 0.5
+
+    def variance_after(self, hours_changes):
+        """
+        Variance of hours_assigned if every (ta_id, delta) in hours_changes
+        were applied. Does not mutate; O(len(hours_changes)).
+        """
+        total  = self.total_hours
+        sum_sq = self.sum_sq_hours
+        for ta_id, delta in hours_changes:
+            old = self.hours_assigned[ta_id]
+            new = old + delta
+            total  += delta
+            sum_sq += new * new - old * old
+        mean = total / self.num_tas
+        return max(0.0, sum_sq / self.num_tas - mean * mean)
+
+# ============================================================
+# ASSIGNMENT HELPERS
+# ============================================================
+
+def assign_ta(ctx, ta_id, shift_id, state):
+    """Assign TA to shift."""
+    index = ctx.index
+    s     = index.shift_pos[shift_id]
+    state.current_assignments[ta_id].append(shift_id)
+    state.add_hours(ta_id, index.durations[s])
+    state.occupied[ta_id] |= index.shift_bits[s]
+
+def remove_ta(ctx, ta_id, shift_id, state):
+    """Remove TA from shift."""
+    index = ctx.index
+    s     = index.shift_pos[shift_id]
+    state.current_assignments[ta_id].remove(shift_id)
+    state.add_hours(ta_id, -index.durations[s])
+    state.occupied[ta_id] &= ~index.shift_bits[s]
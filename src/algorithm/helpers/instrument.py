@@ -0,0 +1,250 @@
+import cProfile
+import pstats
+import time
+import tracemalloc
+
+# ============================================================
+# OPT-IN SOLVER INSTRUMENTATION
+# ============================================================
+#
+# One Report is active at a time (the solver is one job per process). While
+# none is, every hook below costs a single attribute check:
+#
+#   with phase("greedy"): ...        wall time per phase, nested phases
+#                                    keyed by path ("solve/anneal/greedy")
+#   if _instrument.counting:         call counters in hot helpers
+#       _instrument.count("get_ta")
+#   annealing_telemetry()            accept/reject/temperature trace for
+#                                    one simulated_annealing() run
+#
+# start_report() turns it on, optionally with a cProfile and/or tracemalloc
+# capture, and Report.to_dict() is the machine-readable result. Work done
+# in worker processes (multi-chain and tempering modes) is not counted.
+
+# Functions with call counters
+COUNTED = ("get_ta", "get_shift", "get_eligible_tas_for_role", "score_schedule")
+
+# Annealing iterations per telemetry sample
+TELEMETRY_EVERY = 1000
+
+# Entries kept from the cProfile and tracemalloc captures
+PROFILE_TOP = 25
+MEMORY_TOP  = 10
+
+# Read by the counted functions
+counting = False
+
+_active = None
+
+class AnnealingTelemetry:
+    """
+    Step outcomes of one simulated_annealing() run. record() takes
+    AnnealingChain.step()'s result: True accepted, False rejected, None no
+    eligible replacement found. Every `every` iterations a sample of the
+    temperature, current and best score and that window's rates is kept.
+    """
+
+    def __init__(self, every=TELEMETRY_EVERY):
+        self.every       = every
+        self.iterations  = 0
+        self.accepted    = 0
+        self.rejected    = 0
+        self.no_eligible = 0
+        self.samples     = []
+        self.stop_reason = None
+        self._window     = [0, 0, 0]  # accepted, rejected, no_eligible since the last sample
+
+    def record(self, result, temperature, chain):
+        self.iterations += 1
+        slot = 0 if result else (2 if result is None else 1)
+        self._window[slot] += 1
+        if self.iterations % self.every == 0:
+            self.sample(temperature, chain)
+
+    def sample(self, temperature, chain):
+        accepted, rejected, no_eligible = self._window
+        steps = accepted + rejected + no_eligible
+        if not steps:
+            return
+        self.accepted    += accepted
+        self.rejected    += rejected
+        self.no_eligible += no_eligible
+        self._window = [0, 0, 0]
+        self.samples.append({
+            "iteration":        self.iterations,
+            "temperature":      temperature,
+            "score":            chain.score,
+            "best_score":       chain.best_score,
+            "accept_rate":      accepted / steps,
+            "no_eligible_rate": no_eligible / steps,
+        })
+
+    def finish(self, temperature, chain, stop_reason=None):
+        """Flush the last partial window."""
+        self.sample(temperature, chain)
+        self.stop_reason = stop_reason
+
+    def to_dict(self):
+        proposed = self.accepted + self.rejected
+        return {
+            "iterations":  self.iterations,
+            "accepted":    self.accepted,
+            "rejected":    self.rejected,
+            "no_eligible": self.no_eligible,
+            "accept_rate": self.accepted / proposed if proposed else None,
+            "stop_reason": self.stop_reason,
+            "samples":     self.samples,
+        }
+
+class Report:
+    """
+    Everything collected between start_report() and stop_report():
+        phases     {path: {"seconds", "calls"}}
+        counters   {name: calls} for COUNTED
+        annealing  one AnnealingTelemetry per simulated_annealing() run
+        fields     extra top-level entries set by the caller
+    plus the cProfile and tracemalloc captures when asked for.
+    """
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.started   = time.perf_counter()
+        self.seconds   = None
+        self.phases    = {}
+        self.stack     = []
+        self.counters  = dict.fromkeys(COUNTED, 0)
+        self.annealing = []
+        self.fields    = {}
+
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory and not tracemalloc.is_tracing()
+        self.memory   = None
+        self.profile  = None
+
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.started
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            stats = pstats.Stats(self.profiler)
+            rows  = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            self.profile = [
+                {
+                    "function":     f"{file}:{line}({name})",
+                    "calls":        calls,
+                    "total_s":      total,
+                    "cumulative_s": cumulative,
+                }
+                for (file, line, name), (_, calls, total, cumulative, _) in rows[:PROFILE_TOP]
+            ]
+            self.profiler = None
+
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:MEMORY_TOP]
+            tracemalloc.stop()
+            self.memory = {
+                "current_bytes": current,
+                "peak_bytes":    peak,
+                "top":           [{"where": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                                  for stat in top],
+            }
+            self.trace_memory = False
+
+    def summary(self):
+        """One line of phase timings for the log."""
+        phases = ", ".join(f"{path} {entry['seconds']:.2f}s" for path, entry in self.phases.items())
+        return f"{self.seconds or 0.0:.2f}s total ({phases or 'no phases'})"
+
+    def to_dict(self):
+        report = {
+            "seconds":   self.seconds if self.seconds is not None else time.perf_counter() - self.started,
+            "phases":    {path: dict(entry) for path, entry in self.phases.items()},
+            "counters":  dict(self.counters),
+            "annealing": [telemetry.to_dict() for telemetry in self.annealing],
+            **self.fields,
+        }
+        if self.profile is not None:
+            report["profile"] = self.profile
+        if self.memory is not None:
+            report["memory"] = self.memory
+        return report
+
+# ============================================================
+# HOOKS
+# ============================================================
+
+class _Phase:
+    __slots__ = ("report", "name", "started")
+
+    def __init__(self, report, name):
+        self.report = report
+        self.name   = name
+
+    def __enter__(self):
+        self.report.stack.append(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        report  = self.report
+        path    = "/".join(report.stack)
+        report.stack.pop()
+        entry = report.phases.get(path)
+        if entry is None:
+            entry = report.phases[path] = {"seconds": 0.0, "calls": 0}
+        entry["seconds"] += seconds
+        entry["calls"]   += 1
+        return False
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+def phase(name):
+    """Context manager timing a phase of the active report (does nothing without one)."""
+    return _Phase(_active, name) if _active is not None else _NO_PHASE
+
+def count(name):
+    """Count one call of a COUNTED function. Callers check `counting` first."""
+    _active.counters[name] += 1
+
+def annealing_telemetry():
+    """A new AnnealingTelemetry attached to the active report, or None without one."""
+    if _active is None:
+        return None
+    telemetry = AnnealingTelemetry()
+    _active.annealing.append(telemetry)
+    return telemetry
+
+def active_report():
+    return _active
+
+def start_report(profile=False, trace_memory=False):
+    """Start collecting. Raises RuntimeError if a report is already active."""
+    global _active, counting
+    if _active is not None:
+        raise RuntimeError("[start_report] A report is already active")
+    _active  = Report(profile=profile, trace_memory=trace_memory)
+    counting = True
+    return _active
+
+def stop_report():
+    """Stop collecting. Returns the finished Report, or None if none was active."""
+    global _active, counting
+    report, _active, counting = _active, None, False
+    if report is not None:
+        report.stop()
+    return report
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+
+# ============================================================
+# LEVELED, PER-SUBSYSTEM LOGGING
+# ============================================================
+#
+# Each subsystem (PARSER, GREEDY, ELIGIBILITY, SA, DB_CONNECTION, ...) has
+# its own Logger with its own level. A disabled call returns after one
+# integer comparison: pass a lambda as the message to defer building it,
+# and wrap loops that only exist to log in `if log.enabled(DEBUG):`.
+#
+# Configured from the environment when first imported:
+#   SOLVER_LOG_LEVEL  default level for every subsystem (default INFO)
+#   SOLVER_LOG        per-subsystem overrides, e.g. "GREEDY=DEBUG,ELIGIBILITY=OFF"
+#   SOLVER_LOG_JSON   also append every record as a JSON line to this file
+
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+ERROR   = 40
+OFF     = 100
+
+LEVELS      = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR, "OFF": OFF}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+class Logger:
+    """Logger for one subsystem. Records print as "[NAME] message"."""
+
+    __slots__ = ("name", "level")
+
+    def __init__(self, name, level):
+        self.name  = name
+        self.level = level
+
+    def enabled(self, level=DEBUG):
+        return level >= self.level
+
+    def log(self, level, message, **fields):
+        """message may be a string or a zero-argument callable returning one."""
+        if level >= self.level:
+            _emit(self.name, level, message() if callable(message) else message, fields)
+
+    def debug(self, message, **fields):
+        if DEBUG >= self.level:
+            _emit(self.name, DEBUG, message() if callable(message) else message, fields)
+
+    def info(self, message, **fields):
+        if INFO >= self.level:
+            _emit(self.name, INFO, message() if callable(message) else message, fields)
+
+    def warning(self, message, **fields):
+        if WARNING >= self.level:
+            _emit(self.name, WARNING, message() if callable(message) else message, fields)
+
+    def error(self, message, **fields):
+        if ERROR >= self.level:
+            _emit(self.name, ERROR, message() if callable(message) else message, fields)
+
+# ============================================================
+# CONFIGURATION AND SINKS
+# ============================================================
+
+_loggers       = {}
+_default_level = INFO
+_overrides     = {}
+_text_enabled  = True
+_json_sink     = None
+
+def parse_level(value):
+    """Level name ("debug", "INFO", ...) or number -> level number."""
+    value = str(value).strip().upper()
+    if value in LEVELS:
+        return LEVELS[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"[parse_level] Unknown log level '{value}'")
+
+def get_logger(name):
+    """The shared Logger for a subsystem, created on first use."""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers[name] = Logger(name, _overrides.get(name, _default_level))
+    return logger
+
+def configure(level=None, subsystems=None, json_path=None, text=None):
+    """
+    Change logging at run time. level sets the default for every
+    subsystem, subsystems maps names to levels ({"GREEDY": "DEBUG"}),
+    json_path opens a JSON-lines sink ("" closes it) and text turns the
+    stdout output on or off. Arguments left as None keep their setting.
+    """
+    global _default_level, _text_enabled, _json_sink
+
+    if level is not None:
+        _default_level = parse_level(level)
+        _overrides.clear()
+    if subsystems:
+        _overrides.update({name.upper(): parse_level(lvl) for name, lvl in subsystems.items()})
+    for name, logger in _loggers.items():
+        logger.level = _overrides.get(name, _default_level)
+
+    if text is not None:
+        _text_enabled = text
+    if json_path is not None:
+        if _json_sink is not None:
+            _json_sink.close()
+        _json_sink = open(json_path, "a", encoding="utf-8") if json_path else None
+
+def _emit(name, level, message, fields):
+    if _text_enabled:
+        print(f"[{name}] {message}")
+    if _json_sink is not None:
+        record = {"ts": time.time(), "level": LEVEL_NAMES.get(level, level),
+                  "subsystem": name, "message": message, **fields}
+        _json_sink.write(json.dumps(record, default=str) + "\n")
+
+def _configure_from_env():
+    overrides = {}
+    for item in os.getenv("SOLVER_LOG", "").split(","):
+        if "=" in item:
+            name, lvl = item.split("=", 1)
+            overrides[name.strip()] = lvl
+    configure(
+        level=os.getenv("SOLVER_LOG_LEVEL", "INFO"),
+        subsystems=overrides,
+        json_path=os.getenv("SOLVER_LOG_JSON") or None,
+    )
+
+_configure_from_env()
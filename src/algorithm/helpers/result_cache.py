@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# ============================================================
+# CONTENT-ADDRESSED RESULT CACHE
+# ============================================================
+
+# Bump when a solver change should invalidate every stored result
+CACHE_VERSION = 1
+
+# Default directory, next to the solver modules rather than in the cwd
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".solver_cache")
+
+def _normalize(value):
+    """
+    JSON-ready copy with dict keys made sortable strings (repr keeps 1 and
+    "1" apart) and times, enums and tuples reduced to plain values.
+    """
+    if isinstance(value, dict):
+        return {repr(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+def result_key(ctx, params):
+    """
+    sha256 of everything a solve depends on: the parsed ta_metadata,
+    shift_metadata and preference matrix (after fairness), plus params -
+    solver settings, seed and, for warm starts, the previous schedule.
+    """
+    canonical = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "tas":     _normalize(ctx.ta_metadata),
+            "shifts":  _normalize(ctx.shift_metadata),
+            "prefs":   _normalize(ctx.preference_matrix),
+            "params":  _normalize(params),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Solve results stored as one JSON file per key in directory. A hit
+    refreshes the file's mtime, and put() evicts the least recently used
+    files once the directory holds more than max_bytes. The directory is
+    created by the first put().
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls):
+        """
+        Configured by SOLVER_CACHE_DIR (default DEFAULT_CACHE_DIR) and
+        SOLVER_CACHE_MAX_MB (default 64). SOLVER_CACHE=0 disables it (returns None).
+        """
+        if os.getenv("SOLVER_CACHE", "1") == "0":
+            return None
+        return cls(
+            os.getenv("SOLVER_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_bytes=int(float(os.getenv("SOLVER_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        )
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Stored value for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by another process in the meantime
+        return value
+
+    def put(self, key, value):
+        # Write to a temp file and rename so readers never see half an entry
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"), default=str)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict(keep=self._path(key))
+
+    def evict(self, keep=None):
+        """Delete least recently used entries (never keep) until the cache fits in max_bytes."""
+        entries = []
+        total   = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
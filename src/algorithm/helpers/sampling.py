@@ -0,0 +1,60 @@
+import random
+
+# ============================================================
+# WEIGHTED SAMPLING
+# ============================================================
+
+class FenwickSampler:
+    """
+    Weighted random choice over a fixed list of items whose weights change
+    now and then. Weights are kept in a Fenwick (binary indexed) tree, so
+    update() and sample() are both O(log n) instead of rebuilding the
+    cumulative weights on every draw.
+    """
+
+    def __init__(self, weights):
+        self.size    = len(weights)
+        self.weights = list(weights)
+        self.total   = sum(self.weights)
+
+        # O(n) build: push each node's sum up to its parent
+        self.tree = [0] + self.weights
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+        self.top_step = 1 << (self.size.bit_length() - 1) if self.size else 0
+
+    def update(self, i, weight):
+        """Set the weight of item i."""
+        delta = weight - self.weights[i]
+        if delta == 0:
+            return
+        self.weights[i] = weight
+        self.total     += delta
+        j = i + 1
+        while j <= self.size:
+            self.tree[j] += delta
+            j += j & -j
+
+    def sample(self, rng=random):
+        """
+        Returns item index i with probability weights[i] / total.
+        Same mapping from rng.random() to items as random.choices().
+        """
+        if self.total <= 0:
+            raise IndexError("Cannot sample: all weights are zero")
+
+        target = rng.random() * self.total
+        pos    = 0
+        step   = self.top_step
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos     = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+
+        # Float weights can round the target onto the very end
+        return min(pos, self.size - 1)
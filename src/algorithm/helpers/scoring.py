@@ -1,56 +1,252 @@
-from helpers.data_access import *
-from helpers.constraints import *
-
-# ============================================================
-# SCHEDULE SCORING
-# ============================================================
-
-# Better to schedule as lab lead if possible
-ROLE_WEIGHTS = {
-    "lead":   1.0,
-    "lab_ta": 0.8,
-    "oh_ta":  0.6,
-}
-
-EXPERIENCE_PENALTY = -0.1
-COMPANION_BONUS = 0.1
-
-def compute_candidate_score(ctx, ta_id, shift_id, schedule, hours_assigned):
-    ta = get_ta(ctx, ta_id)
-    pref = get_pref(ctx, ta_id, shift_id)
-    hours_below_min = max(0, ta["min_hours"] - hours_assigned[ta_id])
-    balance_boost   = (hours_below_min / ta["min_hours"]) * 2.0 if ta["min_hours"] > 0 else 0
-    exp_penalty     = EXPERIENCE_PENALTY * experience_penalty(ctx, ta_id, shift_id, schedule)
-    comp_boost      = companion_boost(ctx, ta_id, shift_id, schedule)
-    return pref + balance_boost + exp_penalty + comp_boost
-
-def score_schedule(ctx, schedule, hours_assigned):
-    total = 0
-    for shift_id, assignment in schedule.items():
-        for role, role_key in [("lead", "leads"), ("lab_ta", "lab_tas"), ("oh_ta", "oh_tas")]:
-            for ta_id in assignment[role_key]:
-                total += ROLE_WEIGHTS[role] * compute_candidate_score(
-                    ctx, ta_id, shift_id, schedule, hours_assigned
-                )
-    return total
-
-# ============================================================
-# COST CALCULATOR
-# ============================================================
-
-TA_HOURLY_RATE = 17.43
-TF_HOURLY_RATE = 19.60
-
-def calculate_cost(ctx, hours_assigned):
-    """
-    Calculates total budget cost of a schedule.
-    TFs are paid at a higher rate than TAs.
-    """
-    total = 0
-    for ta in ctx.ta_metadata:
-        ta_id = ta["ta_id"]
-        hours = hours_assigned[ta_id]
-        rate  = TF_HOURLY_RATE if ta["is_tf"] else TA_HOURLY_RATE
-        total += hours * rate
-
+import math
+from helpers.data_access import *
+from helpers.constraints import *
+import helpers.instrument as _instrument
+
+# ============================================================
+# SCHEDULE SCORING
+# ============================================================
+
+# Better to schedule as lab lead if possible
+ROLE_WEIGHTS = {
+    "lead":   1.0,
+    "lab_ta": 0.8,
+    "oh_ta":  0.6,
+}
+
+EXPERIENCE_PENALTY = -0.1
+COMPANION_BONUS = 0.1
+
+ROLE_KEYS = [("lead", "leads"), ("lab_ta", "lab_tas"), ("oh_ta", "oh_tas")]
+
+def balance_boost(ta, hours):
+    """Boost for TAs still under their min_hours, scaled by how far under they are."""
+    hours_below_min = max(0, ta["min_hours"] - hours)
+    return (hours_below_min / ta["min_hours"]) * 2.0 if ta["min_hours"] > 0 else 0
+
+def compute_candidate_score(ctx, ta_id, shift_id, schedule, hours_assigned):
+    ta = get_ta(ctx, ta_id)
+    pref = get_pref(ctx, ta_id, shift_id)
+    bal_boost       = balance_boost(ta, hours_assigned[ta_id])
+    exp_penalty     = EXPERIENCE_PENALTY * experience_penalty(ctx, ta_id, shift_id, schedule)
+    comp_boost      = companion_boost(ctx, ta_id, shift_id, schedule)
+    return pref + bal_boost + exp_penalty + comp_boost
+
+def score_schedule(ctx, schedule, hours_assigned):
+    if _instrument.counting:
+        _instrument.count("score_schedule")
+
+    total = 0
+    for shift_id, assignment in schedule.items():
+        for role, role_key in ROLE_KEYS:
+            for ta_id in assignment[role_key]:
+                total += ROLE_WEIGHTS[role] * compute_candidate_score(
+                    ctx, ta_id, shift_id, schedule, hours_assigned
+                )
+    return total
+
+# ============================================================
+# INCREMENTAL (DELTA) SCORING
+# ============================================================
+
+class ScoreTracker:
+    """
+    Keeps a running score_schedule() total for a schedule that changes one
+    (ta_out -> ta_in, shift, role) swap at a time.
+
+    The score splits into a per-shift part (pref, experience, companions),
+    which only depends on who is on that shift, and a per-TA balance part,
+    which only depends on that TA's hours and is counted once per role
+    weight of each of their assignments. A swap therefore only touches one
+    shift and two TAs. With debug=True every applied swap is checked
+    against a full rescore (see full_rescorer).
+    """
+
+    def __init__(self, ctx, schedule, state, debug=False):
+        self.ctx            = ctx
+        self.schedule       = schedule
+        self.state          = state
+        self.hours_assigned = state.hours_assigned
+        self.debug          = debug
+        self.rescore        = full_rescorer(ctx) if debug else None
+
+        # Sum of role weights over each TA's assignments
+        self.weight_sums = {ta["ta_id"]: 0 for ta in ctx.ta_metadata}
+        for assignment in schedule.values():
+            for role, role_key in ROLE_KEYS:
+                for ta_id in assignment[role_key]:
+                    self.weight_sums[ta_id] += ROLE_WEIGHTS[role]
+
+        self.total = score_schedule(ctx, schedule, self.hours_assigned)
+
+    def shift_score(self, shift_id, assignment):
+        """Per-shift part of the score for the given occupants of shift_id."""
+        ctx  = self.ctx
+        view = {shift_id: assignment}
+        total = 0
+        for role, role_key in ROLE_KEYS:
+            for ta_id in assignment[role_key]:
+                total += ROLE_WEIGHTS[role] * (
+                    get_pref(ctx, ta_id, shift_id)
+                    + EXPERIENCE_PENALTY * experience_penalty(ctx, ta_id, shift_id, view)
+                    + companion_boost(ctx, ta_id, shift_id, view)
+                )
+        return total
+
+    def balance_delta(self, ta_id, hours_change, weight_change):
+        """Change in a TA's balance terms if their hours and role weights move."""
+        ta         = get_ta(self.ctx, ta_id)
+        hours      = self.hours_assigned[ta_id]
+        weight_sum = self.weight_sums[ta_id]
+        return (
+            balance_boost(ta, hours + hours_change) * (weight_sum + weight_change)
+            - balance_boost(ta, hours) * weight_sum
+        )
+
+    def swap_delta(self, ta_out, ta_in, shift_id, role):
+        """Score change of replacing ta_out with ta_in in shift_id's role. Does not mutate."""
+        if ta_out == ta_in:
+            return 0
+
+        role_key = role + "s"
+        before   = self.schedule[shift_id]
+        after    = dict(before)
+        after[role_key] = [ta_in if t == ta_out else t for t in before[role_key]]
+
+        weight   = ROLE_WEIGHTS[role]
+        duration = shift_duration_hours(get_shift(self.ctx, shift_id))
+
+        return (
+            self.shift_score(shift_id, after) - self.shift_score(shift_id, before)
+            + self.balance_delta(ta_out, -duration, -weight)
+            + self.balance_delta(ta_in,   duration,  weight)
+        )
+
+    def apply_swap(self, ta_out, ta_in, shift_id, role, delta):
+        """Apply a swap scored by swap_delta and move the running total with it."""
+        if ta_out == ta_in:
+            return
+
+        role_key = role + "s"
+        slots    = self.schedule[shift_id][role_key]
+        slots[slots.index(ta_out)] = ta_in
+
+        remove_ta(self.ctx, ta_out, shift_id, self.state)
+        assign_ta(self.ctx, ta_in,  shift_id, self.state)
+
+        weight = ROLE_WEIGHTS[role]
+        self.weight_sums[ta_out] -= weight
+        self.weight_sums[ta_in]  += weight
+        self.total += delta
+
+        if self.debug:
+            self.check()
+
+    def vacate_delta(self, ta_out, shift_id, role):
+        """Score change of taking ta_out off shift_id's role and leaving the slot empty. Does not mutate."""
+        role_key = role + "s"
+        before   = self.schedule[shift_id]
+        after    = dict(before)
+        after[role_key] = [t for t in before[role_key] if t != ta_out]
+
+        duration = shift_duration_hours(get_shift(self.ctx, shift_id))
+        return (
+            self.shift_score(shift_id, after) - self.shift_score(shift_id, before)
+            + self.balance_delta(ta_out, -duration, -ROLE_WEIGHTS[role])
+        )
+
+    def fill_delta(self, ta_in, shift_id, role):
+        """Score change of adding ta_in to an open slot in shift_id's role. Does not mutate."""
+        role_key = role + "s"
+        before   = self.schedule[shift_id]
+        after    = dict(before)
+        after[role_key] = before[role_key] + [ta_in]
+
+        duration = shift_duration_hours(get_shift(self.ctx, shift_id))
+        return (
+            self.shift_score(shift_id, after) - self.shift_score(shift_id, before)
+            + self.balance_delta(ta_in, duration, ROLE_WEIGHTS[role])
+        )
+
+    def apply_vacate(self, ta_out, shift_id, role, delta):
+        """Apply a move scored by vacate_delta."""
+        self.schedule[shift_id][role + "s"].remove(ta_out)
+        remove_ta(self.ctx, ta_out, shift_id, self.state)
+        self.weight_sums[ta_out] -= ROLE_WEIGHTS[role]
+        self.total += delta
+
+        if self.debug:
+            self.check()
+
+    def apply_fill(self, ta_in, shift_id, role, delta):
+        """Apply a move scored by fill_delta."""
+        self.schedule[shift_id][role + "s"].append(ta_in)
+        assign_ta(self.ctx, ta_in, shift_id, self.state)
+        self.weight_sums[ta_in] += ROLE_WEIGHTS[role]
+        self.total += delta
+
+        if self.debug:
+            self.check()
+
+    def clear_shift(self, shift_id):
+        """Unassign everyone on shift_id and move the running total with it. Returns the score change."""
+        assignment = self.schedule[shift_id]
+        duration   = shift_duration_hours(get_shift(self.ctx, shift_id))
+
+        delta = -self.shift_score(shift_id, assignment)
+        for role, role_key in ROLE_KEYS:
+            weight = ROLE_WEIGHTS[role]
+            for ta_id in assignment[role_key]:
+                delta += self.balance_delta(ta_id, -duration, -weight)
+                remove_ta(self.ctx, ta_id, shift_id, self.state)
+                self.weight_sums[ta_id] -= weight
+            assignment[role_key] = []
+        self.total += delta
+
+        if self.debug:
+            self.check()
+        return delta
+
+    def check(self):
+        """Compare the running total against a full rescore."""
+        full = self.rescore(self.schedule, self.hours_assigned)
+        if not math.isclose(self.total, full, rel_tol=1e-9, abs_tol=1e-6):
+            raise RuntimeError(
+                f"[ScoreTracker] running total {self.total:.6f} "
+                f"drifted from full rescore {full:.6f}"
+            )
+
+def full_rescorer(ctx):
+    """
+    (schedule, hours_assigned) -> score_schedule(), for ScoreTracker.check().
+    With numpy installed this is a VectorScorer, which rescores in array
+    operations and takes hours from the schedule itself, so drifted
+    hours_assigned show up too; otherwise score_schedule().
+    """
+    from helpers.vector_scoring import HAVE_NUMPY, VectorScorer  # imports this module
+
+    if not HAVE_NUMPY:
+        return lambda schedule, hours_assigned: score_schedule(ctx, schedule, hours_assigned)
+    scorer = VectorScorer(ctx)
+    return lambda schedule, hours_assigned: scorer.score(scorer.arrays(schedule))
+
+# ============================================================
+# COST CALCULATOR
+# ============================================================
+
+TA_HOURLY_RATE = 17.43
+TF_HOURLY_RATE = 19.60
+
+def calculate_cost(ctx, hours_assigned):
+    """
+    Calculates total budget cost of a schedule.
+    TFs are paid at a higher rate than TAs.
+    """
+    total = 0
+    for ta in ctx.ta_metadata:
+        ta_id = ta["ta_id"]
+        hours = hours_assigned[ta_id]
+        rate  = TF_HOURLY_RATE if ta["is_tf"] else TA_HOURLY_RATE
+        total += hours * rate
+
     return total
\ No newline at end of file
@@ -0,0 +1,225 @@
+from data.indexed import NUM_ROLES, ROLE_INDEX, ROLE_KEY_BY_INDEX
+from helpers.scoring import ROLE_WEIGHTS, EXPERIENCE_PENALTY
+
+try:
+    import numpy as np
+except ImportError:  # optional: everything else runs on the pure-Python scorer
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# ============================================================
+# VECTORIZED SCORING KERNEL
+# ============================================================
+#
+# score_schedule() as array operations over the schedule's assignments,
+# held as a sparse TA x shift matrix (one (t, s, role weight) entry per
+# assignment, sorted by t * num_shifts + s):
+#
+#   score = sum(w * (prefs[t, s] + EXPERIENCE_PENALTY * inexperienced[t]))
+#         + sum(w * companions of t on s)
+#         + sum(weight_sums * balance(hours))
+#
+# Companions are CSR adjacency lists (and their reverse), so work grows
+# with assignments and companion pairs, not TAs x shifts. Everything
+# matches helpers.scoring term for term, including what it counts: an
+# inexperienced TA always takes the experience penalty for their own
+# assignment, and each companion on the shift adds 1 (COMPANION_BONUS is
+# not applied there, so not here either).
+#
+# ScoreTracker.check() rescores through it when numpy is installed (see
+# helpers.scoring.full_rescorer), and test_vector_scoring.py holds it to
+# helpers.scoring.
+
+class ScheduleArrays:
+    """
+    Array snapshot of one schedule, shared by every VectorScorer query on it:
+        keys         t * num_shifts + s per assignment, sorted
+        ta, shift    TA and shift index per assignment
+        weight       ROLE_WEIGHTS of the assignment's role
+        hours        hours per TA
+        weight_sums  sum of role weights per TA
+    """
+
+    def __init__(self, keys, ta, shift, weight, hours, weight_sums):
+        self.keys        = keys
+        self.ta          = ta
+        self.shift       = shift
+        self.weight      = weight
+        self.hours       = hours
+        self.weight_sums = weight_sums
+
+class VectorScorer:
+    """
+    NumPy versions of score_schedule(), compute_candidate_score() for a
+    batch of TAs, and ScoreTracker.swap_delta() for a batch of swaps.
+    Static data (preferences, min_hours, experience, companions, shift
+    durations) is copied out of ctx.index and ctx.ta_metadata when built,
+    so build it after apply_fairness(). Requires numpy (see HAVE_NUMPY).
+    """
+
+    def __init__(self, ctx):
+        if np is None:
+            raise RuntimeError("[VectorScorer] numpy is not installed")
+
+        index = ctx.index
+        self.index      = index
+        self.num_tas    = index.num_tas
+        self.num_shifts = index.num_shifts
+
+        self.prefs         = np.frombuffer(index.prefs, dtype=np.int8).reshape(self.num_tas, self.num_shifts)
+        self.durations     = np.frombuffer(index.durations, dtype=np.float64).copy()
+        self.inexperienced = np.frombuffer(index.experienced, dtype=np.int8) == 0
+        self.min_hours     = np.array([ta["min_hours"] for ta in ctx.ta_metadata], dtype=np.float64)
+        self.role_weights  = np.array([ROLE_WEIGHTS[role] for role in sorted(ROLE_INDEX, key=ROLE_INDEX.get)])
+
+        # Companion lists t -> c as CSR (repeats kept, as companion_boost
+        # counts them), and the reverse c <- t
+        degree = np.array([len(index.companions[t]) for t in range(self.num_tas)], dtype=np.int64)
+        self.out_start = np.concatenate(([0], np.cumsum(degree)))
+        self.out_to    = np.array([c for t in range(self.num_tas) for c in index.companions[t]], dtype=np.int64)
+        edge_from      = np.repeat(np.arange(self.num_tas), degree)
+
+        order = np.argsort(self.out_to, kind="stable")
+        self.in_start = np.concatenate(([0], np.cumsum(np.bincount(self.out_to, minlength=self.num_tas))))
+        self.in_from  = edge_from[order]
+
+    # --------------------------------------------------------
+    # HELPERS
+    # --------------------------------------------------------
+
+    def balance(self, hours, t=None):
+        """balance_boost() for every TA at the given hours, or for TA indices t."""
+        min_hours = self.min_hours if t is None else self.min_hours[t]
+        below = np.maximum(0.0, min_hours - hours)
+        safe  = np.where(min_hours > 0, min_hours, 1.0)
+        return np.where(min_hours > 0, (below / safe) * 2.0, 0.0)
+
+    def arrays(self, schedule):
+        """ScheduleArrays for a {shift_id: {"leads", "lab_tas", "oh_tas"}} schedule."""
+        index = self.index
+        ta, shift, role = [], [], []
+        for shift_id, assignment in schedule.items():
+            s = index.shift_pos[shift_id]
+            for r in range(NUM_ROLES):
+                for ta_id in assignment[ROLE_KEY_BY_INDEX[r]]:
+                    ta.append(index.ta_pos[ta_id])
+                    shift.append(s)
+                    role.append(r)
+
+        ta    = np.array(ta, dtype=np.int64)
+        shift = np.array(shift, dtype=np.int64)
+        keys  = ta * self.num_shifts + shift
+        order = np.argsort(keys)
+        ta, shift, keys = ta[order], shift[order], keys[order]
+        weight = self.role_weights[np.array(role, dtype=np.int64)[order]] if len(role) else np.zeros(0)
+
+        return ScheduleArrays(
+            keys, ta, shift, weight,
+            hours       = np.bincount(ta, weights=self.durations[shift], minlength=self.num_tas),
+            weight_sums = np.bincount(ta, weights=weight, minlength=self.num_tas),
+        )
+
+    def weight_at(self, arrays, t, s):
+        """Role weight of TA t on shift s (0 where not assigned), elementwise."""
+        if not len(arrays.keys):
+            return np.zeros(np.shape(t))
+        keys = t * self.num_shifts + s
+        pos  = np.minimum(np.searchsorted(arrays.keys, keys), len(arrays.keys) - 1)
+        return np.where(arrays.keys[pos] == keys, arrays.weight[pos], 0.0)
+
+    def _expand(self, start, t):
+        """For index array t: (row, e) pairs over every adjacency entry e of each t[row]."""
+        first  = start[t]
+        degree = start[t + 1] - first
+        row    = np.repeat(np.arange(len(t)), degree)
+        offset = np.arange(len(row)) - np.repeat(np.cumsum(degree) - degree, degree)
+        return row, first[row] + offset
+
+    def companions_on(self, arrays, t, s):
+        """How many of TA t's companions are on shift s, elementwise."""
+        row, e = self._expand(self.out_start, t)
+        hit    = self.weight_at(arrays, self.out_to[e], s[row]) > 0
+        return np.bincount(row, weights=hit, minlength=len(t))
+
+    def listed_by(self, arrays, t, s):
+        """Role weights of the TAs on shift s who list TA t as a companion, elementwise."""
+        row, e = self._expand(self.in_start, t)
+        return np.bincount(row, weights=self.weight_at(arrays, self.in_from[e], s[row]), minlength=len(t))
+
+    def companion_count(self, a, b):
+        """How many times TA b appears in TA a's companion list, elementwise."""
+        row, e = self._expand(self.out_start, a)
+        return np.bincount(row, weights=self.out_to[e] == b[row], minlength=len(a))
+
+    # --------------------------------------------------------
+    # QUERIES
+    # --------------------------------------------------------
+
+    def score(self, arrays):
+        """score_schedule() of the snapshot."""
+        t, s, w = arrays.ta, arrays.shift, arrays.weight
+        return float(
+            (w * (self.prefs[t, s] + EXPERIENCE_PENALTY * self.inexperienced[t])).sum()
+            + (w * self.companions_on(arrays, t, s)).sum()
+            + (arrays.weight_sums * self.balance(arrays.hours)).sum()
+        )
+
+    def candidate_scores(self, arrays, shift_id, ta_ids):
+        """
+        compute_candidate_score() of each TA in ta_ids (none of them on the
+        shift yet) for shift_id, as greedy ranks them. Returns an array
+        in ta_ids order.
+        """
+        s = self.index.shift_pos[shift_id]
+        t = np.array([self.index.ta_pos[ta_id] for ta_id in ta_ids], dtype=np.int64)
+        shift = np.full(len(t), s, dtype=np.int64)
+
+        any_inexperienced = bool(self.inexperienced[arrays.ta[arrays.shift == s]].any())
+        pref        = self.prefs[t, s]
+        bal_boost   = self.balance(arrays.hours[t], t)
+        exp_penalty = EXPERIENCE_PENALTY * (self.inexperienced[t] & any_inexperienced)
+        comp_boost  = self.companions_on(arrays, t, shift)
+        return pref + bal_boost + exp_penalty + comp_boost
+
+    def swap_deltas(self, arrays, moves):
+        """
+        ScoreTracker.swap_delta() for a batch of (ta_out, ta_in, shift_id,
+        role) swaps, each scored on its own against the snapshot. Returns
+        an array of deltas in moves order.
+        """
+        if not moves:
+            return np.zeros(0)
+
+        index = self.index
+        out = np.array([index.ta_pos[m[0]] for m in moves], dtype=np.int64)
+        inn = np.array([index.ta_pos[m[1]] for m in moves], dtype=np.int64)
+        s   = np.array([index.shift_pos[m[2]] for m in moves], dtype=np.int64)
+        w   = self.role_weights[[ROLE_INDEX[m[3]] for m in moves]]
+        d   = self.durations[s]
+
+        # The shift's own part: prefs and experience of the swapped TAs,
+        # their companion counts, and the counts of everyone else on the
+        # shift who lists either of them
+        static = lambda t: self.prefs[t, s] + EXPERIENCE_PENALTY * self.inexperienced[t]
+        shift_delta = (
+            w * (static(inn) - static(out))
+            + w * (self.companions_on(arrays, inn, s) - self.companion_count(inn, out) + self.companion_count(inn, inn))
+            - w * self.companions_on(arrays, out, s)
+            + self.listed_by(arrays, inn, s) - self.listed_by(arrays, out, s)
+            - w * (self.companion_count(out, inn) - self.companion_count(out, out))
+        )
+
+        # Balance terms of the two TAs
+        hours, weight_sums, balance = arrays.hours, arrays.weight_sums, self.balance
+        balance_delta = (
+            balance(hours[out] - d, out) * (weight_sums[out] - w) - balance(hours[out], out) * weight_sums[out]
+            + balance(hours[inn] + d, inn) * (weight_sums[inn] + w) - balance(hours[inn], inn) * weight_sums[inn]
+        )
+
+        return np.where(out == inn, 0.0, shift_delta + balance_delta)
+
+def vector_score_schedule(ctx, schedule):
+    """score_schedule() through a one-off VectorScorer."""
+    scorer = VectorScorer(ctx)
+    return scorer.score(scorer.arrays(schedule))
@@ -1,83 +1,79 @@
-from data.context import SchedulerContext
-from helpers.constraints import *
-from simulated_annealing import *
-from helpers.scoring import *
-from reducer import *
-from data.parsers import *
+from solver import *
 from data.db_connection import *
-from helpers.data_access import init_lookups
+from helpers.log import get_logger
+import os
+import time
 
-# ============================================================
-# BUILD CONTEXT AND RUN SCHEDULER
-# ============================================================
+# Latency SLA in seconds for the whole run (unset = fixed iteration count).
+TIME_LIMIT_S = float(os.getenv("SOLVER_TIME_LIMIT", "0")) or None
+
+# URL of a running solver_service.py; when set, the run is handed to it
+# instead of being solved in this process
+SOLVER_URL = os.getenv("SOLVER_URL")
+
+# Start from the schedule already posted to the DB (its tas_scheduled lists)
+# and only repair what changed, instead of a fresh greedy + anneal
+WARM_START = os.getenv("SOLVER_WARM_START", "0") == "1"
 
-print("="*60)
-print("[MAIN] Starting TA Scheduler Algorithm")
-print("="*60)
+# Re-solve even if the result cache already has this exact input
+CACHE_BYPASS = os.getenv("SOLVER_CACHE_BYPASS", "0") == "1"
 
-# Step 1: Fetch data from backend (schedule_id is now dynamic)
-raw_tas, raw_schedule, SCHEDULE_ID = fetch_schedule()
+_log = get_logger("MAIN")
 
-print(f"\n[MAIN] Using SCHEDULE_ID = {SCHEDULE_ID} (from DB, not hardcoded)")
+# ============================================================
+# BUILD CONTEXT AND RUN SCHEDULER
+# ============================================================
 
-# Step 2: Parse into algorithm format
-shift_metadata    = fetch_shifts(raw_schedule)
-ta_metadata       = parse_tas(raw_tas)
-preference_matrix = parse_preference_matrix(raw_tas, shift_metadata)
+def main():
+    started = time.perf_counter()
+    _log.info("Starting TA Scheduler Algorithm")
 
-print(f"\n[MAIN] Parsed {len(shift_metadata)} shifts:")
-for s in shift_metadata:
-    print(f"  shift_id='{s['shift_id']}' day={s['day']} "
-          f"{s['start'].strftime('%H:%M')}-{s['end'].strftime('%H:%M')} "
-          f"is_lab={s['is_lab']} staffing={s['staffing']}")
+    if SOLVER_URL:
+        result = request_solve(SOLVER_URL, time_limit_s=TIME_LIMIT_S, warm_start=WARM_START,
+                               use_cache=not CACHE_BYPASS, instrument=INSTRUMENT)
+        _log.info(f"Service solved schedule {result['schedule_id']} in {result['seconds']:.2f}s, "
+                  f"score={result['score']:.2f}, posted={result['posted']}")
+        return
 
-print(f"\n[MAIN] Parsed {len(ta_metadata)} TAs:")
-for ta in ta_metadata:
-    print(f"  ta_id='{ta['ta_id']}' name='{ta['name']}' "
-          f"lab_admin_status={ta['lab_admin_status']} is_tf={ta['is_tf']} "
-          f"min_hours={ta['min_hours']} max_hours={ta['max_hours']}")
+    # Phase timings, call counters and annealing telemetry for the whole
+    # run, posted with the schedule (SOLVER_INSTRUMENT / SOLVER_PROFILE)
+    if INSTRUMENT:
+        start_instrumentation()
 
-print(f"\n[MAIN] Preference matrix summary:")
-for ta_id, prefs in preference_matrix.items():
-    nonzero = {k: v for k, v in prefs.items() if v > 0}
-    print(f"  TA '{ta_id}': {len(prefs)} total prefs, {len(nonzero)} available/preferred")
-    if nonzero:
-        for sid, score in nonzero.items():
-            label = "PREFERRED" if score == 2 else "available"
-            print(f"    shift '{sid}' -> {score} ({label})")
+    # Step 1: Fetch data from backend (schedule_id is now dynamic)
+    with phase("fetch"):
+        raw_tas, raw_schedule, SCHEDULE_ID = fetch_schedule()
 
-# Step 3: Build context and initialize lookups
-ctx = SchedulerContext(ta_metadata, shift_metadata, preference_matrix)
-init_lookups(ctx)
+    _log.info(f"Using SCHEDULE_ID = {SCHEDULE_ID} (from DB, not hardcoded)")
 
-print(f"\n[MAIN] Context built. Applying fairness constraints...")
-apply_fairness(ctx)
+    # Step 2: Parse into algorithm format and build the context
+    ctx = build_context(raw_tas, raw_schedule)
 
-print(f"\n[MAIN] After fairness adjustment:")
-for ta in ctx.ta_metadata:
-    print(f"  TA '{ta['ta_id']}': min_hours={ta['min_hours']:.1f}, max_hours={ta['max_hours']:.1f}")
+    # Step 3: Run simulated annealing (includes greedy as starting point,
+    # or the previous schedule when warm-starting)
+    previous = parse_previous_assignments(raw_schedule, ctx.shift_metadata) if WARM_START else None
+    payload  = solve(ctx, time_limit_s=TIME_LIMIT_S, started=started, previous=previous,
+                     use_cache=not CACHE_BYPASS)
 
-# Step 4: Run simulated annealing (includes greedy as starting point)
-print(f"\n[MAIN] Running simulated annealing (includes greedy init)...")
-schedule, hours_assigned, score = simulated_annealing(ctx)
-display_results(ctx, schedule, hours_assigned, score)
+    report = stop_report()
+    if report is not None:
+        _log.info(f"Instrumentation: {report.summary()}")
+        payload = {**payload, "instrumentation": report.to_dict()}
 
-print("\n--- FULL SCHEDULE COST ---")
-print(calculate_cost(ctx, hours_assigned))
+    # ============================================================
+    # POST FILLED SCHEDULE BACK TO DB
+    # ============================================================
 
-# ============================================================
-# POST FILLED SCHEDULE BACK TO DB
-# ============================================================
+    _log.info(f"Posting schedule to DB (schedule_id={SCHEDULE_ID})")
+    try:
+        result = post_schedule(SCHEDULE_ID, payload)
+        _log.info(f"Successfully posted schedule {SCHEDULE_ID} to DB")
+    except Exception as e:
+        _log.error(f"Could not post schedule to DB: {e}")
+        import traceback
+        traceback.print_exc()
 
-print(f"\n--- POSTING SCHEDULE TO DB (schedule_id={SCHEDULE_ID}) ---")
-try:
-    serialized = serialize_schedule(ctx, schedule)
-    result = post_schedule(SCHEDULE_ID, {
-        **serialized,
-        "score": score
-    })
-    print(f"[MAIN] Successfully posted schedule {SCHEDULE_ID} to DB")
-except Exception as e:
-    print(f"[MAIN] ERROR: Could not post schedule to DB: {e}")
-    import traceback
-    traceback.print_exc()
+# Guarded so worker processes (which re-import this module under the
+# "spawn" start method) don't re-run the whole pipeline.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from simulated_annealing import *
+
+# ============================================================
+# MULTI-START PARALLEL ANNEALING
+# ============================================================
+
+# Set once per worker process by _init_worker so the context is pickled
+# once per worker instead of once per chain.
+_worker_ctx = None
+
+def _init_worker(ctx):
+    global _worker_ctx
+    _worker_ctx = ctx
+
+def _run_chain(chain_id, seed, perturb_steps, sa_kwargs, deadline=None, ctx=None):
+    ctx = ctx if ctx is not None else _worker_ctx
+
+    # deadline is a time.time() value: perf_counter() is not comparable
+    # across processes
+    if deadline is not None:
+        sa_kwargs = {**sa_kwargs, "time_limit_s": max(0.0, deadline - time.time())}
+
+    started = time.perf_counter()
+    schedule, hours_assigned, score = simulated_annealing(
+        ctx, seed=seed, perturb_steps=perturb_steps, **sa_kwargs
+    )
+
+    return {
+        "chain":          chain_id,
+        "seed":           seed,
+        "perturb_steps":  perturb_steps,
+        "score":          score,
+        "cost":           calculate_cost(ctx, hours_assigned),
+        "seconds":        time.perf_counter() - started,
+        "schedule":       schedule,
+        "hours_assigned": hours_assigned,
+    }
+
+def parallel_simulated_annealing(ctx, num_chains=None, max_workers=None, seed=None,
+                                 perturb_steps=50, **sa_kwargs):
+    """
+    Run independent annealing chains across CPU cores and keep the best.
+    Chain 0 starts from the plain greedy schedule; every other chain first
+    applies perturb_steps random swaps so the chains explore different
+    regions. Chain i uses seed + i. Any other keyword arguments go to
+    simulated_annealing(); with a budget among them, chains that came in
+    under it beat those that didn't.
+    A time_limit_s among them is for the whole run, counted from this
+    call (worker start-up included). With more chains than workers the
+    chains run in rounds of max_workers, and round r of n stops at
+    (r + 1) / n of the limit.
+    Returns schedule, hours_assigned, score and a list of per-chain stats.
+    """
+    started      = time.time()
+    time_limit_s = sa_kwargs.pop("time_limit_s", None)
+    max_workers  = max_workers or os.cpu_count() or 1
+    num_chains   = num_chains or max_workers
+    base_seed    = seed if seed is not None else random.randrange(2**32)
+
+    num_workers = min(max_workers, num_chains)
+    num_rounds  = math.ceil(num_chains / num_workers)
+
+    def deadline(chain_id):
+        if time_limit_s is None:
+            return None
+        return started + time_limit_s * (chain_id // num_workers + 1) / num_rounds
+
+    jobs = [
+        (chain_id, base_seed + chain_id, 0 if chain_id == 0 else perturb_steps, sa_kwargs, deadline(chain_id))
+        for chain_id in range(num_chains)
+    ]
+
+    if num_workers == 1:
+        results = [_run_chain(*job, ctx=ctx) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(ctx,),
+        ) as pool:
+            futures = [pool.submit(_run_chain, *job) for job in jobs]
+            results = [future.result() for future in futures]
+
+    budget = sa_kwargs.get("budget")
+    best = max(results, key=lambda result: (
+        budget is None or result["cost"] <= budget + 1e-6,
+        result["score"],
+    ))
+    chain_stats = [
+        {key: value for key, value in result.items() if key not in ("schedule", "hours_assigned")}
+        for result in results
+    ]
+
+    return best["schedule"], best["hours_assigned"], best["score"], chain_stats
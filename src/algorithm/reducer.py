@@ -1,153 +1,547 @@
-from copy import deepcopy
-from helpers.data_access import *
-from helpers.constraints import *
-from helpers.scoring import *
-
-# ============================================================
-# READJUST MIN HOURS TO ENABLE REDUCTION
-# ============================================================
-
-def apply_reduced_fairness_floor(ctx, target_budget, threshold=0.9):
-    """
-    Recalculates min_hours for each TA based on what's affordable
-    at the target budget rather than the full schedule cost.
-    Should be called before reduce_schedule.
-    """
-    # Figure out total affordable hours at target budget
-    # Use a blended rate across TAs as an approximation
-    total_tas  = len(ctx.ta_metadata)
-    num_tfs    = sum(1 for ta in ctx.ta_metadata if ta["is_tf"])
-    num_tas    = total_tas - num_tfs
-    blended_rate = (num_tfs * TF_HOURLY_RATE + num_tas * TA_HOURLY_RATE) / total_tas
-
-    affordable_hours = target_budget / blended_rate
-    fair_share       = affordable_hours / total_tas
-    fairness_floor   = fair_share * threshold
-
-    for ta in ctx.ta_metadata:
-        new_min = min(ta["min_hours"], int(fairness_floor))  # only lower, never raise
-        if new_min != ta["min_hours"]:
-            ta["min_hours"] = new_min
-
-# ============================================================
-# SCHEDULE REDUCER
-# ============================================================
-
-def reduce_schedule(ctx, schedule, hours_assigned, target_budget):
-    """
-    Takes an existing schedule and removes shifts until total cost
-    is under target_budget.
-    Removes lowest priority shifts first.
-    Within the same priority, removes shifts whose removal brings
-    the hours distribution closest to even.
-    Never removes a shift that would drop a TA below min_hours.
-    Returns the reduced schedule and updated hours_assigned.
-    """
-    schedule       = deepcopy(schedule)
-    hours_assigned = deepcopy(hours_assigned)
-
-    # --------------------------------------------------------
-    # INNER HELPERS
-    # --------------------------------------------------------
-
-    def current_cost():
-        return calculate_cost(ctx, hours_assigned)
-
-    def hours_std_dev():
-        """Lower std dev = more even distribution."""
-        hours    = [hours_assigned[ta["ta_id"]] for ta in ctx.ta_metadata]
-        mean     = sum(hours) / len(hours)
-        variance = sum((h - mean) ** 2 for h in hours) / len(hours)
-        return variance ** 0.5
-
-    def all_tas_on_shift(shift_id):
-        assignment = schedule[shift_id]
-        return (
-            assignment["leads"] +
-            assignment["lab_tas"] +
-            assignment["oh_tas"]
-        )
-
-    def can_remove(shift_id):
-        """
-        A shift can only be removed if:
-        - It is not a lab shift
-        - No TA assigned to it would drop below their min_hours as a result
-        """
-        if get_shift(ctx, shift_id)["is_lab"]:
-            return False
-        shift    = get_shift(ctx, shift_id)
-        duration = shift_duration_hours(shift)
-        for ta_id in all_tas_on_shift(shift_id):
-            ta = get_ta(ctx, ta_id)
-            if hours_assigned[ta_id] - duration < ta["min_hours"]:
-                return False
-        return True
-
-    def removal_score(shift_id):
-        """
-        Simulate removing this shift and return the resulting std dev.
-        Lower is better — prefer the removal that evens out hours most.
-        """
-        shift    = get_shift(ctx, shift_id)
-        duration = shift_duration_hours(shift)
-        tas      = all_tas_on_shift(shift_id)
-
-        for ta_id in tas:
-            hours_assigned[ta_id] -= duration
-        std = hours_std_dev()
-        for ta_id in tas:
-            hours_assigned[ta_id] += duration
-
-        return std
-
-    def remove_shift(shift_id):
-        shift    = get_shift(ctx, shift_id)
-        duration = shift_duration_hours(shift)
-        for ta_id in all_tas_on_shift(shift_id):
-            hours_assigned[ta_id] -= duration
-        schedule[shift_id]["leads"]   = []
-        schedule[shift_id]["lab_tas"] = []
-        schedule[shift_id]["oh_tas"]  = []
-
-    # --------------------------------------------------------
-    # REDUCTION LOOP
-    # --------------------------------------------------------
-
-    # Reduce min hours
-    apply_reduced_fairness_floor(ctx, target_budget)
-
-    iterations = 0
-    while current_cost() > target_budget:
-
-        # All filled, non-error shifts that can be removed without
-        # violating anyone's min_hours
-        removable = [
-            shift_id for shift_id, assignment in schedule.items()
-            if (assignment["leads"] or assignment["lab_tas"] or assignment["oh_tas"])
-            and not assignment["unschedulable"]
-            and can_remove(shift_id)
-        ]
-
-        if not removable:
-            print("Cannot reduce further — all remaining shifts are protected by min_hours constraints.")
-            break
-
-        # Sort ascending by priority (least important first)
-        # then by removal_score ascending (prefer removals that even out hours)
-        removable.sort(key=lambda s_id: (
-            shift_priority(ctx, s_id),
-            removal_score(s_id)
-        ))
-
-        shift_to_remove = removable[0]
-
-        remove_shift(shift_to_remove)
-
-        iterations += 1
-        if iterations > 100:
-            print("Stopping after 100 removals — check your target budget.")
-            break
-
-    print(f"\nFinal cost: ${current_cost():.2f} after {iterations} shift removals")
-    return schedule, hours_assigned
\ No newline at end of file
+import heapq
+import math
+import time
+from copy import deepcopy
+from helpers.data_access import *
+from helpers.constraints import *
+from helpers.scoring import *
+from helpers.log import get_logger
+from helpers.instrument import phase
+
+_log = get_logger("REDUCER")
+
+# ============================================================
+# READJUST MIN HOURS TO ENABLE REDUCTION
+# ============================================================
+
+def reduced_fairness_floor(ctx, target_budget, threshold=0.9):
+    """
+    min_hours for each TA based on what's affordable at the target
+    budget rather than the full schedule cost: {ta_id: min_hours}.
+    Only ever lowers a TA's min_hours. Does not modify ctx.
+    """
+    # Figure out total affordable hours at target budget
+    # Use a blended rate across TAs as an approximation
+    total_tas  = len(ctx.ta_metadata)
+    num_tfs    = sum(1 for ta in ctx.ta_metadata if ta["is_tf"])
+    num_tas    = total_tas - num_tfs
+    blended_rate = (num_tfs * TF_HOURLY_RATE + num_tas * TA_HOURLY_RATE) / total_tas
+
+    affordable_hours = target_budget / blended_rate
+    fair_share       = affordable_hours / total_tas
+    fairness_floor   = fair_share * threshold
+
+    return {
+        ta["ta_id"]: min(ta["min_hours"], int(fairness_floor))  # only lower, never raise
+        for ta in ctx.ta_metadata
+    }
+
+def apply_reduced_fairness_floor(ctx, target_budget, threshold=0.9):
+    """
+    New context with reduced_fairness_floor() as min_hours, for callers
+    that want later scoring against the lowered min_hours. The reducers
+    below don't need it - they compute the floor themselves.
+    """
+    floor = reduced_fairness_floor(ctx, target_budget, threshold)
+    return ctx.with_ta_updates({ta_id: {"min_hours": min_hours} for ta_id, min_hours in floor.items()})
+
+# ============================================================
+# SCHEDULE REDUCER
+# ============================================================
+
+class IncrementalReducer:
+    """
+    Greedy budget reduction that can be resumed: each reduce_to() call
+    removes shifts from where the last one stopped, so a falling sequence
+    of budgets costs one pass in total. Removes lowest priority shifts
+    first; within the same priority, the shift whose removal brings the
+    hours distribution closest to even; ties in schedule order. Never
+    removes a lab shift or one that would drop a TA below min_hours.
+
+    Candidate bookkeeping: with n TAs, T and S2 the running sum and sum of
+    squares of hours, removing a shift of duration d whose k TAs hold H
+    hours between them leaves
+        n² · variance = n·S2 - T² + n·d·(c - 2H) - c² + 2T·c,   c = k·d
+    Everything but n·d·(c - 2H) is shared by shifts with the same c, and
+    that term only moves when one of the shift's own TAs loses hours. So
+    candidates sit in one heap per (priority, c), keyed on n·d·(c - 2H); a
+    removal re-keys just the shifts sharing a TA with it (stale entries
+    are skipped by version), and only the bucket heads are compared on the
+    exact post-removal std dev.
+
+    schedule is deep-copied. removed lists shift_ids in removal order;
+    with track_score=True, score follows score_schedule() as shifts go.
+    """
+
+    def __init__(self, ctx, schedule, min_hours=None, track_score=False):
+        self.ctx      = ctx
+        self.schedule = deepcopy(schedule)
+        self.state    = AssignmentState.from_schedule(ctx, self.schedule)
+        self.hours_assigned = self.state.hours_assigned
+        self.tracker  = ScoreTracker(ctx, self.schedule, self.state) if track_score else None
+
+        self.min_hours = min_hours or {ta["ta_id"]: ta["min_hours"] for ta in ctx.ta_metadata}
+        self.rates     = {ta["ta_id"]: TF_HOURLY_RATE if ta["is_tf"] else TA_HOURLY_RATE for ta in ctx.ta_metadata}
+        self.cost      = calculate_cost(ctx, self.hours_assigned)
+        self.removed   = []
+
+        index = ctx.index
+        self.durations = {}
+        self.position  = {}  # schedule order, the tie-break between equal removals
+        self.priority  = {}
+        self.versions  = {}  # None once a shift is removed or blocked
+        self.blocked   = []  # candidates that failed can_remove under the current min_hours
+        self.buckets   = {}  # priority -> {c: heap of (key, position, version, shift_id)}
+
+        for pos, (shift_id, assignment) in enumerate(self.schedule.items()):
+            s = index.shift_pos[shift_id]
+            if index.is_lab[s] or assignment["unschedulable"] or not self.tas_on_shift(shift_id):
+                continue
+            self.durations[shift_id] = index.durations[s]
+            self.position[shift_id]  = pos
+            self.priority[shift_id]  = shift_priority(ctx, shift_id)
+            self.versions[shift_id]  = 0
+            self.buckets.setdefault(self.priority[shift_id], {})
+            self._push(shift_id)
+
+    @property
+    def score(self):
+        return self.tracker.total if self.tracker is not None else None
+
+    def tas_on_shift(self, shift_id):
+        assignment = self.schedule[shift_id]
+        return (
+            assignment["leads"] +
+            assignment["lab_tas"] +
+            assignment["oh_tas"]
+        )
+
+    def set_min_hours(self, min_hours):
+        """Switch to new min_hours (e.g. a lower budget's floor); blocked shifts get another look."""
+        self.min_hours = min_hours
+        blocked, self.blocked = self.blocked, []
+        for shift_id in blocked:
+            self.versions[shift_id] = 0
+            self._push(shift_id)
+
+    # --------------------------------------------------------
+    # INNER HELPERS
+    # --------------------------------------------------------
+
+    def can_remove(self, shift_id):
+        """No TA on the shift may drop below their min_hours."""
+        duration = self.durations[shift_id]
+        for ta_id in self.tas_on_shift(shift_id):
+            if self.hours_assigned[ta_id] - duration < self.min_hours[ta_id]:
+                return False
+        return True
+
+    def removal_score(self, shift_id):
+        """
+        Simulate removing this shift and return the resulting std dev.
+        Lower is better — prefer the removal that evens out hours most.
+        Read from the state's running totals, so O(TAs on the shift);
+        rounded so float noise doesn't break ties between equal removals.
+        """
+        duration = self.durations[shift_id]
+        variance = self.state.variance_after(
+            (ta_id, -duration) for ta_id in self.tas_on_shift(shift_id)
+        )
+        return round(variance ** 0.5, 9)
+
+    def _push(self, shift_id):
+        tas = self.tas_on_shift(shift_id)
+        d   = self.durations[shift_id]
+        c   = len(tas) * d
+        key = self.state.num_tas * d * (c - 2 * sum(self.hours_assigned[ta_id] for ta_id in tas))
+        self.versions[shift_id] += 1
+        heap = self.buckets[self.priority[shift_id]].setdefault(c, [])
+        heapq.heappush(heap, (key, self.position[shift_id], self.versions[shift_id], shift_id))
+
+    def _bucket_head(self, heap):
+        """Best live, removable entry of a bucket, dropping the rest on the way."""
+        while heap:
+            _, _, version, shift_id = heap[0]
+            if version == self.versions[shift_id]:
+                if self.can_remove(shift_id):
+                    return shift_id
+                # Hours only go down, so it stays blocked until min_hours changes
+                self.versions[shift_id] = None
+                self.blocked.append(shift_id)
+            heapq.heappop(heap)
+        return None
+
+    def _remove_shift(self, shift_id):
+        affected = self.tas_on_shift(shift_id)
+        duration = self.durations[shift_id]
+        if self.tracker is not None:
+            self.tracker.clear_shift(shift_id)
+        else:
+            for ta_id in affected:
+                remove_ta(self.ctx, ta_id, shift_id, self.state)
+            self.schedule[shift_id]["leads"]   = []
+            self.schedule[shift_id]["lab_tas"] = []
+            self.schedule[shift_id]["oh_tas"]  = []
+        for ta_id in affected:
+            self.cost -= self.rates[ta_id] * duration
+
+        self.versions[shift_id] = None
+        self.removed.append(shift_id)
+
+        # Re-key the shifts that share a TA with the removed one
+        for s_id in {s_id for ta_id in affected for s_id in self.state.current_assignments[ta_id]}:
+            if self.versions.get(s_id) is not None:
+                self._push(s_id)
+
+    # --------------------------------------------------------
+    # REDUCTION LOOP
+    # --------------------------------------------------------
+
+    def reduce_to(self, target_budget):
+        """Remove shifts until cost <= target_budget or nothing more can go. Returns whether it got there."""
+        while self.cost > target_budget:
+
+            # Least important group with a removable shift
+            heads = []
+            for priority in sorted(self.buckets):
+                heads = [
+                    shift_id for shift_id in map(self._bucket_head, self.buckets[priority].values())
+                    if shift_id is not None
+                ]
+                if heads:
+                    break
+
+            if not heads:
+                return False
+
+            # Then the removal that evens out hours most, then schedule order
+            self._remove_shift(min(heads, key=lambda s_id: (self.removal_score(s_id), self.position[s_id])))
+
+            # Re-sum near the target so float drift in the running cost
+            # can't decide whether one more shift goes
+            if self.cost - target_budget < 1e-6 * max(1.0, abs(target_budget)):
+                self.cost = calculate_cost(self.ctx, self.hours_assigned)
+
+        return True
+
+def reduce_schedule(ctx, schedule, hours_assigned, target_budget):
+    """
+    Takes an existing schedule and removes shifts until total cost
+    is under target_budget, in IncrementalReducer's order, with min_hours
+    lowered to reduced_fairness_floor(target_budget). ctx is not modified.
+    Hours are rebuilt from the schedule into an AssignmentState, so
+    hours_assigned must describe the same schedule.
+    Returns the reduced schedule and updated hours_assigned.
+    """
+    with phase("reduce"):
+        reducer = IncrementalReducer(ctx, schedule, reduced_fairness_floor(ctx, target_budget))
+        reached = reducer.reduce_to(target_budget)
+    if not reached:
+        _log.warning("Cannot reduce further — all remaining shifts are protected by min_hours constraints.")
+
+    cost = calculate_cost(ctx, reducer.hours_assigned)
+    _log.info(f"Final cost: ${cost:.2f} after {len(reducer.removed)} shift removals")
+    return reducer.schedule, reducer.hours_assigned
+
+# ============================================================
+# BUDGET SWEEP
+# ============================================================
+
+class BudgetSweep:
+    """
+    Result of budget_sweep(). points runs from the highest budget down,
+    one dict per budget:
+        budget, cost, score   the reduced schedule at that budget
+        removed               number of shifts removed by then
+        reached               whether cost <= budget
+    Each point's schedule is the previous one minus some more shifts;
+    schedule_at() rebuilds it by replaying removal_order.
+    """
+
+    def __init__(self, ctx, schedule, points, removal_order):
+        self.ctx           = ctx
+        self.schedule      = schedule
+        self.points        = points
+        self.removal_order = removal_order
+
+    def point_for(self, budget):
+        for point in self.points:
+            if math.isclose(point["budget"], budget, rel_tol=1e-9, abs_tol=1e-6):
+                return point
+        raise KeyError(f"[BudgetSweep] No sweep point for budget {budget}")
+
+    def schedule_at(self, budget):
+        """Reduced schedule and hours_assigned at one of the swept budgets."""
+        point    = self.point_for(budget)
+        schedule = deepcopy(self.schedule)
+        state    = AssignmentState.from_schedule(self.ctx, schedule)
+        for shift_id in self.removal_order[:point["removed"]]:
+            for role_key in ("leads", "lab_tas", "oh_tas"):
+                for ta_id in schedule[shift_id][role_key]:
+                    remove_ta(self.ctx, ta_id, shift_id, state)
+                schedule[shift_id][role_key] = []
+        return schedule, state.hours_assigned
+
+def budget_sweep(ctx, schedule, budgets=None, num_points=20):
+    """
+    Reduce one schedule to a whole list of target budgets in a single
+    incremental pass, highest budget first. Each budget gets its own
+    reduced_fairness_floor, which only loosens as budgets fall, so the
+    chain picks up where the previous budget stopped. Where a floor blocks
+    a removal, a point can differ from an independent reduce_schedule()
+    run, but the points stay nested - a lower budget only removes more.
+    budgets=None sweeps num_points budgets evenly from the full schedule
+    cost down to zero. Scores use ctx's own min_hours, so points compare
+    like for like. ctx is not modified. Returns a BudgetSweep.
+    """
+    reducer = IncrementalReducer(ctx, schedule, track_score=True)
+
+    if budgets is None:
+        full    = reducer.cost
+        budgets = [full * (num_points - 1 - i) / (num_points - 1) for i in range(num_points)] if num_points > 1 else [full]
+
+    points = []
+    for budget in sorted(set(budgets), reverse=True):
+        reducer.set_min_hours(reduced_fairness_floor(ctx, budget))
+        reached = reducer.reduce_to(budget)
+        points.append({
+            "budget":  budget,
+            "cost":    calculate_cost(ctx, reducer.hours_assigned),
+            "score":   reducer.score,
+            "removed": len(reducer.removed),
+            "reached": reached,
+        })
+
+    _log.info(lambda: f"Budget sweep: {len(points)} budgets, {len(reducer.removed)} shifts removed in total, "
+                      f"lowest reachable cost ${points[-1]['cost']:.2f}" if points else "Budget sweep: no budgets")
+    return BudgetSweep(ctx, schedule, points, list(reducer.removed))
+
+# ============================================================
+# EXACT (KNAPSACK) REDUCER
+# ============================================================
+
+# Node budget for the branch-and-bound search; the time limit usually binds first
+EXACT_MAX_NODES = 200000
+
+# Frame kinds on the search stack
+VISIT, UNDO = 0, 1
+
+def reduce_schedule_exact(ctx, schedule, hours_assigned, target_budget, time_limit_s=2.0,
+                          max_nodes=EXACT_MAX_NODES):
+    """
+    Alternative to reduce_schedule: picks the set of OH shifts to drop
+    so that cost <= target_budget while keeping as much total
+    shift_priority as possible, with every TA left at or above min_hours
+    (lowered to reduced_fairness_floor, as in reduce_schedule).
+
+    Solved as a knapsack by depth-first branch and bound: shifts are tried
+    in order of priority lost per dollar saved, and each node is bounded by
+    the fractional knapsack over the shifts still allowed. The greedy
+    reducer's result seeds the incumbent. Before searching, the most any
+    removal could save (per TA: their rate times the largest total of
+    their removable shifts' hours that fits above their floor) is checked
+    against what has to be saved, which proves most unreachable budgets
+    infeasible at once. The search stops after time_limit_s seconds or
+    max_nodes nodes and keeps the best set found.
+
+    Worth it where the removals needed number in the tens to low hundreds
+    (a course-sized schedule, or a cut of a few percent): it then usually
+    proves optimality or closes the gap to well under 1%. For deep cuts
+    of department-scale schedules it seldom beats the greedy reducer
+    within the time limit and mostly serves to report the gap.
+
+    Returns the reduced schedule, updated hours_assigned and a report:
+        status              "optimal", "feasible" (stopped early),
+                            "infeasible" (budget unreachable) or "unsolved"
+                            (stopped before finding a removal that reaches
+                            it); without a solution the greedy reducer's
+                            best effort is returned
+        retained_priority   total shift_priority of the filled OH shifts kept
+        priority_bound      upper bound on retained_priority for any valid removal
+        gap                 (priority_bound - retained_priority) / priority_bound
+        nodes, seconds      search effort
+    """
+    started  = time.perf_counter()
+    deadline = started + time_limit_s if time_limit_s is not None else None
+
+    # Greedy result first: the fallback, and the incumbent to beat
+    greedy_schedule, greedy_hours = reduce_schedule(ctx, schedule, hours_assigned, target_budget)
+
+    state = AssignmentState.from_schedule(ctx, schedule)
+    index = ctx.index
+    cost  = calculate_cost(ctx, state.hours_assigned)
+    need  = cost - target_budget
+
+    min_hours = reduced_fairness_floor(ctx, target_budget)
+    slack     = {ta_id: state.hours_assigned[ta_id] - min_hours[ta_id] for ta_id in min_hours}
+    rates = {ta["ta_id"]: TF_HOURLY_RATE if ta["is_tf"] else TA_HOURLY_RATE for ta in ctx.ta_metadata}
+
+    # Items: removable shifts as (priority, saving, duration, tas, shift_id)
+    items = []
+    for shift_id, assignment in schedule.items():
+        s   = index.shift_pos[shift_id]
+        tas = assignment["leads"] + assignment["lab_tas"] + assignment["oh_tas"]
+        if index.is_lab[s] or assignment["unschedulable"] or not tas:
+            continue
+        duration = index.durations[s]
+        saving   = sum(rates[ta_id] for ta_id in tas) * duration
+        items.append((shift_priority(ctx, shift_id), saving, duration, tas, shift_id))
+    items.sort(key=lambda item: (item[0] / item[1], -item[1]))
+
+    total_priority = sum(item[0] for item in items)
+    num_items      = len(items)
+
+    EPS = 1e-6  # dollars; savings are float sums
+
+    def fits(item):
+        duration = item[2]
+        return all(slack[ta_id] >= duration for ta_id in item[3])
+
+    def max_saving():
+        """Most any set of removals can save, summed per TA over the shifts that fit now."""
+        removable = {}
+        for item in items:
+            if fits(item):
+                for ta_id in item[3]:
+                    removable.setdefault(ta_id, []).append(item[2])
+        total = 0.0
+        for ta_id, durations in removable.items():
+            sums = {0.0}
+            for duration in durations:
+                sums |= {round(x + duration, 6) for x in sums if x + duration <= slack[ta_id] + EPS}
+            total += rates[ta_id] * max(sums)
+        return total
+
+    # --------------------------------------------------------
+    # BRANCH AND BOUND
+    # --------------------------------------------------------
+
+    def lower_bound(i, need):
+        """Least priority that still has to go to save need from items[i:], or None."""
+        lost = 0.0
+        for item in items[i:]:
+            if need <= EPS:
+                break
+            if not fits(item):
+                continue  # slack only shrinks further down this branch
+            priority, saving = item[0], item[1]
+            if saving >= need:
+                return lost + priority * need / saving
+            lost += priority
+            need -= saving
+        return lost if need <= EPS else None
+
+    removed     = []
+    best_loss   = math.inf
+    best_set    = None
+    open_bounds = []  # bounds of subtrees left unexplored when the search stopped
+    nodes       = 0
+
+    greedy_removed = {
+        shift_id for shift_id, assignment in schedule.items()
+        if (assignment["leads"] or assignment["lab_tas"] or assignment["oh_tas"])
+        and not (greedy_schedule[shift_id]["leads"] or greedy_schedule[shift_id]["lab_tas"]
+                 or greedy_schedule[shift_id]["oh_tas"])
+    }
+    if calculate_cost(ctx, greedy_hours) <= target_budget + EPS:
+        best_loss = sum(shift_priority(ctx, shift_id) for shift_id in greedy_removed)
+        best_set  = greedy_removed
+
+    def search():
+        """
+        Depth-first over (drop, keep) for each item in order, on an explicit
+        stack so depth isn't bounded by the recursion limit. Dropping
+        applies the item's slack and pushes an undo frame that runs before
+        the keep branch.
+        """
+        nonlocal best_loss, best_set, nodes
+        stack = [(VISIT, 0, need, 0)]
+        while stack:
+            frame = stack.pop()
+            if frame[0] == UNDO:
+                item = frame[1]
+                for ta_id in item[3]:
+                    slack[ta_id] += item[2]
+                removed.pop()
+                continue
+
+            _, i, left, loss = frame
+            if left <= EPS:
+                if loss < best_loss:
+                    best_loss = loss
+                    best_set  = {item[4] for item in removed}
+                continue
+
+            bound = lower_bound(i, left)
+            # Priorities are integers, so only a whole point of improvement counts
+            if bound is None or math.ceil(loss + bound - EPS) >= best_loss:
+                continue
+
+            if nodes >= max_nodes or (deadline is not None and time.perf_counter() > deadline):
+                open_bounds.append(loss + bound)
+                continue
+            nodes += 1
+
+            while i < num_items and not fits(items[i]):
+                i += 1
+            if i == num_items:
+                continue
+            item = items[i]
+
+            # Keep it (explored last), undo the drop, drop it (explored first)
+            stack.append((VISIT, i + 1, left, loss))
+            stack.append((UNDO, item))
+            for ta_id in item[3]:
+                slack[ta_id] -= item[2]
+            removed.append(item)
+            stack.append((VISIT, i + 1, left - item[1], loss + item[0]))
+
+    if need <= EPS:
+        best_loss, best_set = 0, set()
+    else:
+        ceiling = max_saving()
+        if ceiling < need - EPS:
+            _log.info(f"Exact reducer: at most ${ceiling:.2f} can be saved under min_hours, ${need:.2f} needed")
+        else:
+            search()
+
+    seconds = time.perf_counter() - started
+
+    if best_set is None:
+        status = "unsolved" if open_bounds else "infeasible"
+        _log.warning(f"Exact reducer ({status}): no removal reaches the target budget under min_hours; "
+                     f"keeping the greedy reducer's result.")
+        return greedy_schedule, greedy_hours, {
+            "status":            status,
+            "retained_priority": total_priority - sum(shift_priority(ctx, s_id) for s_id in greedy_removed),
+            "priority_bound":    None,
+            "gap":               None,
+            "nodes":             nodes,
+            "seconds":           seconds,
+        }
+
+    # Apply the chosen removals
+    reduced = deepcopy(schedule)
+    for shift_id in best_set:
+        for role_key in ("leads", "lab_tas", "oh_tas"):
+            for ta_id in reduced[shift_id][role_key]:
+                remove_ta(ctx, ta_id, shift_id, state)
+            reduced[shift_id][role_key] = []
+
+    lowest_loss = min([best_loss] + [math.ceil(bound - EPS) for bound in open_bounds])
+    retained    = total_priority - best_loss
+    bound       = total_priority - lowest_loss
+    report = {
+        "status":            "feasible" if open_bounds else "optimal",
+        "retained_priority": retained,
+        "priority_bound":    bound,
+        "gap":               (bound - retained) / bound if bound else 0.0,
+        "nodes":             nodes,
+        "seconds":           seconds,
+    }
+
+    _log.info(f"Exact reducer ({report['status']}): removed {len(best_set)} shifts, "
+              f"retained priority {retained}/{total_priority} (gap {report['gap']:.1%}), "
+              f"cost ${calculate_cost(ctx, state.hours_assigned):.2f}, "
+              f"{nodes} nodes in {seconds:.2f}s")
+    return reduced, state.hours_assigned, report
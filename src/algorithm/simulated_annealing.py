@@ -1,146 +1,488 @@
-from helpers.data_access import *
-from helpers.scoring import *
-from greedy import *
-
-# ============================================================
-# SIMULATED ANNEALING
-# ============================================================
-
-import math
-import random
-from copy import deepcopy
-
-def get_random_filled_shift(ctx, schedule):
-    filled_shifts = [
-        shift_id for shift_id, assignment in schedule.items()
-        if assignment["leads"] or assignment["lab_tas"] or assignment["oh_tas"]
-    ]
-
-    # Weight by shift priority so important shifts get more improvement attempts
-    weights = [shift_priority(ctx, shift_id) for shift_id in filled_shifts]
-
-    shift_id   = random.choices(filled_shifts, weights=weights, k=1)[0]
-    assignment = schedule[shift_id]
-
-    nonempty_roles = []
-    if assignment["leads"]:
-        nonempty_roles.append(("lead", "leads"))
-    if assignment["lab_tas"]:
-        nonempty_roles.append(("lab_ta", "lab_tas"))
-    if assignment["oh_tas"]:
-        nonempty_roles.append(("oh_ta", "oh_tas"))
-
-    role, role_key = random.choice(nonempty_roles)
-    ta_out = random.choice(assignment[role_key])
-
-    return ta_out, shift_id, role
-
-def simulated_annealing(ctx, initial_temp=10.0, cooling_rate=0.995, num_iterations=10000):
-    
-    # Start from a greedy schedule
-    schedule, current_assignments, hours_assigned = greedy_assign(ctx)
-    current_score = score_schedule(ctx, schedule, hours_assigned)
-
-    best_schedule            = deepcopy(schedule)
-    best_hours_assigned      = deepcopy(hours_assigned)
-    best_score               = current_score
-
-    temperature = initial_temp
-
-    for iteration in range(num_iterations):
-
-        # --------------------------------------------------------
-        # PICK A RANDOM FILLED (shift, role) SLOT TO MUTATE
-        # --------------------------------------------------------
-        ta_out, shift_id, role = get_random_filled_shift(ctx, schedule)
-        role_key = role + "s"
-
-        # --------------------------------------------------------
-        # TEMPORARILY REMOVE THE TA
-        # --------------------------------------------------------
-        schedule[shift_id][role_key].remove(ta_out)
-        remove_ta(ctx, ta_out, shift_id, current_assignments, hours_assigned)
-
-        # --------------------------------------------------------
-        # FIND AN ELIGIBLE REPLACEMENT (excluding already assigned TAs on this shift)
-        # --------------------------------------------------------
-        already_on_shift = (
-            schedule[shift_id]["leads"] +
-            schedule[shift_id]["lab_tas"] +
-            schedule[shift_id]["oh_tas"]
-        )
-        eligible = [
-            ta_id for ta_id in get_eligible_tas_for_role(
-                ctx, shift_id, role, current_assignments, hours_assigned
-            )
-            if ta_id not in already_on_shift
-        ]
-
-        if not eligible:
-            # No replacement found — restore and move on
-            schedule[shift_id][role_key].append(ta_out)
-            assign_ta(ctx, ta_out, shift_id, current_assignments, hours_assigned)
-            temperature *= cooling_rate
-            continue
-
-        ta_in = random.choice(eligible)  # random, not greedy — important for annealing
-
-        # --------------------------------------------------------
-        # APPLY THE SWAP AND SCORE
-        # --------------------------------------------------------
-        schedule[shift_id][role_key].append(ta_in)
-        assign_ta(ctx, ta_in, shift_id, current_assignments, hours_assigned)
-
-        new_score = score_schedule(ctx, schedule, hours_assigned)
-        delta     = new_score - current_score
-
-        # --------------------------------------------------------
-        # ACCEPT OR REJECT
-        # --------------------------------------------------------
-        accept = False
-        if delta > 0:
-            accept = True
-        else:
-            probability = math.exp(delta / temperature)
-            accept = random.random() < probability
-
-        if accept:
-            current_score = new_score
-            if current_score > best_score:
-                best_score               = current_score
-                best_schedule            = deepcopy(schedule)
-                best_hours_assigned      = deepcopy(hours_assigned)
-        else:
-            # Revert the swap
-            schedule[shift_id][role_key].remove(ta_in)
-            remove_ta(ctx, ta_in,  shift_id, current_assignments, hours_assigned)
-            schedule[shift_id][role_key].append(ta_out)
-            assign_ta(ctx, ta_out, shift_id, current_assignments, hours_assigned)
-
-        temperature *= cooling_rate
-
-    return best_schedule, best_hours_assigned, best_score
-
-# ============================================================
-# PRINT RESULTS FOR TESTING
-# ============================================================
-
-def display_results(ctx, schedule, hours_assigned, score):
-    print(f"Total Score: {score:.2f}\n")
-    for shift_id, assignment in schedule.items():
-        shift = get_shift(ctx, shift_id)
-        print(f"{shift['name']}")
-        if assignment["unschedulable"]:
-            print(f"  ⚠ UNSCHEDULABLE: {assignment['error']}")
-        if assignment["leads"]:
-            print(f"  Leads:   {[get_ta(ctx, t)['name'] for t in assignment['leads']]}")
-        if assignment["lab_tas"]:
-            print(f"  Lab TAs: {[get_ta(ctx, t)['name'] for t in assignment['lab_tas']]}")
-        if assignment["oh_tas"]:
-            print(f"  OH TAs:  {[get_ta(ctx, t)['name'] for t in assignment['oh_tas']]}")
-        print()
-
-    print("Hours per TA:")
-    for ta in ctx.ta_metadata:
-        h = hours_assigned[ta["ta_id"]]
+from helpers.data_access import *
+from helpers.scoring import *
+from helpers.sampling import FenwickSampler
+from greedy import *
+from reducer import reduced_fairness_floor
+from helpers.log import get_logger
+from helpers.instrument import phase, annealing_telemetry
+
+_log = get_logger("SA")
+
+# ============================================================
+# SIMULATED ANNEALING
+# ============================================================
+
+import math
+import random
+import time
+
+def is_filled(assignment):
+    return bool(assignment["leads"] or assignment["lab_tas"] or assignment["oh_tas"])
+
+class FilledShiftSampler:
+    """
+    Picks a filled shift weighted by shift_priority, so important shifts get
+    more improvement attempts. Priorities are computed once; call refresh()
+    whenever a shift goes from empty to filled or back.
+    active_shifts, if given, limits sampling to those shift_ids.
+    """
+
+    def __init__(self, ctx, schedule, active_shifts=None):
+        self.schedule   = schedule
+        self.shift_ids  = ctx.index.shift_ids
+        self.shift_pos  = ctx.index.shift_pos
+        self.priorities = [
+            shift_priority(ctx, shift_id) if active_shifts is None or shift_id in active_shifts else 0
+            for shift_id in self.shift_ids
+        ]
+        self.sampler    = FenwickSampler([
+            priority if is_filled(schedule[shift_id]) else 0
+            for shift_id, priority in zip(self.shift_ids, self.priorities)
+        ])
+
+    def refresh(self, shift_id):
+        s = self.shift_pos[shift_id]
+        self.sampler.update(s, self.priorities[s] if is_filled(self.schedule[shift_id]) else 0)
+
+    def sample(self, rng=random):
+        return self.shift_ids[self.sampler.sample(rng)]
+
+def get_random_filled_shift(ctx, schedule, shift_sampler, rng=random):
+    shift_id   = shift_sampler.sample(rng)
+    assignment = schedule[shift_id]
+
+    nonempty_roles = []
+    if assignment["leads"]:
+        nonempty_roles.append(("lead", "leads"))
+    if assignment["lab_tas"]:
+        nonempty_roles.append(("lab_ta", "lab_tas"))
+    if assignment["oh_tas"]:
+        nonempty_roles.append(("oh_ta", "oh_tas"))
+
+    role, role_key = rng.choice(nonempty_roles)
+    ta_out = rng.choice(assignment[role_key])
+
+    return ta_out, shift_id, role
+
+# ============================================================
+# BEST-SOLUTION JOURNAL
+# ============================================================
+
+class BestJournal:
+    """
+    Tracks the best schedule seen so far without copying it.
+    Before a (shift, role) list changes for the first time since the last
+    best, its contents at that best are saved. Marking a new best just
+    forgets those entries and restore() writes them back, so both cost
+    O(lists touched since the last best), and memory never exceeds one
+    entry per (shift, role).
+    """
+
+    def __init__(self, ctx, schedule, state):
+        self.ctx      = ctx
+        self.schedule = schedule
+        self.state    = state
+        self.saved    = {}
+
+    def touch(self, shift_id, role_key):
+        """Call before mutating schedule[shift_id][role_key]."""
+        key = (shift_id, role_key)
+        if key not in self.saved:
+            self.saved[key] = list(self.schedule[shift_id][role_key])
+
+    def mark_best(self):
+        self.saved.clear()
+
+    def restore(self):
+        """Roll schedule and state back to the last marked best."""
+        # Remove everything first, then re-add: a TA can sit in one role
+        # list now and a different role list of the same shift at the best.
+        for (shift_id, role_key) in self.saved:
+            for ta_id in self.schedule[shift_id][role_key]:
+                remove_ta(self.ctx, ta_id, shift_id, self.state)
+        for (shift_id, role_key), best_tas in self.saved.items():
+            for ta_id in best_tas:
+                assign_ta(self.ctx, ta_id, shift_id, self.state)
+            self.schedule[shift_id][role_key] = best_tas
+        self.saved = {}
+
+# ============================================================
+# MOVE PROPOSAL
+# ============================================================
+
+def propose_swap(ctx, schedule, state, shift_sampler, rng=random):
+    """
+    Pick a random filled (shift, role) slot and a random eligible TA to
+    replace whoever is in it. Does not change the schedule.
+    Returns (ta_out, ta_in, shift_id, role), or None if nobody can replace ta_out.
+    """
+    ta_out, shift_id, role = get_random_filled_shift(ctx, schedule, shift_sampler, rng)
+
+    # ta_out's hours are released while checking so it is judged
+    # the same way as if the slot were empty.
+    remove_ta(ctx, ta_out, shift_id, state)
+
+    # Exclude TAs already assigned to this shift
+    already_on_shift = set(
+        schedule[shift_id]["leads"] +
+        schedule[shift_id]["lab_tas"] +
+        schedule[shift_id]["oh_tas"]
+    )
+    already_on_shift.discard(ta_out)
+    eligible = [
+        ta_id for ta_id in get_eligible_tas_for_role(
+            ctx, shift_id, role, state
+        )
+        if ta_id not in already_on_shift
+    ]
+
+    assign_ta(ctx, ta_out, shift_id, state)
+
+    if not eligible:
+        return None
+
+    ta_in = rng.choice(eligible)  # random, not greedy — important for annealing
+    return ta_out, ta_in, shift_id, role
+
+def propose_vacate(schedule, state, oh_shifts, min_hours, durations, rng=random):
+    """
+    Pick a random OH assignment to drop, leaving its slot empty. TAs are
+    kept at or above min_hours. Returns (ta_out, shift_id), or None.
+    """
+    shift_id = rng.choice(oh_shifts)
+    oh_tas   = schedule[shift_id]["oh_tas"]
+    if not oh_tas:
+        return None
+
+    ta_out = rng.choice(oh_tas)
+    if state.hours_assigned[ta_out] - durations[shift_id] < min_hours[ta_out]:
+        return None
+    return ta_out, shift_id
+
+def propose_fill(ctx, schedule, state, oh_shifts, rng=random):
+    """
+    Pick a random OH shift with an open slot and a random eligible TA for
+    it. Returns (ta_in, shift_id), or None.
+    """
+    shift_id   = rng.choice(oh_shifts)
+    assignment = schedule[shift_id]
+    if len(assignment["oh_tas"]) >= get_shift(ctx, shift_id)["staffing"][0]:
+        return None
+
+    eligible = [
+        ta_id for ta_id in get_eligible_tas_for_role(ctx, shift_id, "oh_ta", state)
+        if ta_id not in assignment["oh_tas"]
+    ]
+    if not eligible:
+        return None
+    return rng.choice(eligible), shift_id
+
+# ============================================================
+# ANNEALING CHAIN
+# ============================================================
+
+# Score points lost per dollar over budget in budget mode
+BUDGET_PENALTY = 1.0
+
+# Share of budget-mode moves that are swaps; the rest split evenly between
+# vacating and filling OH slots
+SWAP_SHARE = 0.5
+
+class AnnealingChain:
+    """
+    One annealing state - schedule, AssignmentState, ScoreTracker, shift
+    sampler and BestJournal - advanced one Metropolis step at a time with
+    step(temperature). Shared by simulated_annealing() and the
+    replica-exchange solver so both use the same moves and scoring.
+    seed gives the chain its own random.Random (default: the global random),
+    and perturb_steps random swaps are forced onto the greedy start first
+    so independent chains begin from different schedules.
+    initial is an optional (schedule, AssignmentState) to start from instead
+    of greedy_assign(), and active_shifts restricts moves to those shift_ids.
+
+    With a budget, the chain anneals score - budget_penalty * (dollars over
+    budget), with the cost from calculate_cost() kept up to date move by
+    move, and besides swaps it proposes vacating an OH slot (keeping TAs at
+    the budget's reduced_fairness_floor) or filling an open one. The best
+    schedule is the best within budget once one has been seen.
+    """
+
+    def __init__(self, ctx, seed=None, perturb_steps=0, debug_scoring=False,
+                 initial=None, active_shifts=None, budget=None, budget_penalty=None):
+        self.ctx = ctx
+        self.rng = random.Random(seed) if seed is not None else random
+
+        # Start from a greedy schedule unless given one
+        self.schedule, self.state = initial if initial is not None else greedy_assign(ctx)
+        self.tracker       = ScoreTracker(ctx, self.schedule, self.state, debug=debug_scoring)
+        self.shift_sampler = FilledShiftSampler(ctx, self.schedule, active_shifts)
+
+        for _ in range(perturb_steps):
+            move = propose_swap(ctx, self.schedule, self.state, self.shift_sampler, self.rng)
+            if move is not None:
+                self.tracker.apply_swap(*move, self.tracker.swap_delta(*move))
+
+        self.budget = budget
+        if budget is not None:
+            self.budget_penalty = budget_penalty if budget_penalty is not None else BUDGET_PENALTY
+            self.rates     = {ta["ta_id"]: TF_HOURLY_RATE if ta["is_tf"] else TA_HOURLY_RATE for ta in ctx.ta_metadata}
+            self.durations = dict(zip(ctx.index.shift_ids, ctx.index.durations))
+            self.min_hours = reduced_fairness_floor(ctx, budget)
+            self.cost      = calculate_cost(ctx, self.state.hours_assigned)
+            self.oh_shifts = [
+                shift["shift_id"] for shift in ctx.shift_metadata
+                if not shift["is_lab"] and not self.schedule[shift["shift_id"]]["unschedulable"]
+                and (active_shifts is None or shift["shift_id"] in active_shifts)
+            ]
+
+        self.journal    = BestJournal(ctx, self.schedule, self.state)
+        self.best_score = self.tracker.total
+        self.best_rank  = self.rank()
+
+    @property
+    def score(self):
+        return self.tracker.total
+
+    def over_budget(self, cost):
+        return max(0.0, cost - self.budget)
+
+    def rank(self):
+        """
+        What "better" means for the best-schedule journal: the score, or
+        with a budget (within budget, penalized score).
+        """
+        if self.budget is None:
+            return (True, self.tracker.total)
+        return (
+            self.cost <= self.budget + 1e-6,
+            self.tracker.total - self.budget_penalty * self.over_budget(self.cost),
+        )
+
+    def step(self, temperature):
+        """
+        Propose one swap and accept or reject it at the given temperature.
+        Returns True if accepted, False if rejected, None if no replacement was found.
+        """
+        if self.budget is not None:
+            return self.budget_step(temperature)
+
+        # --------------------------------------------------------
+        # PICK A RANDOM FILLED SLOT AND AN ELIGIBLE REPLACEMENT
+        # --------------------------------------------------------
+        move = propose_swap(self.ctx, self.schedule, self.state, self.shift_sampler, self.rng)
+        if move is None:
+            return None
+
+        ta_out, ta_in, shift_id, role = move
+
+        # --------------------------------------------------------
+        # SCORE THE SWAP WITHOUT APPLYING IT
+        # --------------------------------------------------------
+        delta = self.tracker.swap_delta(ta_out, ta_in, shift_id, role)
+
+        # --------------------------------------------------------
+        # ACCEPT OR REJECT
+        # --------------------------------------------------------
+        accept = False
+        if delta > 0:
+            accept = True
+        else:
+            probability = math.exp(delta / temperature)
+            accept = self.rng.random() < probability
+
+        if accept:
+            self.journal.touch(shift_id, role + "s")
+            self.tracker.apply_swap(ta_out, ta_in, shift_id, role, delta)
+            if self.tracker.total > self.best_score:
+                self.best_score = self.tracker.total
+                self.best_rank  = (True, self.best_score)
+                self.journal.mark_best()
+
+        return accept
+
+    def budget_step(self, temperature):
+        """step() with a budget: one swap, vacate or fill move on the penalized score."""
+        ctx, rng = self.ctx, self.rng
+
+        # --------------------------------------------------------
+        # PROPOSE A MOVE AND SCORE IT WITHOUT APPLYING IT
+        # --------------------------------------------------------
+        u = rng.random()
+        if u < SWAP_SHARE:
+            move = propose_swap(ctx, self.schedule, self.state, self.shift_sampler, rng)
+            if move is None:
+                return None
+            ta_out, ta_in, shift_id, role = move
+            delta      = self.tracker.swap_delta(ta_out, ta_in, shift_id, role)
+            cost_delta = self.durations[shift_id] * (self.rates[ta_in] - self.rates[ta_out])
+        elif u < SWAP_SHARE + (1 - SWAP_SHARE) / 2:
+            move = propose_vacate(self.schedule, self.state, self.oh_shifts, self.min_hours, self.durations, rng)
+            if move is None:
+                return None
+            ta_out, shift_id = move
+            ta_in, role = None, "oh_ta"
+            delta      = self.tracker.vacate_delta(ta_out, shift_id, role)
+            cost_delta = -self.durations[shift_id] * self.rates[ta_out]
+        else:
+            move = propose_fill(ctx, self.schedule, self.state, self.oh_shifts, rng)
+            if move is None:
+                return None
+            ta_in, shift_id = move
+            ta_out, role = None, "oh_ta"
+            delta      = self.tracker.fill_delta(ta_in, shift_id, role)
+            cost_delta = self.durations[shift_id] * self.rates[ta_in]
+
+        penalty_delta = self.budget_penalty * (
+            self.over_budget(self.cost + cost_delta) - self.over_budget(self.cost)
+        )
+        objective_delta = delta - penalty_delta
+
+        # --------------------------------------------------------
+        # ACCEPT OR REJECT
+        # --------------------------------------------------------
+        if objective_delta > 0:
+            accept = True
+        else:
+            accept = rng.random() < math.exp(objective_delta / temperature)
+        if not accept:
+            return False
+
+        self.journal.touch(shift_id, role + "s")
+        if ta_out is not None and ta_in is not None:
+            self.tracker.apply_swap(ta_out, ta_in, shift_id, role, delta)
+        elif ta_in is None:
+            self.tracker.apply_vacate(ta_out, shift_id, role, delta)
+            self.shift_sampler.refresh(shift_id)
+        else:
+            self.tracker.apply_fill(ta_in, shift_id, role, delta)
+            self.shift_sampler.refresh(shift_id)
+        self.cost += cost_delta
+
+        rank = self.rank()
+        if rank > self.best_rank:
+            self.best_rank  = rank
+            self.best_score = self.tracker.total
+            self.journal.mark_best()
+
+        return True
+
+    def run(self, temperature, num_steps):
+        for _ in range(num_steps):
+            self.step(temperature)
+
+    def finish(self):
+        """Roll back to the best schedule seen. Returns schedule, hours_assigned, best score (unpenalized)."""
+        self.journal.restore()
+        if self.budget is not None:
+            self.cost = calculate_cost(self.ctx, self.state.hours_assigned)
+            if self.cost > self.budget + 1e-6:
+                _log.warning(f"No schedule within budget ${self.budget:.2f} found; "
+                             f"best is ${self.cost:.2f}")
+        return self.schedule, self.state.hours_assigned, self.best_score
+
+# ============================================================
+# ANNEALING LOOP
+# ============================================================
+
+# Steps between clock reads when running against a deadline
+DEADLINE_CHECK_STEPS = 256
+
+def simulated_annealing(ctx, initial_temp=10.0, cooling_rate=0.995, num_iterations=10000,
+                        debug_scoring=False, seed=None, perturb_steps=0,
+                        time_limit_s=None, final_temp=0.01, stagnation_limit=None, min_temp=None,
+                        initial=None, active_shifts=None, budget=None, budget_penalty=None):
+    """
+    Improve a greedy schedule by random single-slot swaps under a geometric
+    cooling schedule. Moves are scored with a ScoreTracker delta instead of
+    a full rescore; debug_scoring=True checks every accepted move against
+    score_schedule(). The best schedule is kept with a BestJournal rather
+    than snapshots. See AnnealingChain for seed, perturb_steps, initial
+    and active_shifts.
+
+    With time_limit_s set (seconds, greedy start included) the run is sized
+    to the deadline instead of num_iterations: every DEADLINE_CHECK_STEPS
+    steps the measured step rate is used to re-pick cooling_rate so the
+    temperature reaches final_temp just as time runs out.
+    Either mode stops early once the best score hasn't improved for
+    stagnation_limit steps, or once the temperature falls below min_temp.
+
+    budget switches to the budget-constrained objective (see AnnealingChain),
+    so the result comes out under budget without a reduce_schedule() pass;
+    the returned score is the plain score_schedule() value.
+
+    Runs as the "anneal" phase of an active instrumentation report, with
+    an AnnealingTelemetry trace of its steps.
+    """
+    started  = time.perf_counter()
+    deadline = started + time_limit_s if time_limit_s is not None else None
+
+    with phase("anneal"):
+        chain = AnnealingChain(ctx, seed=seed, perturb_steps=perturb_steps, debug_scoring=debug_scoring,
+                               initial=initial, active_shifts=active_shifts,
+                               budget=budget, budget_penalty=budget_penalty)
+
+        telemetry        = annealing_telemetry()
+        temperature      = initial_temp
+        loop_started     = time.perf_counter()
+        best_rank        = chain.best_rank
+        last_improvement = 0
+        stop_reason      = None
+
+        iteration = 0
+        while deadline is not None or iteration < num_iterations:
+            if deadline is not None and iteration % DEADLINE_CHECK_STEPS == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    stop_reason = "time limit"
+                    break
+                if iteration:
+                    steps_left   = (deadline - now) * iteration / (now - loop_started)
+                    cooling_rate = min(1.0, final_temp / temperature) ** (1 / max(steps_left, 1.0))
+
+            result = chain.step(temperature)
+            if telemetry is not None:
+                telemetry.record(result, temperature, chain)
+            temperature *= cooling_rate
+            iteration   += 1
+
+            if chain.best_rank > best_rank:
+                best_rank        = chain.best_rank
+                last_improvement = iteration
+            elif stagnation_limit is not None and iteration - last_improvement >= stagnation_limit:
+                stop_reason = f"no improvement in {stagnation_limit} iterations"
+                break
+
+            if min_temp is not None and temperature < min_temp:
+                stop_reason = f"temperature below {min_temp}"
+                break
+
+        if telemetry is not None:
+            telemetry.finish(temperature, chain, stop_reason)
+        if stop_reason is not None:
+            _log.info(f"Stopped after {iteration} iterations ({time.perf_counter() - started:.2f}s): {stop_reason}")
+
+        return chain.finish()
+
+# ============================================================
+# PRINT RESULTS FOR TESTING
+# ============================================================
+
+def display_results(ctx, schedule, hours_assigned, score):
+    print(f"Total Score: {score:.2f}\n")
+    for shift_id, assignment in schedule.items():
+        shift = get_shift(ctx, shift_id)
+        print(f"{shift['name']}")
+        if assignment["unschedulable"]:
+            print(f"  ⚠ UNSCHEDULABLE: {assignment['error']}")
+        if assignment["leads"]:
+            print(f"  Leads:   {[get_ta(ctx, t)['name'] for t in assignment['leads']]}")
+        if assignment["lab_tas"]:
+            print(f"  Lab TAs: {[get_ta(ctx, t)['name'] for t in assignment['lab_tas']]}")
+        if assignment["oh_tas"]:
+            print(f"  OH TAs:  {[get_ta(ctx, t)['name'] for t in assignment['oh_tas']]}")
+        print()
+
+    print("Hours per TA:")
+    for ta in ctx.ta_metadata:
+        h = hours_assigned[ta["ta_id"]]
         print(f"  {ta['name']:8}: {h:.2f}h  (min: {ta['min_hours']}, max: {ta['max_hours']})")
\ No newline at end of file
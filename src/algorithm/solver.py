@@ -0,0 +1,283 @@
+from data.context import SchedulerContext
+from helpers.constraints import *
+from simulated_annealing import *
+from helpers.scoring import *
+from data.parsers import *
+from parallel import parallel_simulated_annealing
+from tempering import parallel_tempering
+from warm_start import warm_start_annealing
+from reducer import reduce_schedule, reduce_schedule_exact, budget_sweep
+from helpers.log import get_logger, DEBUG
+from helpers.result_cache import ResultCache, result_key
+from helpers.instrument import phase, active_report, start_report, stop_report
+import hashlib
+import json
+import os
+import time
+
+# Number of independent annealing chains to run across CPU cores (1 = single chain)
+NUM_CHAINS = int(os.getenv("SOLVER_CHAINS", "1"))
+
+# Number of replica-exchange replicas (above 1 switches to parallel tempering)
+NUM_REPLICAS = int(os.getenv("SOLVER_REPLICAS", "1"))
+
+# Time kept back from a latency SLA for serializing and posting the
+# result, and the least the solver is given however late it starts
+POST_RESERVE_S = 2.0
+MIN_SOLVE_S    = 0.5
+
+# Stop annealing once the best score hasn't improved for this many iterations (unset = never)
+STAGNATION_LIMIT = int(os.getenv("SOLVER_STAGNATION", "0")) or None
+
+# Budget (dollars) to anneal under, in the single and multi-chain modes (unset = no budget)
+BUDGET = float(os.getenv("SOLVER_BUDGET")) if os.getenv("SOLVER_BUDGET") else None
+
+# How a budget is met: "anneal" optimizes under it directly (single and
+# multi-chain modes); "greedy" and "exact" anneal without it, then drop OH
+# shifts with reduce_schedule / reduce_schedule_exact (any mode)
+REDUCERS = ("anneal", "greedy", "exact")
+REDUCER  = os.getenv("SOLVER_REDUCER", "anneal").strip().lower()
+
+# Fixed random seed for reproducible runs (unset = fresh randomness each run)
+SEED = int(os.getenv("SOLVER_SEED")) if os.getenv("SOLVER_SEED") else None
+
+# Extra captures for the instrumentation report: "cprofile", "tracemalloc" (comma-separated)
+PROFILE_CAPTURES = {c.strip().lower() for c in os.getenv("SOLVER_PROFILE", "").split(",") if c.strip()}
+
+# Attach a phase / counter / annealing report to the posted result (implied by SOLVER_PROFILE)
+INSTRUMENT = os.getenv("SOLVER_INSTRUMENT", "0") == "1" or bool(PROFILE_CAPTURES)
+
+# Finished results by input hash, built on first use; see ResultCache.from_env for settings
+_result_cache = None
+_result_cache_loaded = False
+
+_log = get_logger("SOLVER")
+
+# ============================================================
+# BUILD CONTEXT
+# ============================================================
+
+def input_key(raw_tas, raw_schedule):
+    """
+    Hash of the raw backend input, identical for identical TA and schedule
+    documents. The posted result (tas_scheduled, score, instrumentation) is
+    left out since it doesn't change the context.
+    """
+    raw_schedule = {
+        key: [
+            {k: v for k, v in shift.items() if k != "tas_scheduled"} if isinstance(shift, dict) else shift
+            for shift in value
+        ] if isinstance(value, list) else value
+        for key, value in raw_schedule.items()
+        if key not in ("score", "instrumentation")
+    }
+    canonical = json.dumps([raw_tas, raw_schedule], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def build_context(raw_tas, raw_schedule):
+    """Parse the backend documents into a SchedulerContext with fairness applied."""
+    with phase("parse"):
+        shift_metadata    = parse_shifts(raw_schedule)
+        ta_metadata       = parse_tas(raw_tas)
+        preference_matrix = parse_preference_matrix(raw_tas, shift_metadata)
+
+    _log.info(f"Parsed {len(shift_metadata)} shifts and {len(ta_metadata)} TAs")
+    if _log.enabled(DEBUG):
+        for s in shift_metadata:
+            _log.debug(f"  shift_id='{s['shift_id']}' day={s['day']} "
+                       f"{s['start'].strftime('%H:%M')}-{s['end'].strftime('%H:%M')} "
+                       f"is_lab={s['is_lab']} staffing={s['staffing']}")
+
+        for ta in ta_metadata:
+            _log.debug(f"  ta_id='{ta['ta_id']}' name='{ta['name']}' "
+                       f"lab_admin_status={ta['lab_admin_status']} is_tf={ta['is_tf']} "
+                       f"min_hours={ta['min_hours']} max_hours={ta['max_hours']}")
+
+        _log.debug("Preference matrix summary:")
+        for ta_id, prefs in preference_matrix.items():
+            nonzero = {k: v for k, v in prefs.items() if v > 0}
+            _log.debug(f"  TA '{ta_id}': {len(prefs)} total prefs, {len(nonzero)} available/preferred")
+            for sid, score in nonzero.items():
+                label = "PREFERRED" if score == 2 else "available"
+                _log.debug(f"    shift '{sid}' -> {score} ({label})")
+
+    with phase("index"):
+        ctx = SchedulerContext(ta_metadata, shift_metadata, preference_matrix)
+
+    _log.info("Context built. Applying fairness constraints...")
+    with phase("fairness"):
+        ctx = apply_fairness(ctx)
+
+    if _log.enabled(DEBUG):
+        _log.debug("After fairness adjustment:")
+        for ta in ctx.ta_metadata:
+            _log.debug(f"  TA '{ta['ta_id']}': min_hours={ta['min_hours']:.1f}, max_hours={ta['max_hours']:.1f}")
+
+    return ctx
+
+# ============================================================
+# RUN SCHEDULER
+# ============================================================
+
+def reduce_to_budget(ctx, schedule, hours_assigned, budget, reducer):
+    """
+    Drop OH shifts until the schedule costs at most budget, with the
+    "greedy" or "exact" reducer. Returns schedule, hours_assigned, score.
+    """
+    if calculate_cost(ctx, hours_assigned) <= budget:
+        return schedule, hours_assigned, score_schedule(ctx, schedule, hours_assigned)
+
+    _log.info(f"Reducing to the ${budget:.2f} budget with the {reducer} reducer...")
+    if reducer == "exact":
+        schedule, hours_assigned, exact = reduce_schedule_exact(ctx, schedule, hours_assigned, budget)
+        report = active_report()
+        if report is not None:
+            report.fields["reducer"] = exact
+    else:
+        schedule, hours_assigned = reduce_schedule(ctx, schedule, hours_assigned, budget)
+    return schedule, hours_assigned, score_schedule(ctx, schedule, hours_assigned)
+
+def run_solver(ctx, time_limit_s=None, previous=None, seed=None, budget=None, reducer=REDUCER):
+    """
+    Anneal from the greedy schedule with whichever mode SOLVER_REPLICAS /
+    SOLVER_CHAINS select, or, given a previous schedule
+    ({shift_id: [ta_id, ...]}), repair it and re-anneal locally.
+    budget (dollars) is met the way reducer says (see REDUCERS); the
+    "anneal" reducer only works in the single and multi-chain modes.
+    Returns schedule, hours_assigned, score.
+    """
+    if reducer not in REDUCERS:
+        raise ValueError(f"[run_solver] Unknown reducer '{reducer}', expected one of {REDUCERS}")
+
+    anneal_budget = budget if reducer == "anneal" else None
+    if anneal_budget is not None and (previous or NUM_REPLICAS > 1):
+        _log.warning("Budget is only applied by the single and multi-chain annealing modes; ignoring it.")
+
+    if previous:
+        _log.info(f"Warm-starting from the previous schedule ({len(previous)} shifts assigned)...")
+        schedule, hours_assigned, score = warm_start_annealing(
+            ctx, previous, seed=seed, stagnation_limit=STAGNATION_LIMIT
+        )
+    elif NUM_REPLICAS > 1:
+        _log.info(f"Running parallel tempering with {NUM_REPLICAS} replicas (each includes greedy init)...")
+        schedule, hours_assigned, score, pt_stats = parallel_tempering(
+            ctx, num_replicas=NUM_REPLICAS, seed=seed, time_limit_s=time_limit_s
+        )
+        _log.info(lambda: f"  temperatures={[round(t, 3) for t in pt_stats['temperatures']]}")
+        _log.info(lambda: f"  exchange rates={[round(r, 2) for r in pt_stats['exchange_rates']]}")
+    elif NUM_CHAINS > 1:
+        _log.info(f"Running {NUM_CHAINS} parallel annealing chains (each includes greedy init)...")
+        schedule, hours_assigned, score, chain_stats = parallel_simulated_annealing(
+            ctx, num_chains=NUM_CHAINS, seed=seed, time_limit_s=time_limit_s,
+            stagnation_limit=STAGNATION_LIMIT, budget=anneal_budget
+        )
+        for stats in chain_stats:
+            _log.info(f"  chain {stats['chain']}: score={stats['score']:.2f} "
+                      f"seed={stats['seed']} time={stats['seconds']:.2f}s")
+    else:
+        _log.info(f"Running simulated annealing (includes greedy init)...")
+        schedule, hours_assigned, score = simulated_annealing(
+            ctx, seed=seed, time_limit_s=time_limit_s, stagnation_limit=STAGNATION_LIMIT,
+            budget=anneal_budget
+        )
+
+    if budget is not None and reducer != "anneal":
+        schedule, hours_assigned, score = reduce_to_budget(ctx, schedule, hours_assigned, budget, reducer)
+
+    _log.info(f"Best score: {score:.2f}, full schedule cost: {calculate_cost(ctx, hours_assigned)}")
+    if _log.enabled(DEBUG):
+        display_results(ctx, schedule, hours_assigned, score)
+
+    return schedule, hours_assigned, score
+
+def solver_time_limit(time_limit_s, started=None):
+    """
+    What is left of a time_limit_s SLA counted from started (a
+    time.perf_counter() value, default now), minus POST_RESERVE_S and
+    never under MIN_SOLVE_S. None when there is no limit.
+    """
+    if time_limit_s is None:
+        return None
+    elapsed       = time.perf_counter() - started if started is not None else 0.0
+    solver_budget = max(MIN_SOLVE_S, time_limit_s - elapsed - POST_RESERVE_S)
+    _log.info(f"Time limit {time_limit_s:.1f}s, solver budget {solver_budget:.2f}s")
+    return solver_budget
+
+def result_cache():
+    """The ResultCache from the SOLVER_CACHE* settings, or None when disabled."""
+    global _result_cache, _result_cache_loaded
+    if not _result_cache_loaded:
+        _result_cache = ResultCache.from_env()
+        _result_cache_loaded = True
+    return _result_cache
+
+def start_instrumentation():
+    """start_report() with the SOLVER_PROFILE captures."""
+    return start_report(profile="cprofile" in PROFILE_CAPTURES, trace_memory="tracemalloc" in PROFILE_CAPTURES)
+
+def solve(ctx, time_limit_s=None, started=None, previous=None, seed=SEED, use_cache=True, budget=BUDGET,
+          reducer=REDUCER, instrument=INSTRUMENT):
+    """
+    Solve a prepared context and serialize the result for the backend.
+    time_limit_s is a latency SLA counted from started (a time.perf_counter()
+    value, default now); the solver gets what is left of it minus
+    POST_RESERVE_S. previous switches to a warm start, and budget is met
+    the way reducer says (see run_solver).
+    Seeded results are looked up in result_cache() first, keyed by the
+    parsed inputs and every setting above; use_cache=False skips the
+    lookup (the fresh result is still stored). Unseeded runs are never
+    cached, so each one is a fresh random draw.
+    Returns the payload for post_schedule() - the day-keyed shift arrays
+    plus "score".
+
+    instrument collects a report of this call (see helpers.instrument)
+    and adds it to the payload as "instrumentation". If a report is
+    already active the solve is recorded in it instead, and attaching it
+    is left to whoever started it.
+    """
+    if instrument and active_report() is None:
+        start_instrumentation()
+        try:
+            payload = solve(ctx, time_limit_s=time_limit_s, started=started, previous=previous, seed=seed,
+                            use_cache=use_cache, budget=budget, reducer=reducer, instrument=False)
+        finally:
+            report = stop_report()
+        _log.info(f"Instrumentation: {report.summary()}")
+        return {**payload, "instrumentation": report.to_dict()}
+
+    report    = active_report()
+    cache     = result_cache() if seed is not None else None
+    cache_key = None
+    if cache is not None:
+        cache_key = result_key(ctx, {
+            "num_chains":       NUM_CHAINS,
+            "num_replicas":     NUM_REPLICAS,
+            "stagnation_limit": STAGNATION_LIMIT,
+            "time_limit_s":     time_limit_s,
+            "previous":         previous,
+            "seed":             seed,
+            "budget":           budget,
+            "reducer":          reducer if budget is not None else None,
+        })
+        if use_cache:
+            payload = cache.get(cache_key)
+            if payload is not None:
+                _log.info(f"Result cache hit ({cache_key[:12]}), score {payload['score']:.2f}")
+                if report is not None:
+                    report.fields["cached"] = True
+                return payload
+
+    with phase("solve"):
+        schedule, hours_assigned, score = run_solver(ctx, time_limit_s=solver_time_limit(time_limit_s, started),
+                                                   previous=previous, seed=seed, budget=budget, reducer=reducer)
+
+    with phase("serialize"):
+        payload = {
+            **serialize_schedule(ctx, schedule),
+            "score": score,
+        }
+    if report is not None:
+        report.fields["cached"] = False
+    if cache_key is not None:
+        cache.put(cache_key, payload)
+    return payload
@@ -0,0 +1,308 @@
+import gzip
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from solver import *
+from data.db_connection import fetch_schedule, post_schedule, GZIP_MIN_BYTES, GZIP_LEVEL
+from helpers.log import get_logger
+
+# ============================================================
+# LONG-RUNNING SOLVER SERVICE
+# ============================================================
+#
+# Keeps the interpreter, imports and recently built contexts warm between
+# runs. Start it once with `python solver_service.py`, then:
+#
+#   GET  /health  -> {"ok": true, "jobs": <count>, "cached_contexts": <count>, "cached_sweeps": <count>}
+#   POST /solve   -> runs one job. JSON body, every field optional:
+#       tas, schedule   backend documents; fetched from /schedule/importDataToAlg when missing
+#       time_limit_s    latency SLA for this job, counted from when the request arrived
+#       post            write the result back with PUT /schedule/update (default true)
+#       warm_start      start from the schedule's posted tas_scheduled lists (default false)
+#       cache           false re-solves even when the result cache has this input (default true)
+#       budget          dollars to keep the schedule under (default SOLVER_BUDGET)
+#       reducer         how the budget is met: "anneal", "greedy" or "exact"
+#                       (default SOLVER_REDUCER, see solver.REDUCERS)
+#       instrument      attach a phase / counter / annealing report to the
+#                       posted schedule as "instrumentation" (default SOLVER_INSTRUMENT)
+#       budgets         run a budget sweep instead (see below): a list of budgets
+#                       in dollars, or how many to spread evenly from the full cost to 0
+#     returns {"schedule_id", "score", "seconds", "context_cached", "posted", "schedule"}
+#
+#   A /solve job with "budgets" solves without a budget, reduces the result
+#   to every budget in one pass (reducer.budget_sweep) and posts nothing.
+#     returns {"schedule_id", "sweep_id", "score", "cost", "points", "seconds", "context_cached"}
+#     with one {"budget", "cost", "score", "removed", "reached"} per point, highest budget first
+#
+#   POST /sweep/schedule -> the schedule at one point of a recent sweep.
+#       sweep_id        from the sweep job (the SWEEP_CACHE_SIZE most recently used are kept)
+#       budget          one of the swept budgets
+#       post            write it back with PUT /schedule/update (default true)
+#     returns {"schedule_id", "budget", "score", "cost", "posted", "schedule"}
+#
+# Request bodies may be gzipped (Content-Encoding: gzip), and responses
+# are when the client accepts it.
+
+SERVICE_HOST = os.getenv("SOLVER_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SOLVER_PORT", "8765"))
+
+# Prepared contexts kept per distinct input (least recently used dropped first)
+CONTEXT_CACHE_SIZE = 8
+
+# Budget sweeps kept for /sweep/schedule (least recently used dropped first)
+SWEEP_CACHE_SIZE = 8
+
+_log = get_logger("SERVICE")
+
+class SolverService:
+    """
+    Job runner behind the HTTP handler. Jobs run one at a time: the
+    instrumentation report is process-wide, and the solver is CPU-bound
+    anyway (parallel modes use their own worker processes). Contexts are
+    read-only, so cached ones are shared between jobs as is.
+    """
+
+    def __init__(self, cache_size=CONTEXT_CACHE_SIZE, sweep_cache_size=SWEEP_CACHE_SIZE):
+        self.cache_size       = cache_size
+        self.sweep_cache_size = sweep_cache_size
+        self.contexts         = OrderedDict()  # input_key -> SchedulerContext
+        self.sweeps           = OrderedDict()  # sweep_id -> (BudgetSweep, schedule_id)
+        self.lock             = threading.Lock()
+        self.sweeps_lock      = threading.Lock()  # schedule_at() does not wait for running jobs
+        self.jobs             = 0
+
+    def context_for(self, raw_tas, raw_schedule):
+        """Returns (ctx, cached)."""
+        key = input_key(raw_tas, raw_schedule)
+        ctx = self.contexts.get(key)
+        if ctx is not None:
+            self.contexts.move_to_end(key)
+            return ctx, True
+
+        ctx = build_context(raw_tas, raw_schedule)
+        self.contexts[key] = ctx
+        while len(self.contexts) > self.cache_size:
+            self.contexts.popitem(last=False)
+        return ctx, False
+
+    def load(self, job):
+        """The job's inputs, fetched when not given. Returns (ctx, cached, raw_schedule, schedule_id)."""
+        with phase("fetch"):
+            if "tas" in job and "schedule" in job:
+                raw_tas, raw_schedule = job["tas"], job["schedule"]
+                schedule_id = raw_schedule.get("schedule_id")
+            else:
+                raw_tas, raw_schedule, schedule_id = fetch_schedule()
+
+        with phase("context"):
+            ctx, cached = self.context_for(raw_tas, raw_schedule)
+        return ctx, cached, raw_schedule, schedule_id
+
+    def run_job(self, job, started=None):
+        started = started if started is not None else time.perf_counter()
+        if "budgets" in job:
+            return self.run_sweep(job, started=started)
+
+        with self.lock:
+            self.jobs += 1
+            report = start_instrumentation() if job.get("instrument", INSTRUMENT) else None
+            try:
+                ctx, cached, raw_schedule, schedule_id = self.load(job)
+                previous = (
+                    parse_previous_assignments(raw_schedule, ctx.shift_metadata)
+                    if job.get("warm_start") else None
+                )
+                payload = solve(ctx, time_limit_s=job.get("time_limit_s"), started=started, previous=previous,
+                                use_cache=job.get("cache", True), budget=job.get("budget", BUDGET),
+                                reducer=job.get("reducer", REDUCER), instrument=False)
+            finally:
+                if report is not None:
+                    stop_report()
+
+            if report is not None:
+                _log.info(f"Instrumentation: {report.summary()}")
+                payload = {**payload, "instrumentation": report.to_dict()}
+
+        posted = False
+        if job.get("post", True):
+            post_schedule(schedule_id, payload)
+            posted = True
+
+        seconds = time.perf_counter() - started
+        _log.info(f"Job {self.jobs} (schedule_id={schedule_id}) finished in {seconds:.2f}s, "
+                  f"score={payload['score']:.2f}, context {'reused' if cached else 'built'}")
+
+        return {
+            "schedule_id":    schedule_id,
+            "score":          payload["score"],
+            "seconds":        seconds,
+            "context_cached": cached,
+            "posted":         posted,
+            "schedule":       payload,
+        }
+
+    def run_sweep(self, job, started=None):
+        """
+        Solve without a budget and sweep the result over job["budgets"].
+        The BudgetSweep is kept under a new sweep_id for schedule_at().
+        """
+        started = started if started is not None else time.perf_counter()
+        budgets = job["budgets"]
+        if isinstance(budgets, bool) or not isinstance(budgets, (int, list)):
+            raise ValueError("[run_sweep] budgets must be a list of dollar amounts or a number of points")
+        if isinstance(budgets, int) and budgets < 1:
+            raise ValueError("[run_sweep] budgets must be at least 1 point")
+
+        with self.lock:
+            self.jobs += 1
+            ctx, cached, raw_schedule, schedule_id = self.load(job)
+            previous = (
+                parse_previous_assignments(raw_schedule, ctx.shift_metadata)
+                if job.get("warm_start") else None
+            )
+            schedule, hours_assigned, score = run_solver(
+                ctx, time_limit_s=solver_time_limit(job.get("time_limit_s"), started), previous=previous, seed=SEED
+            )
+            if isinstance(budgets, int):
+                sweep = budget_sweep(ctx, schedule, num_points=budgets)
+            else:
+                sweep = budget_sweep(ctx, schedule, budgets=[float(budget) for budget in budgets])
+
+            sweep_id = uuid.uuid4().hex
+            with self.sweeps_lock:
+                self.sweeps[sweep_id] = (sweep, schedule_id)
+                while len(self.sweeps) > self.sweep_cache_size:
+                    self.sweeps.popitem(last=False)
+
+        seconds = time.perf_counter() - started
+        _log.info(f"Sweep {sweep_id[:12]} (schedule_id={schedule_id}) finished in {seconds:.2f}s, "
+                  f"{len(sweep.points)} budgets, full score={score:.2f}")
+
+        return {
+            "schedule_id":    schedule_id,
+            "sweep_id":       sweep_id,
+            "score":          score,
+            "cost":           calculate_cost(ctx, hours_assigned),
+            "points":         sweep.points,
+            "seconds":        seconds,
+            "context_cached": cached,
+        }
+
+    def schedule_at(self, request):
+        """The schedule at one point of a kept sweep, posted unless request["post"] is false."""
+        sweep_id = request.get("sweep_id")
+        with self.sweeps_lock:
+            entry = self.sweeps.get(sweep_id)
+            if entry is None:
+                raise KeyError(f"[schedule_at] Unknown or expired sweep_id {sweep_id!r}")
+            self.sweeps.move_to_end(sweep_id)
+        if "budget" not in request:
+            raise ValueError("[schedule_at] budget is required")
+        sweep, schedule_id = entry
+        budget = float(request["budget"])
+
+        schedule, hours_assigned = sweep.schedule_at(budget)
+        ctx     = sweep.ctx
+        payload = {
+            **serialize_schedule(ctx, schedule),
+            "score": score_schedule(ctx, schedule, hours_assigned),
+        }
+
+        posted = False
+        if request.get("post", True):
+            post_schedule(schedule_id, payload)
+            posted = True
+
+        return {
+            "schedule_id": schedule_id,
+            "budget":      budget,
+            "score":       payload["score"],
+            "cost":        calculate_cost(ctx, hours_assigned),
+            "posted":      posted,
+            "schedule":    payload,
+        }
+
+# ============================================================
+# HTTP INTERFACE
+# ============================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None  # set by serve()
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        gzipped = len(data) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+        self._send_json(200, {
+            "ok":              True,
+            "jobs":            self.service.jobs,
+            "cached_contexts": len(self.service.contexts),
+            "cached_sweeps":   len(self.service.sweeps),
+        })
+
+    def do_POST(self):
+        started = time.perf_counter()
+        if self.path not in ("/solve", "/sweep/schedule"):
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body   = self.rfile.read(length)
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            job    = json.loads(body or b"{}")
+            if not isinstance(job, dict):
+                raise ValueError("[do_POST] Request body must be a JSON object")
+        except (ValueError, OSError, EOFError) as e:
+            return self._send_json(400, {"error": str(e)})
+
+        try:
+            if self.path == "/sweep/schedule":
+                try:
+                    result = self.service.schedule_at(job)
+                except KeyError as e:
+                    # Unknown sweep_id, or a budget the sweep did not cover
+                    return self._send_json(404, {"error": e.args[0]})
+            else:
+                result = self.service.run_job(job, started=started)
+            self._send_json(200, result)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            _log.error(f"Job failed: {e}")
+            traceback.print_exc()
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        _log.debug(lambda: format % args)
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT):
+    _Handler.service = SolverService()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    _log.info(f"Solver service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,251 @@
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from dummy_data.synthetic import SIZES, generate_sized, to_backend_documents
+from helpers.log import configure
+
+# ============================================================
+# STUB BACKEND
+# ============================================================
+#
+# Stands in for the Express backend's /schedule routes so the HTTP client
+# in data/db_connection.py can be exercised without MongoDB:
+#
+#   python stub_backend.py --check               # run the client checks and exit
+#   python stub_backend.py --port 3000 --fail 2  # serve; then, in another shell,
+#   VITE_BASE_URL=http://127.0.0.1:3000 python main.py
+#
+# Schedules 1..--schedules are synthetic instances (dummy_data/synthetic.py)
+# sharing one TA list. Like the real backend it speaks HTTP/1.1
+# keep-alive, inflates gzip request bodies and gzips responses for
+# clients that accept it. On top of that it can misbehave on purpose:
+#   --fail N     the first N GET /schedule/getSchedule of each id answer 503
+#   --delay S    GET /slow answers after S seconds (read timeouts)
+#
+#   GET /schedule/importDataToAlg           -> {"tas", "schedule"} of the latest schedule
+#   GET /schedule/getSchedule?schedule_id=  -> one schedule
+#   GET /schedule/getLatestScheduleId       -> {"schedule_id"}
+#   PUT /schedule/update                    -> stores {"schedule_id", "schedule"}
+#   GET /slow                               -> {} after --delay seconds
+#   GET /stats                              -> what the stub has seen (see StubBackend.stats)
+
+DEFAULT_PORT      = 3000
+DEFAULT_SIZE      = "small"
+DEFAULT_SCHEDULES = 3
+DEFAULT_FAIL      = 0
+DEFAULT_DELAY_S   = 3.0
+
+class StubBackend:
+    """
+    Documents and counters behind the stub's handler. stats() reports:
+        connections   distinct client connections (keep-alive reuses one)
+        gets          GET requests answered
+        failures      503s sent by --fail
+        puts          [schedule_id, Content-Encoding, body bytes] per PUT
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, num_schedules=DEFAULT_SCHEDULES, fail=DEFAULT_FAIL,
+                 delay_s=DEFAULT_DELAY_S):
+        self.fail      = fail
+        self.delay_s   = delay_s
+        self.schedules = {}
+        self.tas       = None
+        for schedule_id in range(1, num_schedules + 1):
+            tas, schedule = to_backend_documents(generate_sized(size, seed=schedule_id), schedule_id=schedule_id)
+            self.tas = self.tas or tas
+            self.schedules[schedule_id] = schedule
+
+        self.lock        = threading.Lock()
+        self.connections = set()
+        self.gets        = 0
+        self.failures    = 0
+        self.attempts    = {}  # schedule_id -> getSchedule requests so far
+        self.puts        = []
+
+    def stats(self):
+        with self.lock:
+            return {
+                "connections": len(self.connections),
+                "gets":        self.gets,
+                "failures":    self.failures,
+                "puts":        list(self.puts),
+            }
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    stub = None  # set by make_server()
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, default=str).encode("utf-8")
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            data = gzip.compress(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        stub = self.stub
+        url  = urlparse(self.path)
+        with stub.lock:
+            stub.connections.add(self.client_address)
+            stub.gets += 1
+
+        if url.path == "/stats":
+            return self._send_json(200, stub.stats())
+        if url.path == "/slow":
+            time.sleep(stub.delay_s)
+            return self._send_json(200, {})
+        if url.path == "/schedule/importDataToAlg":
+            return self._send_json(200, {"tas": stub.tas, "schedule": stub.schedules[max(stub.schedules)]})
+        if url.path == "/schedule/getLatestScheduleId":
+            return self._send_json(200, {"schedule_id": max(stub.schedules)})
+        if url.path == "/schedule/getSchedule":
+            try:
+                schedule_id = int(parse_qs(url.query)["schedule_id"][0])
+            except (KeyError, ValueError):
+                return self._send_json(400, {"error": "schedule_id is required"})
+            if schedule_id not in stub.schedules:
+                return self._send_json(404, {"error": f"No schedule {schedule_id}"})
+            with stub.lock:
+                attempt = stub.attempts.get(schedule_id, 0)
+                stub.attempts[schedule_id] = attempt + 1
+                failing = attempt < stub.fail
+                if failing:
+                    stub.failures += 1
+            if failing:
+                return self._send_json(503, {"error": "stub: failing on purpose"})
+            return self._send_json(200, stub.schedules[schedule_id])
+        self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+    def do_PUT(self):
+        stub = self.stub
+        if urlparse(self.path).path != "/schedule/update":
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        length   = int(self.headers.get("Content-Length") or 0)
+        raw      = self.rfile.read(length)
+        encoding = self.headers.get("Content-Encoding")
+        try:
+            body = json.loads(gzip.decompress(raw) if encoding == "gzip" else raw)
+            schedule_id = int(body["schedule_id"])
+            schedule    = body["schedule"]
+        except (ValueError, OSError, EOFError, KeyError, TypeError) as e:
+            return self._send_json(400, {"error": str(e)})
+
+        with stub.lock:
+            stub.connections.add(self.client_address)
+            stub.puts.append([schedule_id, encoding, length])
+            stub.schedules[schedule_id] = {**schedule, "schedule_id": schedule_id}
+        self._send_json(200, {"message": "Schedule updated", "schedule_id": schedule_id})
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(stub, host="127.0.0.1", port=DEFAULT_PORT):
+    handler = type("StubHandler", (_Handler,), {"stub": stub})
+    return ThreadingHTTPServer((host, port), handler)
+
+# ============================================================
+# CLIENT CHECKS
+# ============================================================
+
+def run_checks(size=DEFAULT_SIZE, num_schedules=DEFAULT_SCHEDULES):
+    """
+    Run BackendClient against a stub on a free port: retries through
+    503s, gzip both ways, connection reuse and the read timeout. Prints
+    one line per check. Returns the number that failed.
+    """
+    import requests
+    from data.db_connection import BackendClient, CONNECT_TIMEOUT_S
+
+    fail = 2
+    stub = StubBackend(size=size, num_schedules=num_schedules, fail=fail, delay_s=1.0)
+    server = make_server(stub, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    def check(name, ok, detail):
+        results.append(ok)
+        print(f"{'PASS' if ok else 'FAIL'} {name}: {detail}")
+
+    try:
+        with BackendClient(base_url, retries=fail + 1, backoff_s=0.01) as client:
+            ids = list(stub.schedules)
+            schedules = client.fetch_schedules(ids)
+            check("retry", [s["schedule_id"] for s in schedules] == ids and stub.failures == fail * len(ids),
+                  f"{len(ids)} schedules fetched through {stub.failures} 503s")
+
+            response = client.session.get(f"{base_url}/schedule/importDataToAlg", timeout=client.timeout)
+            check("gzip response", response.headers.get("Content-Encoding") == "gzip" and "tas" in response.json(),
+                  f"Content-Encoding {response.headers.get('Content-Encoding')}, "
+                  f"{response.headers.get('Content-Length')} bytes on the wire")
+
+            client.post_schedule(ids[0], schedules[0])
+            _, encoding, length = stub.puts[-1]
+            check("gzip request", encoding == "gzip" and stub.schedules[ids[0]]["schedule_id"] == ids[0],
+                  f"PUT body sent with Content-Encoding {encoding}, {length} bytes")
+
+            for _ in range(20):
+                client.fetch_schedule()
+            connections = stub.stats()["connections"]
+            check("keep-alive", connections <= client.pool_size,
+                  f"{stub.stats()['gets']} GETs over {connections} connections (pool size {client.pool_size})")
+
+        with BackendClient(base_url, timeout=(CONNECT_TIMEOUT_S, 0.25), retries=0) as client:
+            started = time.perf_counter()
+            try:
+                client.request_json("GET", f"{base_url}/slow")
+                check("timeout", False, "GET /slow returned instead of timing out")
+            except requests.RequestException as e:
+                seconds = time.perf_counter() - started
+                check("timeout", seconds < stub.delay_s,
+                      f"{type(e).__name__} after {seconds:.2f}s (read timeout 0.25s, server delay {stub.delay_s}s)")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return results.count(False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve stub backend /schedule routes, or check the HTTP client against them.")
+    parser.add_argument("--check", action="store_true", help="run the client checks against a stub and exit")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--size", default=DEFAULT_SIZE, choices=sorted(SIZES), help="synthetic instance size")
+    parser.add_argument("--schedules", type=int, default=DEFAULT_SCHEDULES, help="schedules to serve")
+    parser.add_argument("--fail", type=int, default=DEFAULT_FAIL,
+                        help="answer the first N getSchedule requests of each id with 503")
+    parser.add_argument("--delay", type=float, default=DEFAULT_DELAY_S, help="seconds GET /slow takes")
+    args = parser.parse_args(argv)
+
+    if args.schedules < 1:
+        parser.error("--schedules must be at least 1")
+    if args.check:
+        configure(level="WARNING")
+        return 1 if run_checks(args.size, args.schedules) else 0
+
+    stub   = StubBackend(args.size, args.schedules, args.fail, args.delay)
+    server = make_server(stub, args.host, args.port)
+    print(f"Stub backend on http://{args.host}:{server.server_address[1]} "
+          f"({args.schedules} {args.size} schedules, fail={args.fail}, delay={args.delay}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import math
+import multiprocessing
+import os
+import random
+import time
+from simulated_annealing import *
+
+# ============================================================
+# PARALLEL TEMPERING (REPLICA EXCHANGE)
+# ============================================================
+
+def temperature_ladder(num_replicas, t_min, t_max):
+    """Geometric ladder from t_min (coldest, index 0) to t_max (hottest)."""
+    if num_replicas == 1:
+        return [t_min]
+    ratio = (t_max / t_min) ** (1 / (num_replicas - 1))
+    return [t_min * ratio ** k for k in range(num_replicas)]
+
+class _ReplicaGroup:
+    """
+    The replicas hosted by one process. Replicas keep their own state for
+    the whole run; exchanges just change which temperature each one runs at.
+    """
+
+    def __init__(self, ctx, replica_seeds, perturb_steps):
+        self.chains = {
+            replica_id: AnnealingChain(
+                ctx, seed=seed, perturb_steps=0 if replica_id == 0 else perturb_steps
+            )
+            for replica_id, seed in replica_seeds
+        }
+
+    def scores(self):
+        return {replica_id: chain.score for replica_id, chain in self.chains.items()}
+
+    def run(self, temperatures, num_steps):
+        """temperatures: replica_id -> temperature for this round."""
+        for replica_id, temperature in temperatures.items():
+            self.chains[replica_id].run(temperature, num_steps)
+        return self.scores()
+
+    def finish(self):
+        return {replica_id: chain.finish() for replica_id, chain in self.chains.items()}
+
+def _replica_worker(conn, ctx, replica_seeds, perturb_steps):
+    """Process loop: the context arrives once with the process, then only commands and scores cross the pipe."""
+    group = _ReplicaGroup(ctx, replica_seeds, perturb_steps)
+    conn.send(group.scores())
+
+    while True:
+        command, payload = conn.recv()
+        if command == "run":
+            temperatures, num_steps = payload
+            conn.send(group.run(temperatures, num_steps))
+        elif command == "finish":
+            conn.send(group.finish())
+            break
+
+    conn.close()
+
+class _LocalGroup:
+    """In-process stand-in for a worker, used when only one process is wanted."""
+
+    def __init__(self, ctx, replica_seeds, perturb_steps):
+        self.group = _ReplicaGroup(ctx, replica_seeds, perturb_steps)
+        self.reply = self.group.scores()
+
+    def send(self, message):
+        command, payload = message
+        if command == "run":
+            self.reply = self.group.run(*payload)
+        elif command == "finish":
+            self.reply = self.group.finish()
+
+    def recv(self):
+        return self.reply
+
+def parallel_tempering(ctx, num_replicas=None, t_min=0.05, t_max=2.0, num_rounds=200,
+                       steps_per_round=50, seed=None, max_workers=None, perturb_steps=50,
+                       time_limit_s=None):
+    """
+    Replica-exchange annealing. num_replicas chains run at fixed
+    temperatures on a geometric ladder between t_min and t_max, spread over
+    up to max_workers processes. After every round of steps_per_round moves,
+    neighbouring temperatures (alternating even/odd pairs) try to swap
+    replicas with the usual Metropolis rule, so good states drift down to
+    the cold end while hot replicas keep exploring. Moves and scoring are
+    those of simulated_annealing() via AnnealingChain.
+    With time_limit_s set, rounds continue until that many seconds have
+    passed (worker start-up included) instead of stopping at num_rounds.
+    Returns schedule, hours_assigned, score and a stats dict.
+    """
+    deadline     = time.perf_counter() + time_limit_s if time_limit_s is not None else None
+    max_workers  = max_workers or os.cpu_count() or 1
+    num_replicas = num_replicas or max(2, max_workers)
+    base_seed    = seed if seed is not None else random.randrange(2**32)
+    exchange_rng = random.Random(base_seed - 1)
+
+    temperatures = temperature_ladder(num_replicas, t_min, t_max)
+
+    # Deal replicas round-robin over worker processes
+    num_workers = min(max_workers, num_replicas)
+    groups = [
+        [(replica_id, base_seed + replica_id) for replica_id in range(w, num_replicas, num_workers)]
+        for w in range(num_workers)
+    ]
+
+    processes = []
+    if num_workers == 1:
+        conns = [_LocalGroup(ctx, groups[0], perturb_steps)]
+    else:
+        mp_ctx = multiprocessing.get_context()
+        conns  = []
+        for group in groups:
+            parent_conn, child_conn = mp_ctx.Pipe()
+            process = mp_ctx.Process(
+                target=_replica_worker,
+                args=(child_conn, ctx, group, perturb_steps),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            conns.append(parent_conn)
+            processes.append(process)
+
+    # replica_at[k] is the replica currently running at temperatures[k]
+    replica_at = list(range(num_replicas))
+    scores     = {}
+    for conn in conns:
+        scores.update(conn.recv())
+
+    exchange_attempts = [0] * (num_replicas - 1)
+    exchange_accepts  = [0] * (num_replicas - 1)
+
+    round_num = 0
+    try:
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif round_num >= num_rounds:
+                break
+
+            temperature_of = {replica_at[k]: temperatures[k] for k in range(num_replicas)}
+            for conn, group in zip(conns, groups):
+                conn.send(("run", ({replica_id: temperature_of[replica_id] for replica_id, _ in group},
+                                   steps_per_round)))
+            for conn in conns:
+                scores.update(conn.recv())
+
+            # Try swapping neighbours (k, k+1), alternating even and odd pairs
+            for k in range(round_num % 2, num_replicas - 1, 2):
+                cold, hot = replica_at[k], replica_at[k + 1]
+                exponent = (scores[hot] - scores[cold]) * (1 / temperatures[k] - 1 / temperatures[k + 1])
+                exchange_attempts[k] += 1
+                if exponent >= 0 or exchange_rng.random() < math.exp(exponent):
+                    replica_at[k], replica_at[k + 1] = hot, cold
+                    exchange_accepts[k] += 1
+
+            round_num += 1
+
+        results = {}
+        for conn in conns:
+            conn.send(("finish", None))
+        for conn in conns:
+            results.update(conn.recv())
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    best_replica = max(results, key=lambda replica_id: results[replica_id][2])
+    schedule, hours_assigned, best_score = results[best_replica]
+
+    stats = {
+        "temperatures":      temperatures,
+        "rounds":            round_num,
+        "steps_per_round":   steps_per_round,
+        "exchange_rates":    [
+            accepts / attempts if attempts else 0.0
+            for accepts, attempts in zip(exchange_accepts, exchange_attempts)
+        ],
+        "replica_best":      {replica_id: result[2] for replica_id, result in results.items()},
+        "best_replica":      best_replica,
+    }
+    return schedule, hours_assigned, best_score, stats
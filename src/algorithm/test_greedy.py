@@ -0,0 +1,41 @@
+import pytest
+from data.context import SchedulerContext
+from dummy_data.synthetic import generate_sized
+from helpers.constraints import *
+from greedy import empty_schedule, fill_order, fill_role, greedy_assign
+
+# ============================================================
+# LAZY CANDIDATE QUEUES VS FULL SORT
+# ============================================================
+#
+# greedy_assign() draws candidates from CandidateQueues; it has to pick
+# the same TAs, in the same tie order, as scoring and sorting every
+# eligible TA with fill_role() (which warm_start still uses). ctx comes
+# from conftest.py.
+
+def sorted_greedy_assign(ctx):
+    """greedy_assign() with fill_role() for every fill: same passes and order."""
+    schedule = empty_schedule(ctx)
+    state    = AssignmentState(ctx)
+    lab_shifts, oh_shifts = fill_order(ctx)
+    for shift in lab_shifts:
+        fill_role(ctx, schedule, state, shift, "lead", shift["staffing"][2])
+    for shift in lab_shifts:
+        fill_role(ctx, schedule, state, shift, "lab_ta", shift["staffing"][1])
+    for shift in oh_shifts:
+        fill_role(ctx, schedule, state, shift, "oh_ta", shift["staffing"][0])
+    return schedule, state
+
+def assert_same_schedule(ctx):
+    lazy, lazy_state = greedy_assign(ctx)
+    full, full_state = sorted_greedy_assign(ctx)
+    for shift_id in full:
+        assert lazy[shift_id] == full[shift_id], shift_id
+    assert lazy_state.hours_assigned == full_state.hours_assigned
+
+def test_matches_fill_role(ctx):
+    assert_same_schedule(ctx)
+
+@pytest.mark.parametrize("size, seed", [("small", 1), ("small", 2), ("small", 7), ("medium", 1)])
+def test_matches_fill_role_on_synthetic(size, seed):
+    assert_same_schedule(apply_fairness(SchedulerContext(**generate_sized(size, seed=seed))))
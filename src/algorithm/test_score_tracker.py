@@ -0,0 +1,68 @@
+import math
+import random
+from helpers.constraints import *
+from helpers.scoring import *
+from greedy import greedy_assign
+from simulated_annealing import propose_swap, propose_vacate, propose_fill, FilledShiftSampler
+
+# ============================================================
+# DELTA SCORING EQUIVALENCE
+# ============================================================
+#
+# ScoreTracker's running total has to match score_schedule() exactly
+# after any mix of moves. Checked against the pure-Python scorer, so this
+# runs without numpy. ctx comes from conftest.py.
+
+NUM_MOVES = 400
+
+def assert_in_sync(ctx, tracker, schedule, state, move):
+    full = score_schedule(ctx, schedule, state.hours_assigned)
+    assert math.isclose(tracker.total, full, rel_tol=1e-9, abs_tol=1e-9), (move, tracker.total, full)
+
+def test_running_total_matches_score_schedule(ctx):
+    schedule, state = greedy_assign(ctx)
+    tracker   = ScoreTracker(ctx, schedule, state)
+    sampler   = FilledShiftSampler(ctx, schedule)
+    durations = dict(zip(ctx.index.shift_ids, ctx.index.durations))
+    min_hours = {ta["ta_id"]: 0 for ta in ctx.ta_metadata}
+    oh_shifts = [
+        shift["shift_id"] for shift in ctx.shift_metadata
+        if not shift["is_lab"] and not schedule[shift["shift_id"]]["unschedulable"]
+    ]
+    assert_in_sync(ctx, tracker, schedule, state, "initial")
+
+    rng   = random.Random(0)
+    moves = {"swap": 0, "vacate": 0, "fill": 0}
+    for _ in range(NUM_MOVES):
+        kind = rng.choice(list(moves))
+        if kind == "swap":
+            move = propose_swap(ctx, schedule, state, sampler, rng)
+            if move is None:
+                continue
+            tracker.apply_swap(*move, tracker.swap_delta(*move))
+        elif kind == "vacate":
+            move = propose_vacate(schedule, state, oh_shifts, min_hours, durations, rng)
+            if move is None:
+                continue
+            ta_out, shift_id = move
+            tracker.apply_vacate(ta_out, shift_id, "oh_ta", tracker.vacate_delta(ta_out, shift_id, "oh_ta"))
+            sampler.refresh(shift_id)
+        else:
+            move = propose_fill(ctx, schedule, state, oh_shifts, rng)
+            if move is None:
+                continue
+            ta_in, shift_id = move
+            tracker.apply_fill(ta_in, shift_id, "oh_ta", tracker.fill_delta(ta_in, shift_id, "oh_ta"))
+            sampler.refresh(shift_id)
+
+        moves[kind] += 1
+        assert_in_sync(ctx, tracker, schedule, state, (kind, move))
+
+    assert all(moves.values()), moves
+
+def test_clear_shift_matches_score_schedule(ctx):
+    schedule, state = greedy_assign(ctx)
+    tracker = ScoreTracker(ctx, schedule, state)
+    for shift_id in list(schedule)[::3]:
+        tracker.clear_shift(shift_id)
+        assert_in_sync(ctx, tracker, schedule, state, ("clear", shift_id))
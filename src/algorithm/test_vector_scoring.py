@@ -0,0 +1,69 @@
+import math
+import random
+import pytest
+from helpers.constraints import *
+from helpers.scoring import *
+from greedy import greedy_assign
+from simulated_annealing import simulated_annealing, propose_swap, FilledShiftSampler
+from helpers.vector_scoring import HAVE_NUMPY, VectorScorer
+
+# ============================================================
+# VECTOR SCORER EQUIVALENCE
+# ============================================================
+#
+# VectorScorer has to match helpers.scoring term for term, and
+# ScoreTracker.check() relies on it when numpy is installed. Run from
+# src/algorithm:
+#
+#   python -m pytest test_vector_scoring.py
+#
+# ctx comes from conftest.py.
+
+pytestmark = pytest.mark.skipif(not HAVE_NUMPY, reason="numpy is not installed")
+
+def close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+@pytest.fixture(scope="module")
+def annealed(ctx):
+    schedule, hours_assigned, _ = simulated_annealing(ctx, seed=0, num_iterations=2000)
+    return schedule, hours_assigned
+
+def test_score_matches_score_schedule(ctx, annealed):
+    schedule, hours_assigned = annealed
+    scorer = VectorScorer(ctx)
+    assert close(scorer.score(scorer.arrays(schedule)), score_schedule(ctx, schedule, hours_assigned))
+
+def test_score_of_empty_schedule(ctx):
+    schedule = {shift["shift_id"]: {"leads": [], "lab_tas": [], "oh_tas": []} for shift in ctx.shift_metadata}
+    scorer   = VectorScorer(ctx)
+    assert scorer.score(scorer.arrays(schedule)) == 0.0
+
+def test_swap_deltas_match_score_tracker(ctx, annealed):
+    schedule, _ = annealed
+    state   = AssignmentState.from_schedule(ctx, schedule)
+    tracker = ScoreTracker(ctx, schedule, state)
+    sampler = FilledShiftSampler(ctx, schedule)
+    rng     = random.Random(1)
+    moves   = [m for m in (propose_swap(ctx, schedule, state, sampler, rng) for _ in range(500)) if m]
+    assert moves
+
+    scorer = VectorScorer(ctx)
+    deltas = scorer.swap_deltas(scorer.arrays(schedule), moves)
+    for move, delta in zip(moves, deltas):
+        assert close(delta, tracker.swap_delta(*move)), move
+
+def test_candidate_scores_match_compute_candidate_score(ctx):
+    schedule, state = greedy_assign(ctx)
+    scorer = VectorScorer(ctx)
+    arrays = scorer.arrays(schedule)
+    for shift_id, assignment in schedule.items():
+        on_shift = set(assignment["leads"] + assignment["lab_tas"] + assignment["oh_tas"])
+        ta_ids   = [ta["ta_id"] for ta in ctx.ta_metadata if ta["ta_id"] not in on_shift]
+        scores   = scorer.candidate_scores(arrays, shift_id, ta_ids)
+        for ta_id, score in zip(ta_ids, scores):
+            assert close(score, compute_candidate_score(ctx, ta_id, shift_id, schedule, state.hours_assigned))
+
+def test_debug_scoring_uses_vector_rescore(ctx):
+    # Every accepted move is checked against VectorScorer; a drift raises
+    simulated_annealing(ctx, seed=0, num_iterations=300, debug_scoring=True)
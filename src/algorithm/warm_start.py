@@ -0,0 +1,144 @@
+from simulated_annealing import *
+from helpers.log import get_logger
+
+_log = get_logger("WARM_START")
+
+# ============================================================
+# REPAIR A PREVIOUS SCHEDULE
+# ============================================================
+
+# Full-run iteration count that warm starts scale down by the share of
+# shifts they touch, and the least a warm start gets
+FULL_RUN_ITERATIONS = 10000
+MIN_WARM_ITERATIONS = 500
+
+def previous_roles(ctx, shift, ta_ids):
+    """
+    Split a stored tas_scheduled list back into roles. serialize_schedule
+    writes leads, then lab TAs, then OH TAs, so on a lab shift the first
+    TAs with lead status fill the lead slots and the rest are lab TAs.
+    Yields (ta_id, role); role is None for TAs that no longer fit a slot
+    (unknown TA, missing status, or staffing went down).
+    """
+    index = ctx.index
+    num_oh, num_lab, num_leads = shift["staffing"]
+    counts = {"lead": 0, "lab_ta": 0, "oh_ta": 0}
+    limits = {"lead": num_leads, "lab_ta": num_lab, "oh_ta": num_oh}
+
+    for ta_id in ta_ids:
+        t = index.ta_pos.get(ta_id)
+        if t is None:
+            yield ta_id, None
+            continue
+
+        if shift["is_lab"]:
+            options = ("lead", "lab_ta") if index.lab_status[t] >= 2 else ("lab_ta",)
+        else:
+            options = ("oh_ta",)
+
+        role = next((r for r in options if counts[r] < limits[r]), None)
+        if role is not None:
+            counts[role] += 1
+        yield ta_id, role
+
+def repair_schedule(ctx, previous):
+    """
+    Rebuild a previous schedule ({shift_id: [ta_id, ...]}, see
+    parse_previous_assignments) against the current context. Assignments
+    that still pass is_eligible_for_role are kept as they were; the rest
+    are dropped, and the gaps are then filled with greedy's fill_role in
+    the usual lead / lab TA / OH order.
+    Returns schedule, state and the set of shift_ids that changed.
+    """
+    schedule = empty_schedule(ctx)
+    state    = AssignmentState(ctx)
+    changed  = set()
+
+    lab_shifts, oh_shifts = fill_order(ctx)
+
+    # Keep whatever is still valid, labs first as in greedy_assign
+    dropped = 0
+    for shift in lab_shifts + oh_shifts:
+        shift_id = shift["shift_id"]
+        for ta_id, role in previous_roles(ctx, shift, previous.get(shift_id, [])):
+            if role is not None and is_eligible_for_role(ctx, ta_id, shift_id, role, state):
+                schedule[shift_id][role + "s"].append(ta_id)
+                assign_ta(ctx, ta_id, shift_id, state)
+            else:
+                dropped += 1
+                changed.add(shift_id)
+                _log.debug(lambda: f"  dropped '{ta_id}' from shift '{shift_id}'")
+
+    # Fill the gaps
+    for role, slot, shifts in (("lead", 2, lab_shifts), ("lab_ta", 1, lab_shifts), ("oh_ta", 0, oh_shifts)):
+        for shift in shifts:
+            shift_id = shift["shift_id"]
+            missing  = shift["staffing"][slot] - len(schedule[shift_id][role + "s"])
+            if missing > 0:
+                fill_role(ctx, schedule, state, shift, role, missing)
+                changed.add(shift_id)
+
+    _log.info(f"Repaired previous schedule: {dropped} assignments dropped, {len(changed)} shifts changed")
+    return schedule, state, changed
+
+def churn(previous, schedule):
+    """Number of (shift, TA) assignments added or removed relative to previous."""
+    total = 0
+    for shift_id, assignment in schedule.items():
+        before = set(previous.get(shift_id, []))
+        after  = set(assignment["leads"] + assignment["lab_tas"] + assignment["oh_tas"])
+        total += len(before ^ after)
+    return total
+
+# ============================================================
+# LOCAL ANNEALING AROUND THE CHANGES
+# ============================================================
+
+def warm_start_annealing(ctx, previous, initial_temp=1.0, cooling_rate=0.995, num_iterations=None,
+                         seed=None, stagnation_limit=None):
+    """
+    Re-solve starting from a previous schedule instead of greedy_assign().
+    After repair_schedule(), annealing only moves TAs on the changed shifts
+    and on other shifts of the TAs involved, so the rest of the week stays
+    as it was. initial_temp is lower than a full run's to keep churn down;
+    num_iterations defaults to FULL_RUN_ITERATIONS scaled by the share of
+    shifts in play; warm starts are short by construction, so they don't
+    stretch to fill a time limit. Returns schedule, hours_assigned, score.
+    """
+    schedule, state, changed = repair_schedule(ctx, previous)
+
+    # The neighbourhood: changed shifts plus every shift of a TA who was
+    # added to or dropped from one of them
+    involved = set()
+    for shift_id in changed:
+        assignment = schedule[shift_id]
+        involved.update(previous.get(shift_id, []))
+        involved.update(assignment["leads"] + assignment["lab_tas"] + assignment["oh_tas"])
+    region = set(changed)
+    for ta_id in involved:
+        region.update(state.current_assignments.get(ta_id, []))
+
+    if not any(is_filled(schedule[shift_id]) for shift_id in region):
+        _log.info("Nothing to re-anneal, keeping the repaired schedule")
+        return schedule, state.hours_assigned, score_schedule(ctx, schedule, state.hours_assigned)
+
+    if num_iterations is None:
+        num_iterations = max(
+            MIN_WARM_ITERATIONS,
+            round(FULL_RUN_ITERATIONS * len(region) / len(ctx.shift_metadata)),
+        )
+    _log.info(f"Annealing {len(region)}/{len(ctx.shift_metadata)} shifts ({num_iterations} iterations)")
+
+    schedule, hours_assigned, score = simulated_annealing(
+        ctx,
+        initial_temp=initial_temp,
+        cooling_rate=cooling_rate,
+        num_iterations=num_iterations,
+        seed=seed,
+        stagnation_limit=stagnation_limit,
+        initial=(schedule, state),
+        active_shifts=region,
+    )
+
+    _log.info(f"Warm start changed {churn(previous, schedule)} assignments")
+    return schedule, hours_assigned, score